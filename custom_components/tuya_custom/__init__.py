@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
 import logging
+import time
 from typing import Any, NamedTuple
 
 from tuya_sharing import (
@@ -13,36 +19,71 @@ from tuya_sharing import (
 )
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, CoreState, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.dispatcher import dispatcher_send
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+    dispatcher_send,
+)
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
+from .availability import AvailabilityTracker
 from .const import (
+    CLOUD_DEVICE_PREFIX,
     CONF_APP_TYPE,
     CONF_ENDPOINT,
+    CONF_LOCAL_CONTROL,
+    CONF_PROFILING,
     CONF_TERMINAL_ID,
     CONF_TOKEN_INFO,
     CONF_USER_CODE,
+    CRITICAL_PLATFORMS,
+    DEFERRED_PLATFORMS,
     DOMAIN,
     LOGGER,
+    PLATFORM_CATEGORIES,
     PLATFORMS,
+    SCENE_STORAGE_KEY,
+    SCENE_STORAGE_VERSION,
     TUYA_CLIENT_ID,
     TUYA_DISCOVERY_NEW,
     TUYA_HA_SIGNAL_UPDATE_ENTITY,
 )
+from .local import TuyaLocalEngine
+from .manager import TOKEN_REFRESH_AHEAD, TOKEN_REFRESH_RETRY, TuyaManager
+from .profiler import StateProfiler
+from .services import async_setup_services
+from .shedding import LoadShedder
 
 # Suppress logs from the library, it logs unneeded on error
 logging.getLogger("tuya_sharing").setLevel(logging.CRITICAL)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 type TuyaConfigEntry = ConfigEntry[HomeAssistantTuyaData]
 
 
 class HomeAssistantTuyaData(NamedTuple):
     """Tuya data stored in the Home Assistant data object."""
 
-    manager: Manager
+    manager: TuyaManager
     listener: SharingDeviceListener
+    platforms: set[Platform]
+    loading_platforms: set[Platform]
+    platform_setup_times: dict[Platform, float]
+    startup_times: dict[str, float]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Tuya integration."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool:
@@ -50,22 +91,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool
     if CONF_APP_TYPE in entry.data:
         raise ConfigEntryAuthFailed("Authentication failed. Please re-authenticate.")
 
+    # Time spent per setup phase, to tell cloud latency apart from local work
+    startup_times: dict[str, float] = {}
+
     token_listener = TokenListener(hass, entry)
-    manager = Manager(
-        TUYA_CLIENT_ID,
-        entry.data[CONF_USER_CODE],
-        entry.data[CONF_TERMINAL_ID],
-        entry.data[CONF_ENDPOINT],
-        entry.data[CONF_TOKEN_INFO],
-        token_listener,
-    )
+    with _timed(startup_times, "manager"):
+        manager = TuyaManager(
+            TUYA_CLIENT_ID,
+            entry.data[CONF_USER_CODE],
+            entry.data[CONF_TERMINAL_ID],
+            entry.data[CONF_ENDPOINT],
+            entry.data[CONF_TOKEN_INFO],
+            token_listener,
+        )
 
     listener = DeviceListener(hass, manager)
     manager.add_device_listener(listener)
 
     # Get all devices from Tuya
     try:
-        await hass.async_add_executor_job(manager.update_device_cache)
+        with _timed(startup_times, "update_device_cache"):
+            await hass.async_add_executor_job(manager.update_device_cache)
     except Exception as exc:
         # While in general, we should avoid catching broad exceptions,
         # we have no other way of detecting this case.
@@ -74,15 +120,232 @@ async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool
             raise ConfigEntryAuthFailed(msg) from exc
         raise
 
+    if entry.options.get(CONF_LOCAL_CONTROL):
+        manager.local = TuyaLocalEngine(hass, manager)
+        await manager.local.async_start()
+        entry.async_on_unload(manager.local.async_stop)
+    if entry.options.get(CONF_PROFILING):
+        manager.profiler = StateProfiler()
+    manager.availability = AvailabilityTracker(hass, entry)
+    entry.async_on_unload(manager.availability.async_stop)
+    manager.load_shedder = LoadShedder(hass)
+    manager.load_shedder.async_start()
+    entry.async_on_unload(manager.load_shedder.async_stop)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    async_schedule_token_refresh(hass, entry, manager)
+
     # Connection is successful, store the manager & listener
-    entry.runtime_data = HomeAssistantTuyaData(manager=manager, listener=listener)
+    entry.runtime_data = tuya = HomeAssistantTuyaData(
+        manager=manager,
+        listener=listener,
+        platforms=set(),
+        loading_platforms=set(),
+        platform_setup_times={},
+        startup_times=startup_times,
+    )
 
     # Cleanup device registry
-    await cleanup_device_registry(hass, manager)
+    with _timed(startup_times, "cleanup_device_registry"):
+        await cleanup_device_registry(hass, entry, manager)
+
+    # Only the platforms the devices need are loaded
+    platforms = async_get_platforms(manager.device_map.values())
+    with _timed(startup_times, "platforms"):
+        await async_setup_platforms(
+            hass,
+            entry,
+            [platform for platform in CRITICAL_PLATFORMS if platform in platforms],
+        )
+        await async_setup_platforms(
+            hass,
+            entry,
+            [
+                platform
+                for platform in PLATFORMS
+                if platform in platforms
+                and platform not in CRITICAL_PLATFORMS
+                and platform not in DEFERRED_PLATFORMS
+            ],
+        )
+
+    # If the device does not register any entities, the device does not need to subscribe
+    # So the subscription is here
+    with _timed(startup_times, "refresh_mq"):
+        await hass.async_add_executor_job(manager.refresh_mq)
+    LOGGER.debug(
+        "Set up %s (%s devices) in %s, platforms: %s",
+        entry.title,
+        len(manager.device_map),
+        startup_times,
+        tuya.platform_setup_times,
+    )
+
+    async def async_setup_deferred_platforms() -> None:
+        """Set up the deferred platforms and register the remaining devices."""
+        platforms = async_get_platforms(manager.device_map.values())
+        with _timed(startup_times, "deferred_platforms"):
+            await async_setup_platforms(
+                hass,
+                entry,
+                [platform for platform in DEFERRED_PLATFORMS if platform in platforms],
+                late=True,
+            )
+        # Register known device IDs, now all entities have been created
+        with _timed(startup_times, "register_devices"):
+            async_register_devices(hass, entry, manager)
+        with _timed(startup_times, "subscribe_devices"):
+            await hass.async_add_executor_job(manager.subscribe_devices)
+        LOGGER.debug(
+            "Finished deferred setup of %s in %s, platforms: %s",
+            entry.title,
+            startup_times,
+            tuya.platform_setup_times,
+        )
+
+    @callback
+    def async_at_hass_started(hass: HomeAssistant) -> None:
+        """Set up the deferred platforms in the background."""
+        entry.async_create_background_task(
+            hass, async_setup_deferred_platforms(), f"{DOMAIN} deferred platforms"
+        )
+
+    entry.async_on_unload(async_at_started(hass, async_at_hass_started))
+
+    @callback
+    def async_discover_platforms(device_ids: list[str]) -> None:
+        """Load the platforms needed by new devices."""
+        platforms = (
+            async_get_platforms(
+                manager.device_map[device_id]
+                for device_id in device_ids
+                if device_id in manager.device_map
+            )
+            - tuya.platforms
+        )
+        if hass.state is not CoreState.running:
+            # Loaded with the other deferred platforms
+            platforms.difference_update(DEFERRED_PLATFORMS)
+        if platforms:
+            entry.async_create_background_task(
+                hass, async_setup_new_platforms(platforms), f"{DOMAIN} platforms"
+            )
+
+    async def async_setup_new_platforms(platforms: set[Platform]) -> None:
+        """Set up the platforms of new devices and subscribe to the devices."""
+        await async_setup_platforms(hass, entry, platforms, late=True)
+        # The new devices are only set up once their platform created entities
+        await hass.async_add_executor_job(manager.subscribe_devices)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, TUYA_DISCOVERY_NEW, async_discover_platforms)
+    )
+    return True
+
+
+@contextmanager
+def _timed(durations: dict[str, float], phase: str) -> Iterator[None]:
+    """Record the duration of a setup phase in seconds."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        durations[phase] = round(time.monotonic() - start, 3)
+
+
+@callback
+def async_schedule_token_refresh(
+    hass: HomeAssistant, entry: TuyaConfigEntry, manager: TuyaManager
+) -> None:
+    """Refresh the access token in the background shortly before it expires."""
+    cancel: CALLBACK_TYPE
+
+    async def async_refresh_token() -> None:
+        """Refresh the access token and schedule the next refresh."""
+        nonlocal cancel
+        delay: float = TOKEN_REFRESH_RETRY
+        # Requests keep using the current token while it is being refreshed
+        if await hass.async_add_executor_job(manager.refresh_access_token):
+            delay = max(
+                manager.token_expires_in() - TOKEN_REFRESH_AHEAD, TOKEN_REFRESH_RETRY
+            )
+        else:
+            LOGGER.warning(
+                "Unable to refresh the access token of %s, retrying in %s seconds",
+                entry.title,
+                TOKEN_REFRESH_RETRY,
+            )
+        cancel = async_call_later(hass, delay, async_start_refresh)
+
+    @callback
+    def async_start_refresh(_now: datetime) -> None:
+        """Start a token refresh."""
+        entry.async_create_background_task(
+            hass, async_refresh_token(), f"{DOMAIN} token refresh"
+        )
+
+    cancel = async_call_later(
+        hass,
+        max(manager.token_expires_in() - TOKEN_REFRESH_AHEAD, 0),
+        async_start_refresh,
+    )
+    entry.async_on_unload(lambda: cancel())
+
+
+@callback
+def async_get_platforms(devices: Iterable[CustomerDevice]) -> set[Platform]:
+    """Return the platforms which may create entities for the devices."""
+    platforms = {Platform.SCENE}
+    for device in devices:
+        platforms.update(
+            platform
+            for platform, categories in PLATFORM_CATEGORIES.items()
+            if device.category in categories
+        )
+    return platforms
+
+
+async def async_setup_platforms(
+    hass: HomeAssistant,
+    entry: TuyaConfigEntry,
+    platforms: Iterable[Platform],
+    *,
+    late: bool = False,
+) -> None:
+    """Set up platforms concurrently, recording the setup time of each."""
+    tuya = entry.runtime_data
+    forward_entry_setups = (
+        hass.config_entries.async_late_forward_entry_setups
+        if late
+        else hass.config_entries.async_forward_entry_setups
+    )
 
-    # Register known device IDs
+    async def async_setup_platform(platform: Platform) -> None:
+        if platform in tuya.platforms or platform in tuya.loading_platforms:
+            return
+        tuya.loading_platforms.add(platform)
+        start = time.monotonic()
+        try:
+            await forward_entry_setups(entry, [platform])
+        finally:
+            tuya.loading_platforms.discard(platform)
+        tuya.platforms.add(platform)
+        tuya.platform_setup_times[platform] = round(time.monotonic() - start, 3)
+
+    await asyncio.gather(*(async_setup_platform(platform) for platform in platforms))
+
+
+@callback
+def async_register_devices(
+    hass: HomeAssistant, entry: TuyaConfigEntry, device_manager: TuyaManager
+) -> None:
+    """Register the devices no entities were created for as unsupported.
+
+    Devices with entities are registered with their final model through the
+    device info of their entities, when the platforms are set up. Registry
+    entries which are already up to date are left alone.
+    """
     device_registry = dr.async_get(hass)
-    for device in manager.device_map.values():
+    for device in device_manager.device_map.values():
         LOGGER.debug(
             "Register device %s (online: %s): %s (function: %s, status range: %s)",
             device.id,
@@ -91,39 +354,69 @@ async def async_setup_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool
             device.function,
             device.status_range,
         )
+        # TuyaEntity flags the devices it is created for, the devices with
+        # disabled entities only are registered by their placeholders
+        if device.set_up or device.id in device_manager.disabled_devices:
+            continue
+
+        model = f"{device.product_name} (unsupported)"
+        if (
+            device_entry := device_registry.async_get_device(
+                identifiers={(DOMAIN, device.id)}
+            )
+        ) is not None and (
+            device_entry.name,
+            device_entry.model,
+            device_entry.model_id,
+        ) == (device.name, model, device.product_id):
+            continue
+
         device_registry.async_get_or_create(
             config_entry_id=entry.entry_id,
             identifiers={(DOMAIN, device.id)},
             manufacturer="Tuya",
             name=device.name,
-            # Note: the model is overridden via entity.device_info property
-            # when the entity is created. If no entities are generated, it will
-            # stay as unsupported
-            model=f"{device.product_name} (unsupported)",
+            model=model,
             model_id=device.product_id,
         )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    # If the device does not register any entities, the device does not need to subscribe
-    # So the subscription is here
-    await hass.async_add_executor_job(manager.refresh_mq)
-    return True
 
-
-async def cleanup_device_registry(hass: HomeAssistant, device_manager: Manager) -> None:
+async def cleanup_device_registry(
+    hass: HomeAssistant, entry: TuyaConfigEntry, device_manager: Manager
+) -> None:
     """Remove deleted device registry entry if there are no remaining entities."""
     device_registry = dr.async_get(hass)
-    for dev_id, device_entry in list(device_registry.devices.items()):
-        for item in device_entry.identifiers:
-            if item[0] == DOMAIN and item[1] not in device_manager.device_map:
-                device_registry.async_remove_device(dev_id)
+    for device_entry in dr.async_entries_for_config_entry(
+        device_registry, entry.entry_id
+    ):
+        for domain, identifier in device_entry.identifiers:
+            if (
+                domain == DOMAIN
+                # Scene pseudo-devices are cleaned up by the scene platform
+                and not identifier.startswith(("tys", CLOUD_DEVICE_PREFIX))
+                and identifier not in device_manager.device_map
+            ):
+                device_registry.async_remove_device(device_entry.id)
                 break
 
 
+async def async_update_options(hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
+    """Reload the config entry when local control or profiling is toggled."""
+    # Token updates also trigger this listener, those must not reload the entry
+    manager = entry.runtime_data.manager
+    if bool(entry.options.get(CONF_LOCAL_CONTROL)) != (
+        manager.local is not None
+    ) or bool(entry.options.get(CONF_PROFILING)) != (manager.profiler is not None):
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> bool:
     """Unloading the Tuya platforms."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        tuya = entry.runtime_data
+    tuya = entry.runtime_data
+    # Deferred platforms may not have been set up yet
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, tuya.platforms
+    ):
         if tuya.manager.mq is not None:
             tuya.manager.mq.stop()
         tuya.manager.remove_device_listener(tuya.listener)
@@ -143,19 +436,34 @@ async def async_remove_entry(hass: HomeAssistant, entry: TuyaConfigEntry) -> Non
         entry.data[CONF_TOKEN_INFO],
     )
     await hass.async_add_executor_job(manager.unload)
+    await Store(
+        hass,
+        SCENE_STORAGE_VERSION,
+        SCENE_STORAGE_KEY.format(entry_id=entry.entry_id),
+    ).async_remove()
 
 
 class DeviceListener(SharingDeviceListener):
-    """Device Update Listener."""
+    """Device Update Listener.
+
+    Status updates arrive on the MQTT thread. They are queued and handed to
+    the event loop in batches, so a burst of messages wakes up the loop once
+    instead of once per message and entity.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
-        manager: Manager,
+        manager: TuyaManager,
     ) -> None:
         """Init DeviceListener."""
         self.hass = hass
         self.manager = manager
+        # Appending to and popping from a deque is thread-safe without a lock
+        self._updates: deque[tuple[CustomerDevice, list[str] | None, dict | None]] = (
+            deque()
+        )
+        self._drain_scheduled = False
 
     def update_device(
         self,
@@ -173,12 +481,57 @@ class DeviceListener(SharingDeviceListener):
             updated_status_properties,
             dp_timestamps,
         )
-        dispatcher_send(
-            self.hass,
-            f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}",
-            updated_status_properties,
-            dp_timestamps,
-        )
+        self.manager.metrics.confirm(device, updated_status_properties)
+        if self.manager.profiler is not None:
+            self.manager.profiler.messages += 1
+        self._updates.append((device, updated_status_properties, dp_timestamps))
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            self.hass.loop.call_soon_threadsafe(self._async_drain_updates)
+
+    @callback
+    def _async_drain_updates(self) -> None:
+        """Dispatch the queued status updates, merged per device."""
+        # Cleared first, updates queued from now on are either drained below
+        # or schedule another drain
+        self._drain_scheduled = False
+        merged: dict[str, tuple[CustomerDevice, set[str] | None, dict | None]] = {}
+        while self._updates:
+            device, properties, dp_timestamps = self._updates.popleft()
+            if (pending := merged.get(device.id)) is None:
+                merged[device.id] = (
+                    device,
+                    None if properties is None else set(properties),
+                    None if dp_timestamps is None else dict(dp_timestamps),
+                )
+                continue
+            _, merged_properties, merged_timestamps = pending
+            if merged_properties is not None:
+                if properties is None:
+                    # Unknown properties, all of them may have changed
+                    merged_properties = None
+                else:
+                    merged_properties.update(properties)
+            if dp_timestamps:
+                merged_timestamps = {**(merged_timestamps or {}), **dp_timestamps}
+            merged[device.id] = (device, merged_properties, merged_timestamps)
+
+        availability = self.manager.availability
+        for device, properties, dp_timestamps in merged.values():
+            if (
+                availability is not None
+                and not availability.async_update(device)
+                and properties is None
+            ):
+                # Online state or name reports, which did not change the
+                # debounced availability
+                continue
+            async_dispatcher_send(
+                self.hass,
+                f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}",
+                None if properties is None else list(properties),
+                dp_timestamps,
+            )
 
     def add_device(self, device: CustomerDevice) -> None:
         """Add device added listener."""
@@ -195,10 +548,19 @@ class DeviceListener(SharingDeviceListener):
         )
 
         dispatcher_send(self.hass, TUYA_DISCOVERY_NEW, [device.id])
+        # Runs after the discovery, which set up the device when it has
+        # enabled entities
+        self.hass.add_job(self.async_subscribe_devices)
 
     def remove_device(self, device_id: str) -> None:
         """Add device removed listener."""
         self.hass.add_job(self.async_remove_device, device_id)
+        self.hass.add_job(self.async_subscribe_devices)
+
+    @callback
+    def async_subscribe_devices(self) -> None:
+        """Update the MQTT subscription to the added or removed devices."""
+        self.hass.async_add_executor_job(self.manager.subscribe_devices)
 
     @callback
     def async_remove_device(self, device_id: str) -> None:
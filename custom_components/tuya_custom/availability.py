@@ -0,0 +1,131 @@
+"""Debounced availability of Tuya devices."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from tuya_sharing import CustomerDevice
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    CONF_AVAILABILITY_GRACE_PERIOD,
+    DEFAULT_AVAILABILITY_GRACE_PERIOD,
+    LOGGER,
+    TUYA_HA_SIGNAL_UPDATE_ENTITY,
+)
+
+if TYPE_CHECKING:
+    from . import TuyaConfigEntry
+
+
+class _DeviceAvailability:
+    """Availability of a device and its transitions."""
+
+    __slots__ = ("available", "cancel_offline", "flaps", "transitions")
+
+    def __init__(self, available: bool) -> None:
+        """Init _DeviceAvailability."""
+        self.available = available
+        self.cancel_offline: CALLBACK_TYPE | None = None
+        # Offline reports withdrawn within the grace period
+        self.flaps = 0
+        self.transitions = 0
+
+
+class AvailabilityTracker:
+    """Debounce the online state of devices.
+
+    A device going online is available at once. A device going offline only
+    becomes unavailable when it did not come back online within the grace
+    period, so a flapping online state does not make every entity of the
+    device write its state on each report.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: TuyaConfigEntry) -> None:
+        """Init AvailabilityTracker."""
+        self.hass = hass
+        self.entry = entry
+        self._devices: dict[str, _DeviceAvailability] = {}
+
+    def available(self, device: CustomerDevice) -> bool:
+        """Return the debounced availability of a device."""
+        if (state := self._devices.get(device.id)) is None:
+            # Tracked from the first time an entity of the device is written
+            state = self._devices[device.id] = _DeviceAvailability(bool(device.online))
+        return state.available
+
+    @callback
+    def async_update(self, device: CustomerDevice) -> bool:
+        """Track the online state of a device, return if availability changed."""
+        online = bool(device.online)
+        if (state := self._devices.get(device.id)) is None:
+            self._devices[device.id] = _DeviceAvailability(online)
+            return False
+
+        if online:
+            if state.cancel_offline is not None:
+                state.cancel_offline()
+                state.cancel_offline = None
+                state.flaps += 1
+                LOGGER.debug("Device %s is back online within grace period", device.id)
+            if state.available:
+                return False
+            self._set_available(device, state, True)
+            return True
+
+        if not state.available or state.cancel_offline is not None:
+            return False
+        if not (grace_period := self._grace_period):
+            self._set_available(device, state, False)
+            return True
+
+        @callback
+        def async_offline(_now: datetime) -> None:
+            """Make the device unavailable once the grace period passed."""
+            state.cancel_offline = None
+            self._set_available(device, state, False)
+            async_dispatcher_send(
+                self.hass, f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}", None, None
+            )
+
+        state.cancel_offline = async_call_later(self.hass, grace_period, async_offline)
+        return False
+
+    @property
+    def _grace_period(self) -> float:
+        """Return the grace period in seconds."""
+        return self.entry.options.get(
+            CONF_AVAILABILITY_GRACE_PERIOD, DEFAULT_AVAILABILITY_GRACE_PERIOD
+        )
+
+    @staticmethod
+    def _set_available(
+        device: CustomerDevice, state: _DeviceAvailability, available: bool
+    ) -> None:
+        """Change the availability of a device."""
+        state.available = available
+        state.transitions += 1
+        LOGGER.debug("Device %s is %s", device.id, "online" if available else "offline")
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the pending grace periods."""
+        for state in self._devices.values():
+            if state.cancel_offline is not None:
+                state.cancel_offline()
+                state.cancel_offline = None
+
+    def device_as_dict(self, device_id: str) -> dict[str, Any] | None:
+        """Represent the availability of a device as a dictionary."""
+        if (state := self._devices.get(device_id)) is None:
+            return None
+        return {
+            "available": state.available,
+            "offline_pending": state.cancel_offline is not None,
+            "flaps": state.flaps,
+            "transitions": state.transitions,
+        }
@@ -11,14 +11,22 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
-from homeassistant.const import EntityCategory
+from homeassistant.const import EntityCategory, Platform
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 from . import TuyaConfigEntry
-from .const import TUYA_DISCOVERY_NEW, DeviceCategory, DPCode
-from .entity import TuyaEntity
+from .breaker import BreakerState, CircuitBreaker
+from .const import (
+    CLOUD_DEVICE_PREFIX,
+    DOMAIN,
+    TUYA_DISCOVERY_NEW,
+    DeviceCategory,
+    DPCode,
+)
+from .entity import DisabledEntities, TuyaEntity
 from .models import DPCodeBitmapBitWrapper, DPCodeBooleanWrapper, DPCodeWrapper
 
 
@@ -422,17 +430,23 @@ async def async_setup_entry(
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered Tuya binary sensor."""
         entities: list[TuyaBinarySensorEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.BINARY_SENSOR)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := BINARY_SENSORS.get(device.category):
                 entities.extend(
                     TuyaBinarySensorEntity(device, manager, description, dpcode_wrapper)
                     for description in descriptions
-                    if (dpcode_wrapper := _get_dpcode_wrapper(device, description))
+                    if not disabled.skip(
+                        device, description.key, description.dpcode or description.key
+                    )
+                    and (dpcode_wrapper := _get_dpcode_wrapper(device, description))
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
+    # Not loaded for the breaker alone, its state is also in the diagnostics
+    async_add_entities([TuyaCloudBreakerEntity(entry, manager.breaker)])
     async_discover_device([*manager.device_map])
 
     entry.async_on_unload(
@@ -462,3 +476,35 @@ class TuyaBinarySensorEntity(TuyaEntity, BinarySensorEntity):
     def is_on(self) -> bool | None:
         """Return true if sensor is on."""
         return self._dpcode_wrapper.read_device_status(self.device)
+
+
+class TuyaCloudBreakerEntity(BinarySensorEntity):
+    """Problem sensor of the circuit breaker of the Tuya cloud endpoint."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_translation_key = "circuit_breaker"
+
+    def __init__(self, entry: TuyaConfigEntry, breaker: CircuitBreaker) -> None:
+        """Init Tuya cloud circuit breaker sensor."""
+        self._breaker = breaker
+        self._attr_unique_id = f"{CLOUD_DEVICE_PREFIX}{entry.entry_id}circuit_breaker"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{CLOUD_DEVICE_PREFIX}{entry.entry_id}")},
+            manufacturer="Tuya",
+            name="Tuya cloud",
+            model=breaker.endpoint,
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity is added to hass."""
+        # The breaker changes state on the worker threads making requests
+        self.async_on_remove(self._breaker.add_listener(self.schedule_update_ha_state))
+
+    @property
+    def is_on(self) -> bool:
+        """Return true while requests to the cloud endpoint fail fast."""
+        return self._breaker.state is not BreakerState.CLOSED
@@ -0,0 +1,156 @@
+"""Circuit breaker for the Tuya cloud endpoint."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from enum import StrEnum
+import random
+import threading
+import time
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN, LOGGER
+
+# Consecutive failed requests after which the breaker opens
+BREAKER_FAILURE_THRESHOLD = 5
+# Time until the first probe, doubled each time a probe fails
+BREAKER_BACKOFF = 15
+BREAKER_MAX_BACKOFF = 600
+# Spread of the backoff, so accounts on the same endpoint probe apart
+BREAKER_JITTER = 0.2
+
+
+class BreakerState(StrEnum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CloudUnavailable(HomeAssistantError):
+    """Raised when a request is not made as the cloud endpoint is failing."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        """Init CloudUnavailable."""
+        super().__init__(
+            translation_domain=DOMAIN,
+            translation_key="cloud_unavailable",
+            translation_placeholders={
+                "endpoint": endpoint,
+                "retry_in": str(max(round(retry_in), 0)),
+            },
+        )
+
+
+class CircuitBreaker:
+    """Fail fast while the cloud endpoint keeps failing.
+
+    The breaker opens after consecutive failed requests, so requests fail
+    at once instead of tying up a worker thread until they time out. Once
+    the backoff elapsed, a single probe request is let through. The breaker
+    closes when the probe succeeds and reopens with a longer backoff when
+    it fails.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        """Init CircuitBreaker."""
+        self.endpoint = endpoint
+        self.state = BreakerState.CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._probes_failed = 0
+        self._retry_at = 0.0
+        self._opened = 0
+        self._rejected = 0
+        self._last_error: str | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call a listener when the state changes, from any thread."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def before_request(self) -> bool:
+        """Check a request may be made, return if it is the probe.
+
+        Raises CloudUnavailable while the breaker is open.
+        """
+        with self._lock:
+            if self.state is BreakerState.CLOSED:
+                return False
+            now = time.monotonic()
+            if self.state is BreakerState.OPEN and now >= self._retry_at:
+                self.state = BreakerState.HALF_OPEN
+            else:
+                self._rejected += 1
+                raise CloudUnavailable(self.endpoint, self._retry_at - now)
+        self._notify()
+        return True
+
+    def cancel_probe(self) -> None:
+        """Let the next request probe, as the probe was not made."""
+        with self._lock:
+            if self.state is not BreakerState.HALF_OPEN:
+                return
+            self.state = BreakerState.OPEN
+        self._notify()
+
+    def record_success(self) -> None:
+        """Record a request the endpoint responded to."""
+        with self._lock:
+            self._failures = 0
+            self._probes_failed = 0
+            if self.state is BreakerState.CLOSED:
+                return
+            self.state = BreakerState.CLOSED
+        LOGGER.info("Tuya cloud endpoint %s recovered", self.endpoint)
+        self._notify()
+
+    def record_failure(self, error: Any) -> None:
+        """Record a request the endpoint failed to respond to."""
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            if self.state is BreakerState.OPEN or (
+                self.state is BreakerState.CLOSED
+                and self._failures < BREAKER_FAILURE_THRESHOLD
+            ):
+                return
+            if self.state is BreakerState.HALF_OPEN:
+                self._probes_failed += 1
+            backoff = min(
+                BREAKER_BACKOFF * 2**self._probes_failed, BREAKER_MAX_BACKOFF
+            ) * random.uniform(1 - BREAKER_JITTER, 1 + BREAKER_JITTER)
+            self._retry_at = time.monotonic() + backoff
+            self._opened += 1
+            self.state = BreakerState.OPEN
+        LOGGER.warning(
+            "Tuya cloud endpoint %s is failing, retrying in %.0f seconds: %s",
+            self.endpoint,
+            backoff,
+            error,
+        )
+        self._notify()
+
+    def _notify(self) -> None:
+        """Call the listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the breaker as a dictionary."""
+        with self._lock:
+            return {
+                "endpoint": self.endpoint,
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "retry_in": max(round(self._retry_at - time.monotonic(), 1), 0)
+                if self.state is BreakerState.OPEN
+                else None,
+                "opened": self._opened,
+                "rejected": self._rejected,
+                "last_error": self._last_error,
+            }
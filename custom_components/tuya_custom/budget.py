@@ -0,0 +1,150 @@
+"""Cloud request budget of a Tuya account."""
+
+from __future__ import annotations
+
+from enum import IntEnum
+import threading
+import time
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+# Sustained number of cloud requests per second, and the allowed burst
+BUDGET_RATE = 5.0
+BUDGET_BURST = 20
+
+
+class Priority(IntEnum):
+    """Priority of a cloud request, lower values are served first."""
+
+    INTERACTIVE = 0
+    CONFIRMATION = 1
+    BACKGROUND = 2
+
+
+# Part of the burst a priority leaves untouched for the higher priorities
+BUDGET_RESERVE = {
+    Priority.INTERACTIVE: 0.0,
+    Priority.CONFIRMATION: 0.25,
+    Priority.BACKGROUND: 0.5,
+}
+# Requests waiting longer than this for the budget are dropped
+BUDGET_MAX_WAIT = {
+    Priority.INTERACTIVE: 10.0,
+    Priority.CONFIRMATION: 5.0,
+    Priority.BACKGROUND: 30.0,
+}
+
+
+class CloudBudgetExceeded(HomeAssistantError):
+    """Raised when a cloud request is dropped as the budget is used up."""
+
+    def __init__(self, priority: Priority) -> None:
+        """Init CloudBudgetExceeded."""
+        super().__init__(
+            translation_domain=DOMAIN,
+            translation_key="cloud_budget_exceeded",
+            translation_placeholders={"priority": priority.name.lower()},
+        )
+        self.priority = priority
+
+
+class _Lane:
+    """Counters of the requests of a priority."""
+
+    __slots__ = ("deferred", "dropped", "granted", "waiting")
+
+    def __init__(self) -> None:
+        """Init _Lane."""
+        self.waiting = 0
+        self.granted = 0
+        self.deferred = 0
+        self.dropped = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the counters as a dictionary."""
+        return {
+            "waiting": self.waiting,
+            "granted": self.granted,
+            "deferred": self.deferred,
+            "dropped": self.dropped,
+        }
+
+
+class CloudBudget:
+    """Token bucket shared by the cloud requests of an account.
+
+    Requests are made from worker threads, which block until the bucket
+    holds a token for them. Lower priorities only take a token while the
+    bucket holds more than their reserve and no higher priority request is
+    waiting, so background polling never delays a user action.
+    """
+
+    def __init__(self, rate: float = BUDGET_RATE, burst: int = BUDGET_BURST) -> None:
+        """Init CloudBudget."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+        self._lanes = {priority: _Lane() for priority in Priority}
+
+    def acquire(self, priority: Priority) -> bool:
+        """Take a token, return False when the request has to be dropped."""
+        lane = self._lanes[priority]
+        reserve = self._burst * BUDGET_RESERVE[priority]
+        deadline = time.monotonic() + BUDGET_MAX_WAIT[priority]
+        deferred = False
+        with self._condition:
+            lane.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens - 1 >= reserve and not any(
+                        self._lanes[higher].waiting
+                        for higher in Priority
+                        if higher < priority
+                    ):
+                        self._tokens -= 1
+                        lane.granted += 1
+                        lane.deferred += deferred
+                        return True
+                    if now >= deadline:
+                        lane.dropped += 1
+                        return False
+                    deferred = True
+                    # Woken up early when a higher priority request leaves
+                    self._condition.wait(
+                        min(
+                            deadline - now,
+                            max(1 + reserve - self._tokens, 0) / self._rate
+                            or 1 / self._rate,
+                        )
+                    )
+            finally:
+                lane.waiting -= 1
+                self._condition.notify_all()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the budget use and queue depths as a dictionary."""
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                "rate": self._rate,
+                "burst": self._burst,
+                "tokens": round(self._tokens, 2),
+                **{
+                    priority.name.lower(): lane.as_dict()
+                    for priority, lane in self._lanes.items()
+                },
+            }
@@ -5,14 +5,14 @@ from __future__ import annotations
 from tuya_sharing import CustomerDevice, Manager
 
 from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
-from homeassistant.const import EntityCategory
+from homeassistant.const import EntityCategory, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 from . import TuyaConfigEntry
 from .const import TUYA_DISCOVERY_NEW, DeviceCategory, DPCode
-from .entity import TuyaEntity
+from .entity import DisabledEntities, TuyaEntity
 from .models import DPCodeBooleanWrapper
 
 BUTTONS: dict[DeviceCategory, tuple[ButtonEntityDescription, ...]] = {
@@ -77,20 +77,22 @@ async def async_setup_entry(
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered Tuya buttons."""
         entities: list[TuyaButtonEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.BUTTON)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := BUTTONS.get(device.category):
                 entities.extend(
                     TuyaButtonEntity(device, manager, description, dpcode_wrapper)
                     for description in descriptions
-                    if (
+                    if not disabled.skip(device, description.key, description.key)
+                    and (
                         dpcode_wrapper := DPCodeBooleanWrapper.find_dpcode(
                             device, description.key, prefer_function=True
                         )
                     )
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
     async_discover_device([*manager.device_map])
 
@@ -2,24 +2,79 @@
 
 from __future__ import annotations
 
-from tuya_sharing import CustomerDevice, Manager
+import asyncio
+import base64
+import binascii
+import time
+
+from aiohttp import ClientError
+from tuya_sharing import CustomerDevice
 
 from homeassistant.components import ffmpeg
-from homeassistant.components.camera import Camera as CameraEntity, CameraEntityFeature
+from homeassistant.components.camera import (
+    Camera as CameraEntity,
+    CameraEntityFeature,
+    Image,
+)
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 from . import TuyaConfigEntry
-from .const import TUYA_DISCOVERY_NEW, DeviceCategory, DPCode
+from .budget import Priority
+from .const import (
+    CONF_SNAPSHOT_MAX_AGE,
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    DOMAIN,
+    LOGGER,
+    TUYA_DISCOVERY_NEW,
+    DeviceCategory,
+    DPCode,
+)
 from .entity import TuyaEntity
-from .models import DPCodeBooleanWrapper
+from .manager import TuyaManager
+from .models import DPCodeBooleanWrapper, DPCodeWrapper
+from .util import SingleFlight, get_dpcode
 
 CAMERAS: tuple[DeviceCategory, ...] = (
     DeviceCategory.DGHSXJ,
     DeviceCategory.SP,
 )
 
+# The SDK does not return the lifetime of an allocated stream URL,
+# assume a conservative one and allocate a new URL ahead of it.
+STREAM_URL_TTL = 60
+STREAM_URL_REFRESH_AHEAD = 15
+
+# A failed frame grab is not retried within this many seconds, nor within
+# the maximum snapshot age
+SNAPSHOT_RETRY_INTERVAL = 10
+
+EVENT_PICTURE_TIMEOUT = 10
+
+
+class _PictureUrlWrapper(DPCodeWrapper):
+    """Wrapper for doorbell and motion pictures, reported as (base64) URLs."""
+
+    def read_device_status(self, device: CustomerDevice) -> str | None:
+        """Read the picture URL for the dpcode."""
+        if not (raw_value := self._read_device_status_raw(device)) or not isinstance(
+            raw_value, str
+        ):
+            return None
+        if raw_value.startswith(("http://", "https://")):
+            return raw_value
+        try:
+            decoded = base64.b64decode(raw_value).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+        # Other formats reference encrypted cloud storage objects
+        if decoded.startswith(("http://", "https://")):
+            return decoded
+        return None
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -46,6 +101,14 @@ async def async_setup_entry(
                         recording_status=DPCodeBooleanWrapper.find_dpcode(
                             device, DPCode.RECORD_SWITCH
                         ),
+                        pictures=[
+                            _PictureUrlWrapper(dpcode)
+                            for dpcode in (
+                                DPCode.DOORBELL_PIC,
+                                DPCode.MOVEMENT_DETECT_PIC,
+                            )
+                            if get_dpcode(device, dpcode)
+                        ],
                     )
                 )
 
@@ -68,10 +131,11 @@ class TuyaCameraEntity(TuyaEntity, CameraEntity):
     def __init__(
         self,
         device: CustomerDevice,
-        device_manager: Manager,
+        device_manager: TuyaManager,
         *,
         motion_detection_switch: DPCodeBooleanWrapper | None = None,
         recording_status: DPCodeBooleanWrapper | None = None,
+        pictures: list[_PictureUrlWrapper] | None = None,
     ) -> None:
         """Init Tuya Camera."""
         super().__init__(device, device_manager)
@@ -79,6 +143,14 @@ class TuyaCameraEntity(TuyaEntity, CameraEntity):
         self._attr_model = device.product_name
         self._motion_detection_switch = motion_detection_switch
         self._recording_status = recording_status
+        self._stream_source = _StreamSourceCache(self, device, device_manager)
+        self._snapshot = _SnapshotCache(self, self._stream_source)
+        self._pictures = pictures or []
+        # Only pictures pushed after setup are new events
+        self._picture_urls = {
+            wrapper.dpcode: wrapper.read_device_status(device)
+            for wrapper in self._pictures
+        }
 
     @property
     def is_recording(self) -> bool:
@@ -94,27 +166,35 @@ class TuyaCameraEntity(TuyaEntity, CameraEntity):
             return status
         return False
 
+    async def _handle_state_update(
+        self,
+        updated_status_properties: list[str] | None,
+        dp_timestamps: dict | None = None,
+    ) -> None:
+        """Use pushed doorbell and motion pictures as still image."""
+        for wrapper in self._pictures:
+            if (
+                updated_status_properties
+                and wrapper.dpcode in updated_status_properties
+                and (url := wrapper.read_device_status(self.device))
+                and url != self._picture_urls[wrapper.dpcode]
+            ):
+                self._picture_urls[wrapper.dpcode] = url
+                self.hass.async_create_background_task(
+                    self._snapshot.async_fetch_picture(url),
+                    f"{DOMAIN} {self.device.id} {wrapper.dpcode} fetch",
+                )
+        await super()._handle_state_update(updated_status_properties, dp_timestamps)
+
     async def stream_source(self) -> str | None:
         """Return the source of the stream."""
-        return await self.hass.async_add_executor_job(
-            self.device_manager.get_device_stream_allocate,
-            self.device.id,
-            "rtsp",
-        )
+        return await self._stream_source.async_get()
 
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
         """Return a still image response from the camera."""
-        stream_source = await self.stream_source()
-        if not stream_source:
-            return None
-        return await ffmpeg.async_get_image(
-            self.hass,
-            stream_source,
-            width=width,
-            height=height,
-        )
+        return await self._snapshot.async_get(width, height)
 
     async def async_enable_motion_detection(self) -> None:
         """Enable motion detection in the camera."""
@@ -123,3 +203,155 @@ class TuyaCameraEntity(TuyaEntity, CameraEntity):
     async def async_disable_motion_detection(self) -> None:
         """Disable motion detection in camera."""
         await self._async_send_dpcode_update(self._motion_detection_switch, False)
+
+
+class _StreamSourceCache:
+    """Cache the allocated RTSP URL of a camera until it expires.
+
+    A new URL is allocated in the background when a cached URL is used
+    shortly before it expires. Concurrent allocations are deduplicated.
+    """
+
+    def __init__(
+        self, entity: TuyaCameraEntity, device: CustomerDevice, manager: TuyaManager
+    ) -> None:
+        """Init _StreamSourceCache."""
+        self._entity = entity
+        self._device = device
+        self._manager = manager
+        self._url: str | None = None
+        self._expires_at = 0.0
+        self._allocation: SingleFlight[str | None] = SingleFlight()
+
+    async def async_get(self) -> str | None:
+        """Return a valid stream URL, allocating one if needed."""
+        now = time.monotonic()
+        if self._url is None or now >= self._expires_at:
+            return await self._allocation.async_run(self._async_allocate)
+
+        if (
+            now >= self._expires_at - STREAM_URL_REFRESH_AHEAD
+            and not self._allocation.in_flight
+        ):
+            self._entity.hass.async_create_background_task(
+                self._async_refresh(),
+                f"{DOMAIN} {self._device.id} stream allocation",
+            )
+        return self._url
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Forget the cached URL, for example when it stopped working."""
+        self._url = None
+
+    async def _async_refresh(self) -> None:
+        """Allocate a new URL ahead of the expiry of the cached one."""
+        try:
+            await self._allocation.async_run(self._async_allocate)
+        except Exception as err:  # noqa: BLE001
+            # The cached URL remains in use until it expires
+            LOGGER.debug(
+                "Unable to refresh stream URL for device %s: %s", self._device.id, err
+            )
+
+    async def _async_allocate(self) -> str | None:
+        """Allocate a stream URL through the Tuya cloud."""
+        requested_at = time.monotonic()
+        url = await self._entity.hass.async_add_executor_job(
+            self._manager.call_cloud,
+            Priority.INTERACTIVE,
+            self._manager.get_device_stream_allocate,
+            self._device.id,
+            "rtsp",
+        )
+        self._url = url
+        self._expires_at = requested_at + STREAM_URL_TTL
+        return url
+
+
+class _SnapshotCache:
+    """Cache the last still image of a camera.
+
+    The frame is either grabbed from the stream or pushed by a doorbell or
+    motion event. Concurrent requests share a single ffmpeg frame grab, and
+    resized variants are derived from the cached frame.
+    """
+
+    def __init__(
+        self, entity: TuyaCameraEntity, stream_source: _StreamSourceCache
+    ) -> None:
+        """Init _SnapshotCache."""
+        self._entity = entity
+        self._stream_source = stream_source
+        self._image: bytes | None = None
+        self._captured_at = 0.0
+        # Set when a grab starts and cleared by a new frame, so a failed grab
+        # is not retried by every request
+        self._retry_at = 0.0
+        self._resized: dict[tuple[int, int], bytes] = {}
+        self._grab: SingleFlight[bytes | None] = SingleFlight()
+
+    async def async_get(self, width: int | None, height: int | None) -> bytes | None:
+        """Return a still image, grabbing a new frame if the cached one is stale."""
+        image = self._image
+        now = time.monotonic()
+        if (
+            image is None or now - self._captured_at > self._max_age
+        ) and now >= self._retry_at:
+            image = await self._grab.async_run(self._async_grab)
+
+        if image is None or (width is None and height is None):
+            return image
+
+        # A missing dimension does not limit the scaling
+        size = (width or 0, height or 0)
+        if (resized := self._resized.get(size)) is None:
+            resized = await self._entity.hass.async_add_executor_job(
+                scale_jpeg_camera_image, Image("image/jpeg", image), *size
+            )
+            # The frame may have been replaced while resizing
+            if image is self._image:
+                self._resized[size] = resized
+        return resized
+
+    @property
+    def _max_age(self) -> float:
+        """Return the maximum age of the cached frame in seconds."""
+        return self._entity.platform.config_entry.options.get(
+            CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE
+        )
+
+    @callback
+    def async_set_image(self, image: bytes) -> None:
+        """Replace the cached frame."""
+        self._image = image
+        self._captured_at = time.monotonic()
+        self._retry_at = 0.0
+        self._resized.clear()
+
+    async def async_fetch_picture(self, url: str) -> None:
+        """Use a picture pushed by the camera as the cached frame."""
+        session = async_get_clientsession(self._entity.hass)
+        try:
+            async with asyncio.timeout(EVENT_PICTURE_TIMEOUT):
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    image = await response.read()
+        except (TimeoutError, ClientError) as err:
+            LOGGER.debug("Unable to fetch event picture: %s", err)
+            return
+        self.async_set_image(image)
+
+    async def _async_grab(self) -> bytes | None:
+        """Grab a full size frame from the camera stream."""
+        self._retry_at = time.monotonic() + max(self._max_age, SNAPSHOT_RETRY_INTERVAL)
+        if not (stream_source := await self._stream_source.async_get()):
+            return None
+        if (
+            image := await ffmpeg.async_get_image(self._entity.hass, stream_source)
+        ) is None:
+            # The stream URL may have expired before its assumed lifetime
+            self._stream_source.async_invalidate()
+            return self._image
+        self.async_set_image(image)
+        return image
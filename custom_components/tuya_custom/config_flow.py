@@ -8,14 +8,33 @@ from typing import Any
 from tuya_sharing import LoginControl
 import voluptuous as vol
 
-from homeassistant.config_entries import SOURCE_REAUTH, ConfigFlow, ConfigFlowResult
-from homeassistant.helpers import selector
+from homeassistant.config_entries import (
+    SOURCE_REAUTH,
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.const import CONF_ENTITY_ID, Platform
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er, selector
 
 from .const import (
+    COMMAND_LATENCY_KEY_PREFIX,
+    CONF_AVAILABILITY_GRACE_PERIOD,
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
     CONF_ENDPOINT,
+    CONF_LOCAL_CONTROL,
+    CONF_MIN_INTERVAL,
+    CONF_PROFILING,
+    CONF_SENSOR_THROTTLING,
+    CONF_SNAPSHOT_MAX_AGE,
     CONF_TERMINAL_ID,
     CONF_TOKEN_INFO,
     CONF_USER_CODE,
+    DEFAULT_AVAILABILITY_GRACE_PERIOD,
+    DEFAULT_SNAPSHOT_MAX_AGE,
     DOMAIN,
     TUYA_CLIENT_ID,
     TUYA_RESPONSE_CODE,
@@ -37,6 +56,12 @@ class TuyaConfigFlow(ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self.__login_control = LoginControl()
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> TuyaOptionsFlow:
+        """Get the options flow for this handler."""
+        return TuyaOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -203,3 +228,155 @@ class TuyaConfigFlow(ConfigFlow, domain=DOMAIN):
             self.__user_code = user_code
             self.__qr_code = response[TUYA_RESPONSE_RESULT][TUYA_RESPONSE_QR_CODE]
         return success, response
+
+
+class TuyaOptionsFlow(OptionsFlow):
+    """Tuya options flow."""
+
+    _throttled_unique_id: str
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        return self.async_show_menu(
+            step_id="init", menu_options=["settings", "sensor_throttling"]
+        )
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the settings of the account."""
+        if user_input is not None:
+            return self.async_create_entry(
+                data={**self.config_entry.options, **user_input}
+            )
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SNAPSHOT_MAX_AGE,
+                        default=options.get(
+                            CONF_SNAPSHOT_MAX_AGE, DEFAULT_SNAPSHOT_MAX_AGE
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=300,
+                            step=1,
+                            unit_of_measurement="s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_AVAILABILITY_GRACE_PERIOD,
+                        default=options.get(
+                            CONF_AVAILABILITY_GRACE_PERIOD,
+                            DEFAULT_AVAILABILITY_GRACE_PERIOD,
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=600,
+                            step=1,
+                            unit_of_measurement="s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_LOCAL_CONTROL,
+                        default=options.get(CONF_LOCAL_CONTROL, False),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_PROFILING,
+                        default=options.get(CONF_PROFILING, False),
+                    ): selector.BooleanSelector(),
+                }
+            ),
+        )
+
+    async def async_step_sensor_throttling(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Select the sensor to throttle the state writes of."""
+        sensors = self._async_throttleable_sensors()
+        if user_input is not None:
+            if (unique_id := sensors.get(user_input[CONF_ENTITY_ID])) is None:
+                return self.async_abort(reason="entity_not_found")
+            self._throttled_unique_id = unique_id
+            return await self.async_step_sensor_throttling_settings()
+
+        if not sensors:
+            return self.async_abort(reason="no_sensors")
+        return self.async_show_form(
+            step_id="sensor_throttling",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ENTITY_ID): selector.EntitySelector(
+                        selector.EntitySelectorConfig(include_entities=list(sensors))
+                    ),
+                }
+            ),
+        )
+
+    @callback
+    def _async_throttleable_sensors(self) -> dict[str, str]:
+        """Return the unique IDs of the Tuya sensors by entity ID."""
+        entity_registry = er.async_get(self.hass)
+        return {
+            entity_entry.entity_id: entity_entry.unique_id
+            for entity_entry in er.async_entries_for_config_entry(
+                entity_registry, self.config_entry.entry_id
+            )
+            if entity_entry.domain == Platform.SENSOR
+            # Command latency sensors are written by the integration itself
+            and COMMAND_LATENCY_KEY_PREFIX not in entity_entry.unique_id
+        }
+
+    async def async_step_sensor_throttling_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Throttle the state writes of the selected sensor."""
+        throttling = dict(self.config_entry.options.get(CONF_SENSOR_THROTTLING, {}))
+        if user_input is not None:
+            throttling[self._throttled_unique_id] = user_input
+            if not user_input[CONF_DEADBAND] and not user_input[CONF_MIN_INTERVAL]:
+                # Nothing to throttle, the sensor writes every update again
+                del throttling[self._throttled_unique_id]
+            return self.async_create_entry(
+                data={**self.config_entry.options, CONF_SENSOR_THROTTLING: throttling}
+            )
+
+        current = throttling.get(self._throttled_unique_id, {})
+        return self.async_show_form(
+            step_id="sensor_throttling_settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DEADBAND, default=current.get(CONF_DEADBAND, 0)
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0, step="any", mode=selector.NumberSelectorMode.BOX
+                        )
+                    ),
+                    vol.Required(
+                        CONF_DEADBAND_RELATIVE,
+                        default=current.get(CONF_DEADBAND_RELATIVE, False),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_MIN_INTERVAL, default=current.get(CONF_MIN_INTERVAL, 0)
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=3600,
+                            step=1,
+                            unit_of_measurement="s",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                }
+            ),
+        )
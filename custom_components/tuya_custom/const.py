@@ -37,6 +37,21 @@ CONF_TOKEN_INFO = "token_info"
 CONF_USER_CODE = "user_code"
 CONF_USERNAME = "username"
 
+CONF_SNAPSHOT_MAX_AGE = "snapshot_max_age"
+DEFAULT_SNAPSHOT_MAX_AGE = 10
+CONF_LOCAL_CONTROL = "local_control"
+CONF_PROFILING = "profiling"
+CONF_AVAILABILITY_GRACE_PERIOD = "availability_grace_period"
+DEFAULT_AVAILABILITY_GRACE_PERIOD = 30
+# Deadband and minimum write interval per sensor, by unique ID
+CONF_SENSOR_THROTTLING = "sensor_throttling"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_RELATIVE = "deadband_relative"
+CONF_MIN_INTERVAL = "min_interval"
+
+# Key prefix of the command latency sensors, written by the integration
+COMMAND_LATENCY_KEY_PREFIX = "command_latency_"
+
 TUYA_CLIENT_ID = "HA_3y9q4ak7g4ephrvke"
 TUYA_SCHEMA = "haauthorize"
 
@@ -49,6 +64,12 @@ TUYA_RESPONSE_QR_CODE = "qrcode"
 TUYA_RESPONSE_RESULT = "result"
 TUYA_RESPONSE_SUCCESS = "success"
 
+SCENE_STORAGE_KEY = f"{DOMAIN}.{{entry_id}}.scenes"
+SCENE_STORAGE_VERSION = 1
+
+# Identifier prefix of the pseudo-device representing the cloud of an account
+CLOUD_DEVICE_PREFIX = "tyc"
+
 PLATFORMS = [
     Platform.ALARM_CONTROL_PANEL,
     Platform.BINARY_SENSOR,
@@ -69,6 +90,18 @@ PLATFORMS = [
     Platform.VACUUM,
     Platform.VALVE,
 ]
+# Platforms set up first, as most devices are represented by them
+CRITICAL_PLATFORMS = [
+    Platform.COVER,
+    Platform.LIGHT,
+    Platform.SENSOR,
+    Platform.SWITCH,
+]
+# Slow or network-bound platforms, set up once Home Assistant has started
+DEFERRED_PLATFORMS = [
+    Platform.CAMERA,
+    Platform.SCENE,
+]
 
 
 class WorkMode(StrEnum):
@@ -595,6 +628,337 @@ class DeviceCategory(StrEnum):
     """Pool HeatPump (undocumented)"""
 
 
+# Device categories each platform creates entities for, so platforms without
+# any matching device need not be loaded. Keep in sync with the description
+# tables of the platforms. Scenes do not depend on devices.
+PLATFORM_CATEGORIES: dict[Platform, frozenset[DeviceCategory]] = {
+    Platform.ALARM_CONTROL_PANEL: frozenset(
+        {
+            DeviceCategory.MAL,
+        }
+    ),
+    Platform.BINARY_SENSOR: frozenset(
+        {
+            DeviceCategory.CO2BJ,
+            DeviceCategory.COBJ,
+            DeviceCategory.CS,
+            DeviceCategory.CWWSQ,
+            DeviceCategory.DGNBJ,
+            DeviceCategory.HPS,
+            DeviceCategory.JQBJ,
+            DeviceCategory.JWBJ,
+            DeviceCategory.LDCG,
+            DeviceCategory.MC,
+            DeviceCategory.MCS,
+            DeviceCategory.MK,
+            DeviceCategory.MSP,
+            DeviceCategory.PIR,
+            DeviceCategory.PM2_5,
+            DeviceCategory.QXJ,
+            DeviceCategory.RQBJ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SJ,
+            DeviceCategory.SOS,
+            DeviceCategory.VOC,
+            DeviceCategory.WG2,
+            DeviceCategory.WK,
+            DeviceCategory.WKF,
+            DeviceCategory.WSDCG,
+            DeviceCategory.YLCG,
+            DeviceCategory.YWBJ,
+            DeviceCategory.ZD,
+        }
+    ),
+    Platform.BUTTON: frozenset(
+        {
+            DeviceCategory.HXD,
+            DeviceCategory.MSP,
+            DeviceCategory.SD,
+        }
+    ),
+    Platform.CAMERA: frozenset(
+        {
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.SP,
+        }
+    ),
+    Platform.CLIMATE: frozenset(
+        {
+            DeviceCategory.DBL,
+            DeviceCategory.KT,
+            DeviceCategory.QN,
+            DeviceCategory.RS,
+            DeviceCategory.WK,
+            DeviceCategory.WKF,
+        }
+    ),
+    Platform.COVER: frozenset(
+        {
+            DeviceCategory.CKMKZQ,
+            DeviceCategory.CL,
+            DeviceCategory.CLKG,
+            DeviceCategory.JDCLJQR,
+        }
+    ),
+    Platform.EVENT: frozenset(
+        {
+            DeviceCategory.WXKG,
+        }
+    ),
+    Platform.FAN: frozenset(
+        {
+            DeviceCategory.CS,
+            DeviceCategory.FS,
+            DeviceCategory.FSD,
+            DeviceCategory.FSKG,
+            DeviceCategory.KJ,
+            DeviceCategory.KS,
+        }
+    ),
+    Platform.HUMIDIFIER: frozenset(
+        {
+            DeviceCategory.CS,
+            DeviceCategory.JSQ,
+        }
+    ),
+    Platform.LIGHT: frozenset(
+        {
+            DeviceCategory.BZYD,
+            DeviceCategory.CLKG,
+            DeviceCategory.CZ,
+            DeviceCategory.DC,
+            DeviceCategory.DD,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DJ,
+            DeviceCategory.DSD,
+            DeviceCategory.FS,
+            DeviceCategory.FSD,
+            DeviceCategory.FWD,
+            DeviceCategory.GYD,
+            DeviceCategory.HXD,
+            DeviceCategory.JSQ,
+            DeviceCategory.KG,
+            DeviceCategory.KJ,
+            DeviceCategory.KS,
+            DeviceCategory.KT,
+            DeviceCategory.MBD,
+            DeviceCategory.MSP,
+            DeviceCategory.PC,
+            DeviceCategory.QJDCZ,
+            DeviceCategory.QN,
+            DeviceCategory.SP,
+            DeviceCategory.SZ,
+            DeviceCategory.TDQ,
+            DeviceCategory.TGKG,
+            DeviceCategory.TGQ,
+            DeviceCategory.TYD,
+            DeviceCategory.TYNDJ,
+            DeviceCategory.XDD,
+            DeviceCategory.YKQ,
+        }
+    ),
+    Platform.NUMBER: frozenset(
+        {
+            DeviceCategory.BH,
+            DeviceCategory.BZYD,
+            DeviceCategory.CO2BJ,
+            DeviceCategory.CWWSQ,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DGNBJ,
+            DeviceCategory.FS,
+            DeviceCategory.HPS,
+            DeviceCategory.JSQ,
+            DeviceCategory.KFJ,
+            DeviceCategory.MAL,
+            DeviceCategory.MSP,
+            DeviceCategory.MZJ,
+            DeviceCategory.SD,
+            DeviceCategory.SFKZQ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SP,
+            DeviceCategory.SWTZ,
+            DeviceCategory.SZJQR,
+            DeviceCategory.TGKG,
+            DeviceCategory.TGQ,
+            DeviceCategory.WK,
+            DeviceCategory.XNYJCN,
+            DeviceCategory.YWCGQ,
+            DeviceCategory.ZD,
+            DeviceCategory.ZNRB,
+        }
+    ),
+    Platform.SELECT: frozenset(
+        {
+            DeviceCategory.CL,
+            DeviceCategory.CO2BJ,
+            DeviceCategory.CS,
+            DeviceCategory.CWJWQ,
+            DeviceCategory.CZ,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DGNBJ,
+            DeviceCategory.DR,
+            DeviceCategory.FS,
+            DeviceCategory.JSQ,
+            DeviceCategory.KFJ,
+            DeviceCategory.KG,
+            DeviceCategory.KJ,
+            DeviceCategory.PC,
+            DeviceCategory.QN,
+            DeviceCategory.SD,
+            DeviceCategory.SFKZQ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SJZ,
+            DeviceCategory.SP,
+            DeviceCategory.SZJQR,
+            DeviceCategory.TDQ,
+            DeviceCategory.TGKG,
+            DeviceCategory.TGQ,
+            DeviceCategory.XNYJCN,
+        }
+    ),
+    Platform.SENSOR: frozenset(
+        {
+            DeviceCategory.AQCZ,
+            DeviceCategory.BH,
+            DeviceCategory.CL,
+            DeviceCategory.CO2BJ,
+            DeviceCategory.COBJ,
+            DeviceCategory.CS,
+            DeviceCategory.CWJWQ,
+            DeviceCategory.CWWSQ,
+            DeviceCategory.CWYSJ,
+            DeviceCategory.CZ,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DGNBJ,
+            DeviceCategory.DLQ,
+            DeviceCategory.FS,
+            DeviceCategory.GGQ,
+            DeviceCategory.HJJCY,
+            DeviceCategory.JQBJ,
+            DeviceCategory.JSQ,
+            DeviceCategory.JWBJ,
+            DeviceCategory.KG,
+            DeviceCategory.KJ,
+            DeviceCategory.LDCG,
+            DeviceCategory.MC,
+            DeviceCategory.MCS,
+            DeviceCategory.MSP,
+            DeviceCategory.MZJ,
+            DeviceCategory.PC,
+            DeviceCategory.PIR,
+            DeviceCategory.PM2_5,
+            DeviceCategory.QN,
+            DeviceCategory.QXJ,
+            DeviceCategory.RQBJ,
+            DeviceCategory.SD,
+            DeviceCategory.SFKZQ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SJ,
+            DeviceCategory.SOS,
+            DeviceCategory.SP,
+            DeviceCategory.SWTZ,
+            DeviceCategory.SZ,
+            DeviceCategory.SZJCY,
+            DeviceCategory.SZJQR,
+            DeviceCategory.TDQ,
+            DeviceCategory.TYNDJ,
+            DeviceCategory.VOC,
+            DeviceCategory.WK,
+            DeviceCategory.WKCZ,
+            DeviceCategory.WKF,
+            DeviceCategory.WNYKQ,
+            DeviceCategory.WSDCG,
+            DeviceCategory.WXKG,
+            DeviceCategory.XNYJCN,
+            DeviceCategory.YLCG,
+            DeviceCategory.YWBJ,
+            DeviceCategory.YWCGQ,
+            DeviceCategory.ZD,
+            DeviceCategory.ZNDB,
+            DeviceCategory.ZNNBQ,
+            DeviceCategory.ZNRB,
+            DeviceCategory.ZWJCY,
+        }
+    ),
+    Platform.SIREN: frozenset(
+        {
+            DeviceCategory.CO2BJ,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DGNBJ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SP,
+        }
+    ),
+    Platform.SWITCH: frozenset(
+        {
+            DeviceCategory.BH,
+            DeviceCategory.BZYD,
+            DeviceCategory.CJKG,
+            DeviceCategory.CL,
+            DeviceCategory.CN,
+            DeviceCategory.CS,
+            DeviceCategory.CWJWQ,
+            DeviceCategory.CWWSQ,
+            DeviceCategory.CWYSJ,
+            DeviceCategory.CZ,
+            DeviceCategory.DGHSXJ,
+            DeviceCategory.DJ,
+            DeviceCategory.DLQ,
+            DeviceCategory.DR,
+            DeviceCategory.FS,
+            DeviceCategory.FSD,
+            DeviceCategory.GGQ,
+            DeviceCategory.HXD,
+            DeviceCategory.JSQ,
+            DeviceCategory.KG,
+            DeviceCategory.KJ,
+            DeviceCategory.KS,
+            DeviceCategory.KT,
+            DeviceCategory.MAL,
+            DeviceCategory.MSP,
+            DeviceCategory.MZJ,
+            DeviceCategory.PC,
+            DeviceCategory.QCCDZ,
+            DeviceCategory.QJDCZ,
+            DeviceCategory.QN,
+            DeviceCategory.QXJ,
+            DeviceCategory.SD,
+            DeviceCategory.SFKZQ,
+            DeviceCategory.SGBJ,
+            DeviceCategory.SJZ,
+            DeviceCategory.SP,
+            DeviceCategory.SZ,
+            DeviceCategory.SZJQR,
+            DeviceCategory.TDQ,
+            DeviceCategory.TYNDJ,
+            DeviceCategory.WG2,
+            DeviceCategory.WK,
+            DeviceCategory.WKCZ,
+            DeviceCategory.WKF,
+            DeviceCategory.WNYKQ,
+            DeviceCategory.WSDCG,
+            DeviceCategory.XDD,
+            DeviceCategory.XNYJCN,
+            DeviceCategory.XXJ,
+            DeviceCategory.YWBJ,
+            DeviceCategory.ZNDB,
+            DeviceCategory.ZNJXS,
+            DeviceCategory.ZNRB,
+        }
+    ),
+    Platform.VACUUM: frozenset(
+        {
+            DeviceCategory.SD,
+        }
+    ),
+    Platform.VALVE: frozenset(
+        {
+            DeviceCategory.SFKZQ,
+        }
+    ),
+}
+
+
 class DPCode(StrEnum):
     """Data Point Codes used by Tuya.
 
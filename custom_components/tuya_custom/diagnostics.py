@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Collection
 from typing import Any
 
 from tuya_sharing import CustomerDevice
@@ -14,6 +16,15 @@ from homeassistant.util import dt as dt_util
 
 from . import TuyaConfigEntry
 from .const import DOMAIN, DPCode
+from .manager import TuyaManager
+
+# Number of devices represented in between yielding to the event loop
+DIAGNOSTICS_CHUNK_SIZE = 10
+
+# Every device with its own functions, status ranges and entities
+FORMAT_VERSION_FULL = 1
+# Product specs stored once, devices only keep their status
+FORMAT_VERSION_PRODUCTS = 2
 
 _REDACTED_DPCODES = {
     DPCode.ALARM_MESSAGE,
@@ -27,54 +38,122 @@ async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: TuyaConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
-    return _async_get_diagnostics(hass, entry)
+    return {
+        **async_get_diagnostics_header(entry),
+        "devices": [
+            device async for device in async_iter_device_diagnostics(hass, entry)
+        ],
+    }
 
 
 async def async_get_device_diagnostics(
     hass: HomeAssistant, entry: TuyaConfigEntry, device: DeviceEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a device entry."""
-    return _async_get_diagnostics(hass, entry, device)
+    manager = entry.runtime_data.manager
+    # The cloud service and scene devices are not Tuya devices
+    for domain, identifier in device.identifiers:
+        if domain == DOMAIN and (tuya_device := manager.device_map.get(identifier)):
+            return _async_entry_as_dict(entry) | _async_device_as_dict(
+                hass, manager, tuya_device
+            )
+    return _async_entry_as_dict(entry)
 
 
-@callback
-def _async_get_diagnostics(
+async def async_iter_device_diagnostics(
     hass: HomeAssistant,
     entry: TuyaConfigEntry,
-    device: DeviceEntry | None = None,
-) -> dict[str, Any]:
-    """Return diagnostics for a config entry."""
+    *,
+    categories: Collection[str] | None = None,
+    online_only: bool = False,
+    include_states: bool = True,
+    compact: bool = False,
+    products: dict[str, dict[str, Any]] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Represent the devices of a config entry, a chunk of devices at a time.
+
+    In compact mode, the functions and status ranges are only included
+    for the first device of each product. When a products dictionary is
+    passed, devices are only represented by their status (format version 2)
+    and the spec of their products is added to the dictionary instead.
+    """
+    manager = entry.runtime_data.manager
+    first_of_product: dict[str, str] = {}
+    for index, device in enumerate(list(manager.device_map.values())):
+        if index and not index % DIAGNOSTICS_CHUNK_SIZE:
+            # Let the event loop run other jobs in between chunks
+            await asyncio.sleep(0)
+        if (categories and device.category not in categories) or (
+            online_only and not device.online
+        ):
+            continue
+
+        if products is not None:
+            if device.product_id not in products:
+                products[device.product_id] = _async_product_as_dict(device)
+            yield _async_device_status_as_dict(device)
+            continue
+
+        same_product_as = first_of_product.setdefault(device.product_id, device.id)
+        if not compact or same_product_as == device.id:
+            yield _async_device_as_dict(
+                hass, manager, device, include_states=include_states
+            )
+            continue
+
+        data = _async_device_as_dict(
+            hass, manager, device, include_spec=False, include_states=include_states
+        )
+        data["same_product_as"] = same_product_as
+        yield data
+
+
+@callback
+def async_get_diagnostics_header(entry: TuyaConfigEntry) -> dict[str, Any]:
+    """Return the config entry diagnostics, apart from the devices."""
+    return {
+        **_async_entry_as_dict(entry),
+        "command_latency": entry.runtime_data.manager.metrics.categories_as_dict(),
+    }
+
+
+@callback
+def _async_entry_as_dict(entry: TuyaConfigEntry) -> dict[str, Any]:
+    """Represent a config entry as a dictionary."""
     manager = entry.runtime_data.manager
 
     mqtt_connected = None
     if manager.mq.client:
         mqtt_connected = manager.mq.client.is_connected()
 
-    data = {
+    return {
         "endpoint": manager.customer_api.endpoint,
         "terminal_id": manager.terminal_id,
         "mqtt_connected": mqtt_connected,
+        "mqtt_subscription": manager.subscription_diagnostics(),
         "disabled_by": entry.disabled_by,
         "disabled_polling": entry.pref_disable_polling,
+        "profiler": None if manager.profiler is None else manager.profiler.as_dict(),
+        "cloud_budget": manager.budget.as_dict(),
+        "circuit_breaker": manager.breaker.as_dict(),
+        "device_refresh": dict(manager.refresh_stats),
+        "token": manager.token_diagnostics(),
+        "load_shedding": None
+        if manager.load_shedder is None
+        else manager.load_shedder.as_dict(),
+        "startup_times": dict(entry.runtime_data.startup_times),
+        "platform_setup_times": dict(entry.runtime_data.platform_setup_times),
     }
 
-    if device:
-        tuya_device_id = next(iter(device.identifiers))[1]
-        data |= _async_device_as_dict(hass, manager.device_map[tuya_device_id])
-    else:
-        data.update(
-            devices=[
-                _async_device_as_dict(hass, device)
-                for device in manager.device_map.values()
-            ]
-        )
-
-    return data
-
 
 @callback
 def _async_device_as_dict(
-    hass: HomeAssistant, device: CustomerDevice
+    hass: HomeAssistant,
+    manager: TuyaManager,
+    device: CustomerDevice,
+    *,
+    include_spec: bool = True,
+    include_states: bool = True,
 ) -> dict[str, Any]:
     """Represent a Tuya device as a dictionary."""
 
@@ -97,30 +176,25 @@ def _async_device_as_dict(
         "home_assistant": {},
         "set_up": device.set_up,
         "support_local": device.support_local,
+        "local": None,
+        "availability": None,
+        "transport": manager.transport_diagnostics(device.id),
+        "command_latency": manager.metrics.device_as_dict(device.id),
     }
 
-    # Gather Tuya states
-    for dpcode, value in device.status.items():
-        # These statuses may contain sensitive information, redact these..
-        if dpcode in _REDACTED_DPCODES:
-            data["status"][dpcode] = REDACTED
-            continue
-
-        data["status"][dpcode] = value
+    if manager.local is not None:
+        data["local"] = manager.local.async_device_diagnostics(device.id)
+    if manager.availability is not None:
+        data["availability"] = manager.availability.device_as_dict(device.id)
 
-    # Gather Tuya functions
-    for function in device.function.values():
-        data["function"][function.code] = {
-            "type": function.type,
-            "value": function.values,
-        }
+    # Gather Tuya states
+    data["status"] = _async_status_as_dict(device)
 
-    # Gather Tuya status ranges
-    for status_range in device.status_range.values():
-        data["status_range"][status_range.code] = {
-            "type": status_range.type,
-            "value": status_range.values,
-        }
+    if include_spec:
+        data["function"] = _async_functions_as_dict(device)
+        data["status_range"] = _async_status_ranges_as_dict(device)
+    else:
+        del data["function"], data["status_range"]
 
     # Gather information how this Tuya device is represented in Home Assistant
     device_registry = dr.async_get(hass)
@@ -144,7 +218,7 @@ def _async_device_as_dict(
         for entity_entry in hass_entities:
             state = hass.states.get(entity_entry.entity_id)
             state_dict: dict[str, Any] | None = None
-            if state:
+            if state and include_states:
                 state_dict = dict(state.as_dict())
 
                 # Redact the `entity_picture` attribute as it contains a token.
@@ -172,3 +246,54 @@ def _async_device_as_dict(
             )
 
     return data
+
+
+@callback
+def _async_functions_as_dict(device: CustomerDevice) -> dict[str, Any]:
+    """Represent the Tuya functions of a device as a dictionary."""
+    return {
+        function.code: {"type": function.type, "value": function.values}
+        for function in device.function.values()
+    }
+
+
+@callback
+def _async_status_ranges_as_dict(device: CustomerDevice) -> dict[str, Any]:
+    """Represent the Tuya status ranges of a device as a dictionary."""
+    return {
+        status_range.code: {"type": status_range.type, "value": status_range.values}
+        for status_range in device.status_range.values()
+    }
+
+
+@callback
+def _async_status_as_dict(device: CustomerDevice) -> dict[str, Any]:
+    """Represent the Tuya status of a device as a dictionary."""
+    # These statuses may contain sensitive information, redact these..
+    return {
+        dpcode: REDACTED if dpcode in _REDACTED_DPCODES else value
+        for dpcode, value in device.status.items()
+    }
+
+
+@callback
+def _async_device_status_as_dict(device: CustomerDevice) -> dict[str, Any]:
+    """Represent a Tuya device by its status, referencing its product."""
+    return {
+        "id": device.id,
+        "name": device.name,
+        "product_id": device.product_id,
+        "online": device.online,
+        "status": _async_status_as_dict(device),
+    }
+
+
+@callback
+def _async_product_as_dict(device: CustomerDevice) -> dict[str, Any]:
+    """Represent the product spec of a Tuya device as a dictionary."""
+    return {
+        "product_name": device.product_name,
+        "category": device.category,
+        "function": _async_functions_as_dict(device),
+        "status_range": _async_status_ranges_as_dict(device),
+    }
@@ -2,16 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
-from tuya_sharing import CustomerDevice, Manager
+from tuya_sharing import CustomerDevice
 
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
 
-from .const import DOMAIN, LOGGER, TUYA_HA_SIGNAL_UPDATE_ENTITY
+from .const import DOMAIN, LOGGER, TUYA_HA_SIGNAL_UPDATE_ENTITY, DPCode
+from .manager import TuyaManager
 from .models import DPCodeWrapper
+from .util import get_dpcode
+
+if TYPE_CHECKING:
+    from . import TuyaConfigEntry
 
 
 class TuyaEntity(Entity):
@@ -21,7 +29,7 @@ class TuyaEntity(Entity):
     # TUYA_CUSTOM: Default to no polling, but cover entities will override this
     _attr_should_poll = False
 
-    def __init__(self, device: CustomerDevice, device_manager: Manager) -> None:
+    def __init__(self, device: CustomerDevice, device_manager: TuyaManager) -> None:
         """Init TuyaHaEntity."""
         self._attr_unique_id = f"tuya.{device.id}"
         # TuyaEntity initialize mq can subscribe
@@ -43,15 +51,20 @@ class TuyaEntity(Entity):
     @property
     def available(self) -> bool:
         """Return if the device is available."""
+        if (availability := self.device_manager.availability) is not None:
+            return availability.available(self.device)
         return self.device.online
 
     async def async_added_to_hass(self) -> None:
         """Call when entity is added to hass."""
+        handler = self._handle_state_update
+        if (profiler := self.device_manager.profiler) is not None:
+            handler = profiler.instrument(self, handler)
         self.async_on_remove(
             async_dispatcher_connect(
                 self.hass,
                 f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{self.device.id}",
-                self._handle_state_update,
+                handler,
             )
         )
 
@@ -62,10 +75,12 @@ class TuyaEntity(Entity):
     ) -> None:
         self.async_write_ha_state()
 
-    def _send_command(self, commands: list[dict[str, Any]]) -> None:
+    def _send_command(
+        self, commands: list[dict[str, Any]], enqueued: float | None = None
+    ) -> None:
         """Send command to the device."""
         LOGGER.debug("Sending commands for device %s: %s", self.device.id, commands)
-        self.device_manager.send_commands(self.device.id, commands)
+        self.device_manager.send_commands(self.device.id, commands, enqueued)
 
     def _read_wrapper(self, dpcode_wrapper: DPCodeWrapper | None) -> Any | None:
         """Read the wrapper device status."""
@@ -82,4 +97,77 @@ class TuyaEntity(Entity):
         await self.hass.async_add_executor_job(
             self._send_command,
             [dpcode_wrapper.get_update_command(self.device, value)],
+            time.monotonic(),
+        )
+
+
+class TuyaDisabledEntity(TuyaEntity):
+    """Placeholder of a Tuya entity disabled in the entity registry.
+
+    Home Assistant does not add disabled entities, but updates their registry
+    entry and device from them. The placeholder repeats the registry entry,
+    has no DP code wrappers and does not flag its device to be subscribed to.
+    """
+
+    def __init__(
+        self,
+        device: CustomerDevice,
+        device_manager: TuyaManager,
+        entity_entry: er.RegistryEntry,
+    ) -> None:
+        """Init TuyaDisabledEntity."""
+        self._attr_unique_id = entity_entry.unique_id
+        self.device = device
+        self.device_manager = device_manager
+        self._attr_name = entity_entry.original_name
+        self._attr_translation_key = entity_entry.translation_key
+        self._attr_device_class = entity_entry.original_device_class
+        self._attr_entity_category = entity_entry.entity_category
+        self._attr_icon = entity_entry.original_icon
+        self._attr_capability_attributes = entity_entry.capabilities
+        self._attr_supported_features = entity_entry.supported_features
+        self._attr_unit_of_measurement = entity_entry.unit_of_measurement
+
+
+class DisabledEntities:
+    """The entities of a platform disabled in the entity registry.
+
+    Read once per discovered batch of devices. Disabled entities are
+    replaced by placeholders, so their DP code wrappers are not built.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: TuyaConfigEntry, domain: str
+    ) -> None:
+        """Init DisabledEntities."""
+        self.device_manager = entry.runtime_data.manager
+        self.placeholders: list[TuyaDisabledEntity] = []
+        self._entries = {
+            entity_entry.unique_id: entity_entry
+            for entity_entry in er.async_entries_for_config_entry(
+                er.async_get(hass), entry.entry_id
+            )
+            if entity_entry.domain == domain and entity_entry.disabled
+        }
+
+    def skip(
+        self,
+        device: CustomerDevice,
+        key: str,
+        dpcodes: str | DPCode | tuple[DPCode, ...] | None,
+    ) -> bool:
+        """Return if an entity is disabled, adding a placeholder for it.
+
+        The DP codes backing the entity, None if it is not backed by a DP,
+        are looked up without building their wrapper. No placeholder is
+        added when the device does not provide them anymore.
+        """
+        if (entity_entry := self._entries.get(f"tuya.{device.id}{key}")) is None:
+            return False
+        if dpcodes is not None and get_dpcode(device, dpcodes) is None:
+            return True
+        self.placeholders.append(
+            TuyaDisabledEntity(device, self.device_manager, entity_entry)
         )
+        self.device_manager.disabled_devices.add(device.id)
+        return True
@@ -9,13 +9,14 @@ from homeassistant.components.event import (
     EventEntity,
     EventEntityDescription,
 )
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
 from . import TuyaConfigEntry
 from .const import TUYA_DISCOVERY_NEW, DeviceCategory, DPCode
-from .entity import TuyaEntity
+from .entity import DisabledEntities, TuyaEntity
 from .models import DPCodeEnumWrapper
 
 # All descriptions can be found here. Mostly the Enum data types in the
@@ -93,6 +94,7 @@ async def async_setup_entry(
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered Tuya binary sensor."""
         entities: list[TuyaEventEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.EVENT)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := EVENTS.get(device.category):
@@ -101,14 +103,15 @@ async def async_setup_entry(
                         device, manager, description, dpcode_wrapper=dpcode_wrapper
                     )
                     for description in descriptions
-                    if (
+                    if not disabled.skip(device, description.key, description.key)
+                    and (
                         dpcode_wrapper := DPCodeEnumWrapper.find_dpcode(
                             device, description.key, prefer_function=True
                         )
                     )
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
     async_discover_device([*manager.device_map])
 
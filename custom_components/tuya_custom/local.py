@@ -0,0 +1,604 @@
+"""Local LAN transport for Tuya devices.
+
+Devices announce themselves through UDP broadcasts, after which a persistent
+encrypted session is held over TCP. Tuya protocol versions 3.3 and 3.4 are
+supported, other devices keep using the cloud.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from enum import IntEnum
+from hashlib import md5, sha256
+import hmac
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any
+import zlib
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from tuya_sharing import CustomerDevice, Manager, strategy
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, LOGGER
+
+LOCAL_PORT = 6668
+DISCOVERY_PORTS = (6666, 6667)
+SUPPORTED_VERSIONS = ("3.3", "3.4")
+
+COMMAND_TIMEOUT = 3
+CONNECT_TIMEOUT = 5
+HEARTBEAT_INTERVAL = 10
+# Heartbeats are answered, a connection silent for longer is dead
+RECEIVE_TIMEOUT = HEARTBEAT_INTERVAL * 3
+RECONNECT_MAX_BACKOFF = 300
+MAX_MESSAGE_LENGTH = 0x10000
+
+PREFIX = 0x000055AA
+SUFFIX = 0x0000AA55
+
+_DISCOVERY_KEY = md5(b"yGAdlopoPVldABfn").digest()
+_HEADER = struct.Struct(">4I")
+
+
+class Command(IntEnum):
+    """Tuya LAN protocol commands."""
+
+    SESS_KEY_NEG_START = 3
+    SESS_KEY_NEG_RESP = 4
+    SESS_KEY_NEG_FINISH = 5
+    CONTROL = 7
+    STATUS = 8
+    HEART_BEAT = 9
+    DP_QUERY = 10
+    CONTROL_NEW = 13
+    DP_QUERY_NEW = 16
+
+
+# Commands which are sent without the protocol version header
+_NO_VERSION_HEADER = {
+    Command.SESS_KEY_NEG_START,
+    Command.SESS_KEY_NEG_RESP,
+    Command.SESS_KEY_NEG_FINISH,
+    Command.HEART_BEAT,
+    Command.DP_QUERY,
+    Command.DP_QUERY_NEW,
+}
+
+
+class TuyaLocalError(Exception):
+    """Error in the communication with a device over the LAN."""
+
+
+@dataclass(slots=True)
+class TuyaLocalMessage:
+    """A framed Tuya LAN protocol message."""
+
+    seqno: int
+    cmd: int
+    payload: bytes
+    retcode: int | None = None
+
+
+def encrypt(key: bytes, data: bytes, *, pad: bool = True) -> bytes:
+    """Encrypt data with AES-128-ECB."""
+    if pad:
+        padder = padding.PKCS7(128).padder()
+        data = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def decrypt(key: bytes, data: bytes) -> bytes:
+    """Decrypt AES-128-ECB data with PKCS7 padding."""
+    if len(data) % 16:
+        raise TuyaLocalError("Encrypted payload is not block aligned")
+    decryptor = Cipher(algorithms.AES(key), modes.ECB()).decryptor()
+    data = decryptor.update(data) + decryptor.finalize()
+    unpadder = padding.PKCS7(128).unpadder()
+    try:
+        return unpadder.update(data) + unpadder.finalize()
+    except ValueError as err:
+        raise TuyaLocalError("Invalid payload padding") from err
+
+
+def pack_message(message: TuyaLocalMessage, *, hmac_key: bytes | None = None) -> bytes:
+    """Frame a message, using an HMAC (3.4) or CRC (3.3) checksum."""
+    payload = message.payload
+    if message.retcode is not None:
+        payload = struct.pack(">I", message.retcode) + payload
+    end_length = (32 if hmac_key else 4) + 4
+    data = (
+        _HEADER.pack(PREFIX, message.seqno, message.cmd, len(payload) + end_length)
+        + payload
+    )
+    if hmac_key:
+        data += hmac.new(hmac_key, data, sha256).digest()
+    else:
+        data += struct.pack(">I", zlib.crc32(data))
+    return data + struct.pack(">I", SUFFIX)
+
+
+def unpack_message(
+    data: bytes, *, hmac_key: bytes | None = None, has_retcode: bool | None = None
+) -> TuyaLocalMessage:
+    """Parse a framed message and verify its checksum.
+
+    Messages from devices usually carry a return code, which is detected
+    from its zero high bytes when has_retcode is not given.
+    """
+    if len(data) < _HEADER.size:
+        raise TuyaLocalError("Message too short")
+    prefix, seqno, cmd, length = _HEADER.unpack_from(data)
+    end_length = (32 if hmac_key else 4) + 4
+    if prefix != PREFIX or len(data) < _HEADER.size + length or length < end_length:
+        raise TuyaLocalError("Invalid message header")
+
+    body_end = _HEADER.size + length - end_length
+    checksum = data[body_end : body_end + end_length - 4]
+    if hmac_key:
+        expected = hmac.new(hmac_key, data[:body_end], sha256).digest()
+    else:
+        expected = struct.pack(">I", zlib.crc32(data[:body_end]))
+    if not hmac.compare_digest(checksum, expected):
+        raise TuyaLocalError("Invalid message checksum")
+
+    payload = data[_HEADER.size : body_end]
+    if has_retcode is None:
+        has_retcode = payload[:3] == b"\0\0\0"
+    retcode = None
+    if has_retcode and len(payload) >= 4:
+        retcode = struct.unpack_from(">I", payload)[0]
+        payload = payload[4:]
+    return TuyaLocalMessage(seqno, cmd, payload, retcode)
+
+
+def decode_discovery(data: bytes) -> dict[str, Any]:
+    """Decode a UDP discovery broadcast."""
+    message = unpack_message(data)
+    try:
+        return json.loads(message.payload)
+    except ValueError:
+        return json.loads(decrypt(_DISCOVERY_KEY, message.payload))
+
+
+def _local_strategy_command(
+    device: CustomerDevice, code: str, value: Any
+) -> tuple[str, Any] | None:
+    """Convert a cloud command to a local DP id and value."""
+    for dp_id, item in device.local_strategy.items():
+        if item["status_code"] != code:
+            continue
+        if item["value_convert"] == "default":
+            return str(dp_id), value
+        if item["value_convert"] == "enum":
+            for dp_value, mapping in item["config_item"]["enumMappingMap"].items():
+                if mapping.get("value") == value:
+                    return str(dp_id), dp_value
+        # Other conversions are only implemented towards the cloud format
+        return None
+    return None
+
+
+def _local_dps(
+    device: CustomerDevice, commands: list[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Convert cloud commands to local DPs, None if any cannot be converted."""
+    dps = {}
+    for command in commands:
+        if (
+            dp := _local_strategy_command(device, command["code"], command["value"])
+        ) is None:
+            return None
+        dps[dp[0]] = dp[1]
+    return dps
+
+
+class TuyaLocalSession:
+    """Persistent encrypted connection to a single device."""
+
+    def __init__(
+        self,
+        engine: TuyaLocalEngine,
+        device: CustomerDevice,
+        host: str,
+        version: str,
+        port: int = LOCAL_PORT,
+    ) -> None:
+        """Init TuyaLocalSession."""
+        self._engine = engine
+        self.device = device
+        self.host = host
+        self.port = port
+        self.version = version
+        self._local_key = device.local_key.encode()
+        self._key = self._local_key
+        self._seqno = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: dict[int, asyncio.Future[int | None]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.connected = False
+
+    @callback
+    def async_start(self) -> None:
+        """Start connecting to the device."""
+        self._task = self._engine.hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN} {self.device.id} local session"
+        )
+
+    async def async_stop(self) -> None:
+        """Disconnect from the device."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._close()
+
+    async def async_set_dps(self, dps: dict[str, Any]) -> bool:
+        """Set DP values, return True when the device acknowledged them."""
+        if self.version == "3.4":
+            cmd = Command.CONTROL_NEW
+            payload = {"protocol": 5, "t": int(time.time()), "data": {"dps": dps}}
+        else:
+            cmd = Command.CONTROL
+            payload = {
+                "devId": self.device.id,
+                "uid": self.device.id,
+                "t": str(int(time.time())),
+                "dps": dps,
+            }
+        seqno = self._send(cmd, json.dumps(payload, separators=(",", ":")).encode())
+        future = self._pending[seqno] = asyncio.get_running_loop().create_future()
+        try:
+            async with asyncio.timeout(COMMAND_TIMEOUT):
+                retcode = await future
+        finally:
+            self._pending.pop(seqno, None)
+        return not retcode
+
+    async def _async_run(self) -> None:
+        """Keep the session connected."""
+        backoff = 1
+        while True:
+            try:
+                await self._async_connect()
+                backoff = 1
+                heartbeat = self._engine.hass.async_create_background_task(
+                    self._async_heartbeat(), f"{DOMAIN} {self.device.id} heartbeat"
+                )
+                try:
+                    await self._async_receive()
+                finally:
+                    heartbeat.cancel()
+            except (OSError, TimeoutError, TuyaLocalError, ValueError) as err:
+                LOGGER.debug(
+                    "Local connection to device %s lost: %s", self.device.id, err
+                )
+            finally:
+                self._close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_BACKOFF)
+
+    async def _async_connect(self) -> None:
+        """Open the connection and query the device status."""
+        async with asyncio.timeout(CONNECT_TIMEOUT):
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+            self._key = self._local_key
+            if self.version == "3.4":
+                await self._async_negotiate_session_key()
+        self.connected = True
+        LOGGER.debug(
+            "Local connection to device %s established (%s, protocol %s)",
+            self.device.id,
+            self.host,
+            self.version,
+        )
+        if self.version == "3.4":
+            self._send(Command.DP_QUERY_NEW, b"{}")
+        else:
+            self._send(
+                Command.DP_QUERY,
+                json.dumps(
+                    {
+                        "gwId": self.device.id,
+                        "devId": self.device.id,
+                        "uid": self.device.id,
+                        "t": str(int(time.time())),
+                    }
+                ).encode(),
+            )
+
+    async def _async_negotiate_session_key(self) -> None:
+        """Negotiate the 3.4 session key."""
+        local_nonce = os.urandom(16)
+        self._send(Command.SESS_KEY_NEG_START, local_nonce)
+        message = await self._async_read_message()
+        if message.cmd != Command.SESS_KEY_NEG_RESP:
+            raise TuyaLocalError(f"Unexpected negotiation response {message.cmd}")
+        payload = self._decode(message)
+        remote_nonce, remote_hmac = payload[:16], payload[16:48]
+        if not hmac.compare_digest(
+            remote_hmac, hmac.new(self._local_key, local_nonce, sha256).digest()
+        ):
+            raise TuyaLocalError("Session key negotiation failed, invalid local key")
+        self._send(
+            Command.SESS_KEY_NEG_FINISH,
+            hmac.new(self._local_key, remote_nonce, sha256).digest(),
+        )
+        self._key = encrypt(
+            self._local_key,
+            bytes(a ^ b for a, b in zip(local_nonce, remote_nonce, strict=True)),
+            pad=False,
+        )
+
+    async def _async_heartbeat(self) -> None:
+        """Keep the connection alive, devices drop idle connections."""
+        payload = json.dumps({"gwId": self.device.id, "devId": self.device.id})
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self._send(Command.HEART_BEAT, payload.encode())
+
+    async def _async_receive(self) -> None:
+        """Receive messages until the connection is lost."""
+        while True:
+            async with asyncio.timeout(RECEIVE_TIMEOUT):
+                message = await self._async_read_message()
+            self._handle_message(message)
+
+    async def _async_read_message(self) -> TuyaLocalMessage:
+        """Read a single message from the device."""
+        assert self._reader is not None
+        header = await self._reader.readexactly(_HEADER.size)
+        prefix, _, _, length = _HEADER.unpack(header)
+        if prefix != PREFIX or length > MAX_MESSAGE_LENGTH:
+            raise TuyaLocalError("Invalid message header")
+        data = header + await self._reader.readexactly(length)
+        return unpack_message(
+            data, hmac_key=self._key if self.version == "3.4" else None
+        )
+
+    def _handle_message(self, message: TuyaLocalMessage) -> None:
+        """Handle a message received from the device."""
+        if message.cmd in (Command.CONTROL, Command.CONTROL_NEW):
+            if (future := self._pending.get(message.seqno)) is None:
+                # Not all devices echo the sequence number of the command
+                future = next(iter(self._pending.values()), None)
+            if future is not None and not future.done():
+                future.set_result(message.retcode)
+
+        if message.cmd not in (
+            Command.STATUS,
+            Command.DP_QUERY,
+            Command.DP_QUERY_NEW,
+            Command.CONTROL,
+            Command.CONTROL_NEW,
+        ) or not (payload := self._decode(message)):
+            return
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            LOGGER.debug(
+                "Ignoring local message from device %s: %s", self.device.id, payload
+            )
+            return
+        if not isinstance(data, dict):
+            return
+        if (dps := data.get("dps")) is None:
+            dps = data.get("data", {}).get("dps")
+        if dps:
+            self._engine.async_handle_status(self.device, dps)
+
+    def _send(self, cmd: Command, payload: bytes) -> int:
+        """Encode, encrypt and send a message, return its sequence number."""
+        if self._writer is None:
+            raise TuyaLocalError("Not connected")
+        self._seqno += 1
+        if self.version == "3.4":
+            if cmd not in _NO_VERSION_HEADER:
+                payload = b"3.4" + bytes(12) + payload
+            data = pack_message(
+                TuyaLocalMessage(self._seqno, cmd, encrypt(self._key, payload)),
+                hmac_key=self._key,
+            )
+        else:
+            payload = encrypt(self._key, payload)
+            if cmd not in _NO_VERSION_HEADER:
+                payload = b"3.3" + bytes(12) + payload
+            data = pack_message(TuyaLocalMessage(self._seqno, cmd, payload))
+        self._writer.write(data)
+        return self._seqno
+
+    def _decode(self, message: TuyaLocalMessage) -> bytes:
+        """Decrypt the payload of a message."""
+        if not (payload := message.payload):
+            return b""
+        if self.version == "3.4":
+            payload = decrypt(self._key, payload)
+            if payload.startswith(b"3.4"):
+                payload = payload[15:]
+            return payload
+        if payload.startswith(b"3.3"):
+            payload = payload[15:]
+        return decrypt(self._key, payload)
+
+    def _close(self) -> None:
+        """Close the connection."""
+        self.connected = False
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(TuyaLocalError("Connection closed"))
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Receive the UDP broadcasts of Tuya devices."""
+
+    def __init__(self, engine: TuyaLocalEngine) -> None:
+        """Init _DiscoveryProtocol."""
+        self._engine = engine
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Handle a discovery broadcast."""
+        try:
+            info = decode_discovery(data)
+        except (TuyaLocalError, ValueError, struct.error):
+            return
+        if device_id := info.get("gwId"):
+            self._engine.async_device_discovered(
+                device_id, info.get("ip", addr[0]), str(info.get("version", ""))
+            )
+
+
+class TuyaLocalEngine:
+    """Control devices over the LAN, falling back to the cloud per device.
+
+    Only devices which `support_local` can be controlled locally, as the
+    local strategy of the cloud device list is needed to map DP ids to
+    DP codes. Local keys also come from the cloud device list.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        manager: Manager,
+        discovery_ports: tuple[int, ...] = DISCOVERY_PORTS,
+    ) -> None:
+        """Init TuyaLocalEngine."""
+        self.hass = hass
+        self._manager = manager
+        self._discovery_ports = discovery_ports
+        self._transports: list[asyncio.DatagramTransport] = []
+        self._sessions: dict[str, TuyaLocalSession] = {}
+
+    async def async_start(self) -> None:
+        """Start listening for device broadcasts."""
+        loop = asyncio.get_running_loop()
+        for port in self._discovery_ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, "SO_REUSEPORT"):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            try:
+                sock.bind(("", port))
+            except OSError as err:
+                sock.close()
+                LOGGER.warning("Unable to listen for Tuya devices on %s: %s", port, err)
+                continue
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DiscoveryProtocol(self), sock=sock
+            )
+            self._transports.append(transport)
+
+    async def async_stop(self) -> None:
+        """Stop discovery and close all sessions."""
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+        for session in self._sessions.values():
+            await session.async_stop()
+        self._sessions.clear()
+
+    @callback
+    def async_device_discovered(
+        self, device_id: str, host: str, version: str, port: int = LOCAL_PORT
+    ) -> None:
+        """Connect to a device found on the LAN."""
+        if (
+            (device := self._manager.device_map.get(device_id)) is None
+            or not device.support_local
+            or not device.local_key
+            or version not in SUPPORTED_VERSIONS
+        ):
+            return
+        if (session := self._sessions.get(device_id)) is not None:
+            if (session.host, session.port, session.version) == (host, port, version):
+                return
+            self.hass.async_create_task(session.async_stop())
+        LOGGER.debug("Found device %s on the LAN at %s", device_id, host)
+        session = self._sessions[device_id] = TuyaLocalSession(
+            self, device, host, version, port
+        )
+        session.async_start()
+
+    @callback
+    def async_handle_status(self, device: CustomerDevice, dps: dict[str, Any]) -> None:
+        """Apply a status pushed over the LAN and notify the listeners."""
+        updated_status_properties = []
+        for dp_id, value in dps.items():
+            try:
+                item = device.local_strategy[int(dp_id)]
+            except (KeyError, ValueError):
+                LOGGER.debug("Ignoring unknown DP %s of device %s", dp_id, device.id)
+                continue
+            try:
+                code, value = strategy.convert(
+                    item["value_convert"],
+                    (item["status_code"], value),
+                    item["config_item"],
+                )
+            except (KeyError, TypeError, ValueError) as err:
+                # Malformed values are skipped, as the cloud would not report them
+                LOGGER.debug(
+                    "Unable to convert DP %s of device %s: %s", dp_id, device.id, err
+                )
+                continue
+            device.status[code] = value
+            updated_status_properties.append(code)
+
+        if updated_status_properties:
+            for listener in self._manager.device_listeners:
+                listener.update_device(device, updated_status_properties)
+
+    def is_connected(self, device_id: str) -> bool:
+        """Return if a device can currently be reached over the LAN."""
+        return (
+            session := self._sessions.get(device_id)
+        ) is not None and session.connected
+
+    def can_send_commands(self, device_id: str, commands: list[dict[str, Any]]) -> bool:
+        """Return if all commands can be sent to a device over the LAN."""
+        if (session := self._sessions.get(device_id)) is None or not session.connected:
+            return False
+        return _local_dps(session.device, commands) is not None
+
+    async def async_send_commands(
+        self, device_id: str, commands: list[dict[str, Any]]
+    ) -> bool:
+        """Send commands over the LAN, return False to fall back to the cloud."""
+        if (session := self._sessions.get(device_id)) is None or not session.connected:
+            return False
+        if (dps := _local_dps(session.device, commands)) is None:
+            return False
+        try:
+            return await session.async_set_dps(dps)
+        except (OSError, TimeoutError, TuyaLocalError) as err:
+            LOGGER.debug("Local command to device %s failed: %s", device_id, err)
+            return False
+
+    def send_commands(self, device_id: str, commands: list[dict[str, Any]]) -> bool:
+        """Send commands from a worker thread, see async_send_commands."""
+        if not self.is_connected(device_id):
+            return False
+        if threading.get_ident() == self.hass.loop_thread_id:
+            raise RuntimeError("Cannot wait for a local command inside the event loop")
+        return asyncio.run_coroutine_threadsafe(
+            self.async_send_commands(device_id, commands), self.hass.loop
+        ).result()
+
+    @callback
+    def async_device_diagnostics(self, device_id: str) -> dict[str, Any] | None:
+        """Return the local session state of a device."""
+        if (session := self._sessions.get(device_id)) is None:
+            return None
+        return {"connected": session.connected, "version": session.version}
@@ -0,0 +1,545 @@
+"""Tuya device manager."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable
+import threading
+import time
+from typing import Any
+
+from requests.exceptions import RequestException
+from tuya_sharing import Manager
+from tuya_sharing.customerapi import CustomerTokenInfo
+
+from homeassistant.util import dt as dt_util
+
+from .availability import AvailabilityTracker
+from .breaker import CircuitBreaker
+from .budget import CloudBudget, CloudBudgetExceeded, Priority
+from .const import LOGGER
+from .local import TuyaLocalEngine
+from .metrics import STAGE_QUEUE, STAGE_RESPONSE, CommandMetrics
+from .profiler import StateProfiler
+from .shedding import LoadShedder
+
+TRANSPORT_CLOUD = "cloud"
+TRANSPORT_LOCAL = "local"
+
+# Number of commands per device and transport used to rate the transport
+TRANSPORT_SAMPLES = 50
+# Failures older than this are forgotten, so a failing transport is retried
+TRANSPORT_HEALTH_WINDOW = 300
+TRANSPORT_MIN_SUCCESS_RATE = 0.5
+# A transport is only measured when commands are sent over it, so the other
+# healthy transport gets a command this often to learn its round-trip time
+TRANSPORT_PROBE_INTERVAL = 600
+
+# Number of devices refreshed per cloud request
+REFRESH_BATCH_SIZE = 20
+
+# Access tokens are refreshed this long before they expire, instead of
+# lazily by the first request within a minute of the expiry
+TOKEN_REFRESH_AHEAD = 300
+TOKEN_REFRESH_RETRY = 60
+# How long to wait for a lazy refresh of the SDK before retrying later
+TOKEN_REFRESH_WAIT = 10
+TOKEN_REFRESH_POLL_INTERVAL = 0.1
+
+
+class TransportStats:
+    """Round-trip times and outcomes of the commands sent over a transport."""
+
+    def __init__(self) -> None:
+        """Init TransportStats."""
+        self.sent = 0
+        self.failed = 0
+        self._rtts: deque[float] = deque(maxlen=TRANSPORT_SAMPLES)
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=TRANSPORT_SAMPLES)
+
+    def record(self, rtt: float | None) -> None:
+        """Record a command, the round-trip time is None when it failed."""
+        self.sent += 1
+        if rtt is None:
+            self.failed += 1
+        else:
+            self._rtts.append(rtt)
+        self._outcomes.append((time.monotonic(), rtt is not None))
+
+    @property
+    def last_used(self) -> float:
+        """Return when the last command was sent over the transport."""
+        return self._outcomes[-1][0]
+
+    @property
+    def healthy(self) -> bool:
+        """Return if enough recent commands succeeded."""
+        since = time.monotonic() - TRANSPORT_HEALTH_WINDOW
+        if not (recent := [ok for at, ok in self._outcomes if at >= since]):
+            return True
+        return sum(recent) / len(recent) >= TRANSPORT_MIN_SUCCESS_RATE
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a round-trip time percentile in seconds."""
+        if not self._rtts:
+            return None
+        rtts = sorted(self._rtts)
+        return rtts[min(len(rtts) - 1, int(len(rtts) * percent / 100))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the statistics as a dictionary."""
+        data: dict[str, Any] = {
+            "sent": self.sent,
+            "failed": self.failed,
+            "healthy": self.healthy,
+        }
+        for percent in (50, 90, 99):
+            rtt = self.percentile(percent)
+            # Milliseconds read easier
+            data[f"rtt_p{percent}"] = None if rtt is None else round(rtt * 1000, 1)
+        return data
+
+
+class _Refresh:
+    """A cloud refresh of devices in progress."""
+
+    __slots__ = ("device_ids", "done", "error")
+
+    def __init__(self, device_ids: frozenset[str] | None) -> None:
+        """Init _Refresh, without device IDs all devices are refreshed."""
+        self.device_ids = device_ids
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+class TuyaManager(Manager):
+    """Tuya device manager.
+
+    Extends the SDK manager, so device commands can be sent over the LAN
+    when local control is enabled. Each command is routed over the faster
+    healthy transport, and retried over the other one when it fails. The
+    other transport is probed with a command every TRANSPORT_PROBE_INTERVAL,
+    so its round-trip time stays known.
+    """
+
+    availability: AvailabilityTracker | None = None
+    load_shedder: LoadShedder | None = None
+    local: TuyaLocalEngine | None = None
+    profiler: StateProfiler | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Init TuyaManager."""
+        super().__init__(*args, **kwargs)
+        self.transport_stats: dict[str, dict[str, TransportStats]] = {}
+        self.last_transport: dict[str, str] = {}
+        self.metrics = CommandMetrics()
+        self.budget = CloudBudget()
+        self.breaker = CircuitBreaker(self.customer_api.endpoint)
+        # Devices with disabled entities, registered through their placeholders
+        self.disabled_devices: set[str] = set()
+        self._subscription_lock = threading.Lock()
+        self.subscription_stats = {"subscribed": 0, "unsubscribed": 0}
+        self._refreshes: list[_Refresh] = []
+        self._refresh_lock = threading.Lock()
+        self.refresh_stats = {"started": 0, "joined": 0}
+        self._token_lock = threading.Lock()
+        self.token_stats: dict[str, Any] = {
+            "refreshed": 0,
+            "failed": 0,
+            "last_refresh": None,
+            "last_duration_ms": None,
+            "last_error": None,
+        }
+
+    def call_cloud[T](
+        self,
+        priority: Priority,
+        target: Callable[..., T],
+        *args: Any,
+        raw_response: bool = False,
+    ) -> T:
+        """Make a cloud request once the budget allows it.
+
+        A raw_response target is a request of the customer API, which
+        returns None for an HTTP error response.
+
+        Raises CloudBudgetExceeded when the request waited too long, and
+        CloudUnavailable while the cloud endpoint is failing.
+        """
+        self._before_request(priority)
+        try:
+            result = target(*args)
+        except RequestException as err:
+            self.breaker.record_failure(err)
+            raise
+        except Exception:
+            # The endpoint responded, with an error
+            self.breaker.record_success()
+            raise
+        if raw_response and result is None:
+            self.breaker.record_failure("HTTP error response")
+        else:
+            self.breaker.record_success()
+        return result
+
+    def _before_request(self, priority: Priority) -> bool:
+        """Wait for the budget of a request, return if it probes the endpoint."""
+        probe = self.breaker.before_request()
+        if not self.budget.acquire(priority):
+            if probe:
+                self.breaker.cancel_probe()
+            raise CloudBudgetExceeded(priority)
+        return probe
+
+    def send_commands(
+        self,
+        device_id: str,
+        commands: list[dict[str, Any]],
+        enqueued: float | None = None,
+    ) -> None:
+        """Send commands to a device, over the LAN when it is faster.
+
+        The enqueue time is when the command was issued, before it waited
+        for a worker thread.
+        """
+        sent = time.monotonic()
+        if (device := self.device_map.get(device_id)) is None:
+            self._send_commands(device_id, commands)
+            return
+        if enqueued is not None:
+            self.metrics.observe(device, STAGE_QUEUE, sent - enqueued)
+        else:
+            enqueued = sent
+
+        # Pending before sending, the status may arrive before the send returns
+        self.metrics.command_pending(device, commands, enqueued)
+        accepted = False
+        try:
+            accepted = self._send_commands(device_id, commands)
+        finally:
+            if not accepted:
+                self.metrics.command_failed(device, commands, enqueued)
+
+    def _send_commands(self, device_id: str, commands: list[dict[str, Any]]) -> bool:
+        """Send commands over the best transport, return if one accepted them."""
+        if self.local is None or not self.local.can_send_commands(device_id, commands):
+            return self._send_cloud_commands(device_id, commands)
+
+        transports = self.preferred_transports(device_id)
+        if self._probe_due(device_id, transports[1]):
+            LOGGER.debug("Probing %s transport of device %s", transports[1], device_id)
+            transports.reverse()
+
+        error: Exception | None = None
+        for transport in transports:
+            if transport == TRANSPORT_LOCAL:
+                start = time.monotonic()
+                ok = self.local.send_commands(device_id, commands)
+                self._record(device_id, TRANSPORT_LOCAL, start, ok)
+                if ok:
+                    return True
+            else:
+                try:
+                    if self._send_cloud_commands(device_id, commands):
+                        return True
+                except Exception as err:  # noqa: BLE001
+                    error = err
+            LOGGER.debug(
+                "Sending command to device %s over %s failed", device_id, transport
+            )
+
+        if error is not None:
+            raise error
+        return False
+
+    def refresh_devices(self, device_ids: Iterable[str] | None = None) -> None:
+        """Refresh the status of devices from the cloud, all devices by default.
+
+        Refreshes requested while another refresh of some of the same devices
+        is in progress join it, and only the remaining devices are requested.
+        """
+        wanted = None if device_ids is None else set(device_ids)
+        joined: list[_Refresh] = []
+        own: _Refresh | None = None
+        with self._refresh_lock:
+            for refresh in self._refreshes:
+                if refresh.device_ids is None:
+                    joined.append(refresh)
+                    wanted = set()
+                    break
+                if wanted is not None and not wanted.isdisjoint(refresh.device_ids):
+                    joined.append(refresh)
+                    wanted -= refresh.device_ids
+            if wanted is None or wanted:
+                own = _Refresh(None if wanted is None else frozenset(wanted))
+                self._refreshes.append(own)
+                self.refresh_stats["started"] += 1
+            if joined:
+                self.refresh_stats["joined"] += 1
+
+        if own is not None:
+            try:
+                self._refresh_devices(own.device_ids)
+            except Exception as err:
+                own.error = err
+                raise
+            finally:
+                with self._refresh_lock:
+                    self._refreshes.remove(own)
+                own.done.set()
+
+        for refresh in joined:
+            refresh.done.wait()
+            if refresh.error is not None:
+                raise refresh.error
+
+    def _refresh_devices(self, device_ids: frozenset[str] | None) -> None:
+        """Query the status of devices and notify the listeners of changes.
+
+        Unlike update_device_cache, the device objects are updated in place
+        and their specifications are not queried again.
+        """
+        ids = [
+            device_id
+            for device_id in (self.device_map if device_ids is None else device_ids)
+            if device_id in self.device_map
+        ]
+        for index in range(0, len(ids), REFRESH_BATCH_SIZE):
+            response = self.call_cloud(
+                Priority.CONFIRMATION,
+                self.customer_api.get,
+                "/v1.0/m/life/ha/devices/detail",
+                {"devIds": ",".join(ids[index : index + REFRESH_BATCH_SIZE])},
+                raw_response=True,
+            )
+            if response is None:
+                LOGGER.debug(
+                    "Unable to refresh devices %s",
+                    ids[index : index + REFRESH_BATCH_SIZE],
+                )
+                continue
+            for item in response["result"]:
+                self._refresh_device(item)
+
+    def _refresh_device(self, item: dict[str, Any]) -> None:
+        """Update a device from its cloud representation."""
+        if (device := self.device_map.get(item["id"])) is None:
+            return
+        status = {
+            status["code"]: status["value"]
+            for status in item.get("status", [])
+            if "code" in status and "value" in status
+        }
+        updated = [
+            code for code, value in status.items() if device.status.get(code) != value
+        ]
+        online = item.get("online", device.online)
+        if not updated and online == device.online:
+            return
+        device.status.update(status)
+        device.online = online
+        for listener in self.device_listeners:
+            listener.update_device(device, updated)
+
+    def token_expires_in(self) -> float:
+        """Return the number of seconds until the access token expires."""
+        return self.customer_api.token_info.expire_time / 1000 - time.time()
+
+    def refresh_access_token(self) -> bool:
+        """Refresh the access token ahead of its expiry, return if it succeeded.
+
+        Concurrent calls wait for the refresh in progress, which leaves a
+        token valid long enough for them. So does a lazy refresh of the SDK,
+        as the refresh token can only be used once.
+        """
+        with self._token_lock:
+            if self.token_expires_in() > TOKEN_REFRESH_AHEAD:
+                return True
+            api = self.customer_api
+            if api.refresh_token:
+                deadline = time.monotonic() + TOKEN_REFRESH_WAIT
+                while api.refresh_token and time.monotonic() < deadline:
+                    time.sleep(TOKEN_REFRESH_POLL_INTERVAL)
+                if api.refresh_token:
+                    LOGGER.debug("The access token is still being refreshed")
+                    return False
+                if self.token_expires_in() > TOKEN_REFRESH_AHEAD:
+                    return True
+            # Requests made in the meantime skip the lazy refresh of the SDK
+            api.refresh_token = True
+            start = time.monotonic()
+            try:
+                response = self.call_cloud(
+                    Priority.INTERACTIVE,
+                    api.get,
+                    f"/v1.0/m/token/{api.token_info.refresh_token}",
+                    raw_response=True,
+                )
+                if not response or not response.get("success"):
+                    raise ValueError(f"Unexpected response: {response}")
+                result = response["result"]
+                token_info = {
+                    "t": response["t"],
+                    "expire_time": result["expireTime"],
+                    "uid": result["uid"],
+                    "access_token": result["accessToken"],
+                    "refresh_token": result["refreshToken"],
+                }
+                # Replaced before the flag is cleared, so no request lazily
+                # refreshes the previous, already used, refresh token
+                api.token_info = CustomerTokenInfo(token_info)
+            except Exception as err:  # noqa: BLE001
+                self.token_stats["failed"] += 1
+                self.token_stats["last_error"] = str(err)
+                LOGGER.debug("Unable to refresh the access token: %s", err)
+                return False
+            finally:
+                api.refresh_token = False
+
+            if api.token_listener is not None:
+                api.token_listener.update_token(token_info)
+            self.token_stats["refreshed"] += 1
+            self.token_stats["last_refresh"] = dt_util.utcnow()
+            self.token_stats["last_duration_ms"] = round(
+                (time.monotonic() - start) * 1000, 1
+            )
+            return True
+
+    def token_diagnostics(self) -> dict[str, Any]:
+        """Return the expiry and renewal statistics of the access token."""
+        expires_in = self.token_expires_in()
+        return {
+            "expires_in": round(expires_in),
+            "refresh_in": max(round(expires_in - TOKEN_REFRESH_AHEAD), 0),
+            **self.token_stats,
+        }
+
+    def subscribe_devices(self) -> None:
+        """Subscribe to the devices with enabled entities only.
+
+        Only the changes are subscribed and unsubscribed, instead of
+        reconnecting MQTT as refresh_mq does. The devices the SDK subscribed
+        to when they were bound are unsubscribed when they were not set up.
+        """
+        if (mq := self.mq) is None:
+            return
+        with self._subscription_lock:
+            subscribed = {device.id: device for device in mq.device}
+            # Copied, the SDK removes deleted devices from the MQTT thread
+            wanted = {
+                device.id: device
+                for device in list(self.device_map.values())
+                if device.set_up
+            }
+            if stale := subscribed.keys() - wanted.keys():
+                # Kept out of the list, which is resubscribed on reconnect
+                for device in [device for device in mq.device if device.id in stale]:
+                    mq.device.remove(device)
+                for device_id in stale:
+                    if mq.client is not None:
+                        mq.un_subscribe_device(
+                            device_id, subscribed[device_id].support_local
+                        )
+                self.subscription_stats["unsubscribed"] += len(stale)
+            for device_id in wanted.keys() - subscribed.keys():
+                device = wanted[device_id]
+                if mq.client is None:
+                    # Subscribed once connected
+                    mq.device.append(device)
+                else:
+                    mq.subscribe_device(device_id, device)
+                self.subscription_stats["subscribed"] += 1
+
+    def subscription_diagnostics(self) -> dict[str, Any]:
+        """Return the MQTT subscription of the devices."""
+        subscribed = {device.id for device in self.mq.device} if self.mq else set()
+        return {
+            "devices": len(subscribed),
+            "not_subscribed": len(self.device_map.keys() - subscribed),
+            **self.subscription_stats,
+        }
+
+    def preferred_transports(self, device_id: str) -> list[str]:
+        """Return the transports to try for a device, best first."""
+        stats = self.transport_stats.get(device_id, {})
+        local, cloud = stats.get(TRANSPORT_LOCAL), stats.get(TRANSPORT_CLOUD)
+
+        def rank(transport: str, stats: TransportStats | None) -> tuple[bool, float]:
+            if stats is None:
+                # The LAN is usually faster, so it is tried before measuring it
+                return (False, 0.0 if transport == TRANSPORT_LOCAL else float("inf"))
+            return (not stats.healthy, stats.percentile(50) or 0.0)
+
+        return sorted(
+            (TRANSPORT_LOCAL, TRANSPORT_CLOUD),
+            key=lambda transport: rank(
+                transport, local if transport == TRANSPORT_LOCAL else cloud
+            ),
+        )
+
+    def _probe_due(self, device_id: str, transport: str) -> bool:
+        """Return if the round-trip time of a transport should be measured.
+
+        Only once the other transport was measured, so the first command of a
+        device is sent over the LAN.
+        """
+        if not (stats := self.transport_stats.get(device_id)):
+            return False
+        if (transport_stats := stats.get(transport)) is None:
+            return True
+        return (
+            transport_stats.healthy
+            and time.monotonic() - transport_stats.last_used > TRANSPORT_PROBE_INTERVAL
+        )
+
+    def _send_cloud_commands(
+        self, device_id: str, commands: list[dict[str, Any]]
+    ) -> bool:
+        """Send commands through the cloud, return if the cloud accepted them."""
+        # Checked before the duplicate filter, which would drop a retry
+        probe = self._before_request(Priority.INTERACTIVE)
+        # Same duplicate filter as the SDK uses for its own send_commands
+        if not self.device_repository.filter.call(device_id, commands):
+            if probe:
+                self.breaker.cancel_probe()
+            return True
+        start = time.monotonic()
+        try:
+            response = self.customer_api.post(
+                f"/v1.1/m/thing/{device_id}/commands", None, {"commands": commands}
+            )
+        except RequestException as err:
+            self._record(device_id, TRANSPORT_CLOUD, start, False)
+            self.breaker.record_failure(err)
+            raise
+        except Exception:
+            self._record(device_id, TRANSPORT_CLOUD, start, False)
+            self.breaker.record_success()
+            raise
+        self._record(device_id, TRANSPORT_CLOUD, start, response is not None)
+        if response is None:
+            self.breaker.record_failure("HTTP error response")
+        else:
+            self.breaker.record_success()
+        return response is not None
+
+    def _record(self, device_id: str, transport: str, start: float, ok: bool) -> None:
+        """Record the outcome of a command sent over a transport."""
+        rtt = time.monotonic() - start if ok else None
+        stats = self.transport_stats.setdefault(device_id, {})
+        stats.setdefault(transport, TransportStats()).record(rtt)
+        if rtt is not None:
+            self.last_transport[device_id] = transport
+            if (device := self.device_map.get(device_id)) is not None:
+                self.metrics.observe(device, STAGE_RESPONSE, rtt)
+
+    def transport_diagnostics(self, device_id: str) -> dict[str, Any]:
+        """Return the transport choice and statistics of a device."""
+        stats = self.transport_stats.get(device_id, {})
+        return {
+            "last": self.last_transport.get(device_id),
+            "preferred": self.preferred_transports(device_id)[0]
+            if self.local is not None and self.local.is_connected(device_id)
+            else TRANSPORT_CLOUD,
+            **{transport: item.as_dict() for transport, item in stats.items()},
+        }
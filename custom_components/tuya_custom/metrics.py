@@ -0,0 +1,163 @@
+"""Command latency metrics for Tuya devices."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import threading
+import time
+from typing import Any
+
+from tuya_sharing import CustomerDevice
+
+# Upper bounds of the histogram buckets in seconds, slower commands overflow
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Commands not confirmed by a status update within this time are given up on
+CONFIRM_TIMEOUT = 30
+
+# Time from an entity issuing a command until it is handed to a transport
+STAGE_QUEUE = "queue"
+# Time from handing a command to a transport until the transport acknowledged it
+STAGE_RESPONSE = "response"
+# Time from an entity issuing a command until the device reported the new status
+STAGE_CONFIRM = "confirm"
+
+
+class LatencyHistogram:
+    """Fixed bucket latency histogram."""
+
+    __slots__ = ("count", "counts", "last", "total")
+
+    def __init__(self) -> None:
+        """Init LatencyHistogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last: float | None = None
+
+    def observe(self, seconds: float) -> None:
+        """Add a latency to the histogram."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the histogram as a dictionary."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "last_ms": None if self.last is None else round(self.last * 1000, 1),
+            "buckets": {
+                **{
+                    f"le_{bound * 1000:g}ms": count
+                    for bound, count in zip(LATENCY_BUCKETS, self.counts, strict=False)
+                },
+                "overflow": self.counts[-1],
+            },
+        }
+
+
+class CommandMetrics:
+    """Command latency histograms per device and per device category.
+
+    Commands are sent from worker threads and confirmed from the MQTT thread,
+    so all state is guarded by a lock.
+    """
+
+    def __init__(self) -> None:
+        """Init CommandMetrics."""
+        self._lock = threading.Lock()
+        self._devices: dict[str, dict[str, LatencyHistogram]] = {}
+        self._categories: dict[str, dict[str, LatencyHistogram]] = {}
+        # Commanded DP codes waiting for a status update, with their enqueue time
+        self._pending: dict[str, dict[str, float]] = {}
+        self._unconfirmed: dict[str, int] = {}
+
+    def observe(self, device: CustomerDevice, stage: str, seconds: float) -> None:
+        """Add a command latency of a device."""
+        with self._lock:
+            self._observe(device, stage, seconds)
+
+    def _observe(self, device: CustomerDevice, stage: str, seconds: float) -> None:
+        for histograms in (
+            self._devices.setdefault(device.id, {}),
+            self._categories.setdefault(device.category, {}),
+        ):
+            histograms.setdefault(stage, LatencyHistogram()).observe(seconds)
+
+    def command_pending(
+        self, device: CustomerDevice, commands: list[dict[str, Any]], enqueued: float
+    ) -> None:
+        """Wait for status updates confirming the commanded DP codes.
+
+        Called before the commands are sent, as the device may report the new
+        status before the transport returns.
+        """
+        with self._lock:
+            self._expire(device.id)
+            pending = self._pending.setdefault(device.id, {})
+            for command in commands:
+                pending[command["code"]] = enqueued
+
+    def command_failed(
+        self, device: CustomerDevice, commands: list[dict[str, Any]], enqueued: float
+    ) -> None:
+        """Stop waiting for the DP codes of commands that were not sent."""
+        with self._lock:
+            pending = self._pending.get(device.id, {})
+            for command in commands:
+                # Left alone when a later command of the same DP code is pending
+                if pending.get(command["code"]) == enqueued:
+                    del pending[command["code"]]
+
+    def confirm(
+        self, device: CustomerDevice, updated_status_properties: list[str] | None
+    ) -> None:
+        """Record the confirmation latency of commanded DP codes."""
+        if not updated_status_properties or device.id not in self._pending:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._expire(device.id)
+            pending = self._pending.get(device.id, {})
+            for code in updated_status_properties:
+                if (enqueued := pending.pop(code, None)) is not None:
+                    self._observe(device, STAGE_CONFIRM, now - enqueued)
+
+    def _expire(self, device_id: str) -> None:
+        """Give up on commands that were not confirmed in time."""
+        if not (pending := self._pending.get(device_id)):
+            return
+        expired = time.monotonic() - CONFIRM_TIMEOUT
+        for code, enqueued in list(pending.items()):
+            if enqueued < expired:
+                del pending[code]
+                self._unconfirmed[device_id] = self._unconfirmed.get(device_id, 0) + 1
+
+    def last_latency(self, device_id: str, stage: str) -> float | None:
+        """Return the last latency of a device in seconds."""
+        if (histogram := self._devices.get(device_id, {}).get(stage)) is None:
+            return None
+        return histogram.last
+
+    def device_as_dict(self, device_id: str) -> dict[str, Any]:
+        """Represent the metrics of a device as a dictionary."""
+        with self._lock:
+            return {
+                "unconfirmed": self._unconfirmed.get(device_id, 0),
+                **{
+                    stage: histogram.as_dict()
+                    for stage, histogram in self._devices.get(device_id, {}).items()
+                },
+            }
+
+    def categories_as_dict(self) -> dict[str, Any]:
+        """Represent the metrics per device category as a dictionary."""
+        with self._lock:
+            return {
+                category: {
+                    stage: histogram.as_dict()
+                    for stage, histogram in histograms.items()
+                }
+                for category, histograms in self._categories.items()
+            }
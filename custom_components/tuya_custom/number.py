@@ -10,7 +10,7 @@ from homeassistant.components.number import (
     NumberEntity,
     NumberEntityDescription,
 )
-from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.const import PERCENTAGE, EntityCategory, Platform, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
@@ -24,7 +24,7 @@ from .const import (
     DeviceCategory,
     DPCode,
 )
-from .entity import TuyaEntity
+from .entity import DisabledEntities, TuyaEntity
 from .models import DPCodeIntegerWrapper, IntegerTypeData
 
 NUMBERS: dict[DeviceCategory, tuple[NumberEntityDescription, ...]] = {
@@ -458,20 +458,22 @@ async def async_setup_entry(
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered Tuya number."""
         entities: list[TuyaNumberEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.NUMBER)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := NUMBERS.get(device.category):
                 entities.extend(
                     TuyaNumberEntity(device, manager, description, dpcode_wrapper)
                     for description in descriptions
-                    if (
+                    if not disabled.skip(device, description.key, description.key)
+                    and (
                         dpcode_wrapper := DPCodeIntegerWrapper.find_dpcode(
                             device, description.key, prefer_function=True
                         )
                     )
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
     async_discover_device([*manager.device_map])
 
@@ -0,0 +1,130 @@
+"""Opt-in profiler for the state handling of Tuya entities."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine
+import time
+from typing import TYPE_CHECKING, Any
+
+from tuya_sharing import CustomerDevice
+
+from .models import DPCodeWrapper
+
+if TYPE_CHECKING:
+    from .entity import TuyaEntity
+
+# Number of offenders reported per table in diagnostics
+PROFILER_TOP = 20
+
+
+class _Timing:
+    """Accumulated wall time of a profiled call."""
+
+    __slots__ = ("count", "max", "total")
+
+    def __init__(self) -> None:
+        """Init _Timing."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Add the duration of a call."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the timing as a dictionary, in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class StateProfiler:
+    """Measure the event loop time spent on device status updates.
+
+    State updates are timed per entity class, which includes calculating
+    the state through the property getters. DP code wrapper reads done by
+    those getters are timed per DP code and per wrapper class.
+    """
+
+    def __init__(self) -> None:
+        """Init StateProfiler."""
+        self.messages = 0
+        self._entities: dict[str, _Timing] = {}
+        self._dpcodes: dict[str, _Timing] = {}
+        self._wrappers: dict[str, _Timing] = {}
+
+    def instrument[**P](
+        self,
+        entity: TuyaEntity,
+        handler: Callable[P, Coroutine[Any, Any, None]],
+    ) -> Callable[P, Coroutine[Any, Any, None]]:
+        """Time the state update handler and DP code wrappers of an entity."""
+        for value in vars(entity).values():
+            if isinstance(value, DPCodeWrapper):
+                self._instrument_wrapper(value)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if isinstance(item, DPCodeWrapper):
+                        self._instrument_wrapper(item)
+
+        timing = self._entities.setdefault(type(entity).__name__, _Timing())
+
+        async def _profiled(*args: P.args, **kwargs: P.kwargs) -> None:
+            start = time.perf_counter()
+            try:
+                await handler(*args, **kwargs)
+            finally:
+                timing.add(time.perf_counter() - start)
+
+        return _profiled
+
+    def _instrument_wrapper(self, wrapper: DPCodeWrapper) -> None:
+        """Time the status reads of a DP code wrapper."""
+        if "read_device_status" in vars(wrapper):
+            # Already instrumented, wrappers can be shared between entities
+            return
+        read_device_status = wrapper.read_device_status
+        dpcode_timing = self._dpcodes.setdefault(wrapper.dpcode, _Timing())
+        wrapper_timing = self._wrappers.setdefault(type(wrapper).__name__, _Timing())
+
+        def _profiled(device: CustomerDevice) -> Any | None:
+            start = time.perf_counter()
+            try:
+                return read_device_status(device)
+            finally:
+                elapsed = time.perf_counter() - start
+                dpcode_timing.add(elapsed)
+                wrapper_timing.add(elapsed)
+
+        wrapper.read_device_status = _profiled  # type: ignore[method-assign]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the top offenders as a dictionary."""
+        total = sum(timing.total for timing in self._entities.values())
+        return {
+            "messages": self.messages,
+            "loop_time_ms": round(total * 1000, 3),
+            "loop_time_per_message_ms": round(total / self.messages * 1000, 3)
+            if self.messages
+            else None,
+            "entity_classes": _top(self._entities),
+            "dpcodes": _top(self._dpcodes),
+            "wrappers": _top(self._wrappers),
+        }
+
+
+def _top(timings: dict[str, _Timing]) -> dict[str, dict[str, Any]]:
+    """Return the timings with the most accumulated time."""
+    return {
+        name: timing.as_dict()
+        for name, timing in sorted(
+            timings.items(), key=lambda item: item[1].total, reverse=True
+        )[:PROFILER_TOP]
+        if timing.count
+    }
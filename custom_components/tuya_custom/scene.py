@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+from collections.abc import Collection
+from datetime import timedelta
 from typing import Any
 
-from tuya_sharing import Manager, SharingScene
+from tuya_sharing import SharingScene
 
 from homeassistant.components.scene import Scene
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import PlatformNotReady
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
 
 from . import TuyaConfigEntry
-from .const import DOMAIN
+from .budget import Priority
+from .const import DOMAIN, LOGGER, SCENE_STORAGE_KEY, SCENE_STORAGE_VERSION
+from .manager import TuyaManager
+
+SCENE_REFRESH_INTERVAL = timedelta(minutes=5)
 
 
 async def async_setup_entry(
@@ -21,23 +35,143 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Tuya scenes."""
-    manager = entry.runtime_data.manager
-    scenes = await hass.async_add_executor_job(manager.query_scenes)
-    async_add_entities(TuyaSceneEntity(manager, scene) for scene in scenes)
+    coordinator = TuyaSceneCoordinator(hass, entry, entry.runtime_data.manager)
+    known_scene_ids: set[str] = set()
+
+    @callback
+    def async_sync_scenes() -> None:
+        """Add new scenes and remove scenes deleted in the Tuya app."""
+        if coordinator.data is None:
+            return
+
+        if new_scene_ids := coordinator.data.keys() - known_scene_ids:
+            known_scene_ids.update(new_scene_ids)
+            async_add_entities(
+                TuyaSceneEntity(coordinator, coordinator.data[scene_id])
+                for scene_id in new_scene_ids
+            )
+
+        if removed_scene_ids := known_scene_ids - coordinator.data.keys():
+            known_scene_ids.difference_update(removed_scene_ids)
+            device_registry = dr.async_get(hass)
+            for scene_id in removed_scene_ids:
+                LOGGER.debug("Remove scene: %s", scene_id)
+                # Removing the pseudo-device also removes the scene entity
+                if device_entry := device_registry.async_get_device(
+                    identifiers={(DOMAIN, f"tys{scene_id}")}
+                ):
+                    device_registry.async_remove_device(device_entry.id)
+
+    async def async_first_refresh() -> None:
+        """Query the scenes and clean up scenes deleted while we were down."""
+        await coordinator.async_refresh()
+        if coordinator.last_update_success:
+            _async_remove_stale_scene_devices(hass, entry, coordinator.data.keys())
+
+    # Cached scenes allow an instant startup, the cloud is queried afterwards
+    if await coordinator.async_load():
+        entry.async_create_background_task(
+            hass, async_first_refresh(), f"{DOMAIN} scene refresh"
+        )
+    else:
+        await async_first_refresh()
+        if not coordinator.last_update_success:
+            # Neither cached nor queried scenes, retried instead of setting
+            # up without any scene
+            raise PlatformNotReady(
+                f"Unable to query Tuya scenes: {coordinator.last_exception}"
+            ) from coordinator.last_exception
+
+    # Listened to once set up, so a retried setup leaves no coordinator behind
+    entry.async_on_unload(coordinator.async_add_listener(async_sync_scenes))
+    async_sync_scenes()
+
+
+@callback
+def _async_remove_stale_scene_devices(
+    hass: HomeAssistant, entry: TuyaConfigEntry, scene_ids: Collection[str]
+) -> None:
+    """Remove the pseudo-devices of scenes deleted while Home Assistant was down."""
+    device_registry = dr.async_get(hass)
+    for device_entry in dr.async_entries_for_config_entry(
+        device_registry, entry.entry_id
+    ):
+        for domain, identifier in device_entry.identifiers:
+            if (
+                domain == DOMAIN
+                and identifier.startswith("tys")
+                and identifier[3:] not in scene_ids
+            ):
+                LOGGER.debug("Remove stale scene: %s", identifier[3:])
+                device_registry.async_remove_device(device_entry.id)
+                break
+
+
+class TuyaSceneCoordinator(DataUpdateCoordinator[dict[str, SharingScene]]):
+    """Keep the list of Tuya scenes up to date.
 
+    The last known scene list is cached in Home Assistant storage.
+    """
 
-class TuyaSceneEntity(Scene):
+    config_entry: TuyaConfigEntry
+
+    def __init__(
+        self, hass: HomeAssistant, entry: TuyaConfigEntry, manager: TuyaManager
+    ) -> None:
+        """Init TuyaSceneCoordinator."""
+        super().__init__(
+            hass,
+            LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} scenes",
+            update_interval=SCENE_REFRESH_INTERVAL,
+        )
+        self.manager = manager
+        self._store: Store[list[dict[str, Any]]] = Store(
+            hass,
+            SCENE_STORAGE_VERSION,
+            SCENE_STORAGE_KEY.format(entry_id=entry.entry_id),
+        )
+
+    async def async_load(self) -> bool:
+        """Restore the scenes cached by a previous run."""
+        if not (cached := await self._store.async_load()):
+            return False
+        self.data = {
+            scene.scene_id: scene for scene in (SharingScene(**item) for item in cached)
+        }
+        return True
+
+    async def _async_update_data(self) -> dict[str, SharingScene]:
+        """Query the scenes from the Tuya cloud."""
+        try:
+            scenes: list[SharingScene] = await self.hass.async_add_executor_job(
+                self.manager.call_cloud, Priority.BACKGROUND, self.manager.query_scenes
+            )
+        except Exception as err:
+            raise UpdateFailed(f"Unable to query Tuya scenes: {err}") from err
+
+        data = {scene.scene_id: scene for scene in scenes}
+        if self.data is None or _scenes_as_list(self.data) != _scenes_as_list(data):
+            self._store.async_delay_save(lambda: _scenes_as_list(data))
+        return data
+
+
+def _scenes_as_list(scenes: dict[str, SharingScene]) -> list[dict[str, Any]]:
+    """Return the scenes in their storage representation."""
+    return [vars(scene) for scene in scenes.values()]
+
+
+class TuyaSceneEntity(CoordinatorEntity[TuyaSceneCoordinator], Scene):
     """Tuya Scene Remote."""
 
-    _should_poll = False
     _attr_has_entity_name = True
     _attr_name = None
 
-    def __init__(self, home_manager: Manager, scene: SharingScene) -> None:
+    def __init__(self, coordinator: TuyaSceneCoordinator, scene: SharingScene) -> None:
         """Init Tuya Scene."""
-        super().__init__()
+        super().__init__(coordinator)
         self._attr_unique_id = f"tys{scene.scene_id}"
-        self.home_manager = home_manager
         self.scene = scene
 
     @property
@@ -56,6 +190,19 @@ class TuyaSceneEntity(Scene):
         """Return if the scene is enabled."""
         return self.scene.enabled
 
-    def activate(self, **kwargs: Any) -> None:
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated scene information from the coordinator."""
+        if scene := self.coordinator.data.get(self.scene.scene_id):
+            self.scene = scene
+        super()._handle_coordinator_update()
+
+    async def async_activate(self, **kwargs: Any) -> None:
         """Activate the scene."""
-        self.home_manager.trigger_scene(self.scene.home_id, self.scene.scene_id)
+        await self.hass.async_add_executor_job(
+            self.coordinator.manager.call_cloud,
+            Priority.INTERACTIVE,
+            self.coordinator.manager.trigger_scene,
+            self.scene.home_id,
+            self.scene.scene_id,
+        )
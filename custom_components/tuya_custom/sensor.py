@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 import struct
+import time
+from typing import Any
 
 from tuya_sharing import CustomerDevice, Manager
 
@@ -19,27 +22,37 @@ from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     PERCENTAGE,
     EntityCategory,
+    Platform,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfPower,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
 
 from . import TuyaConfigEntry
 from .const import (
+    COMMAND_LATENCY_KEY_PREFIX,
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
+    CONF_MIN_INTERVAL,
+    CONF_SENSOR_THROTTLING,
     DEVICE_CLASS_UNITS,
     DOMAIN,
     LOGGER,
+    PLATFORM_CATEGORIES,
     TUYA_DISCOVERY_NEW,
     DeviceCategory,
     DPCode,
     DPType,
 )
-from .entity import TuyaEntity
+from .entity import DisabledEntities, TuyaEntity
+from .manager import TuyaManager
+from .metrics import STAGE_CONFIRM, STAGE_RESPONSE
 from .models import (
     DPCodeBase64Wrapper,
     DPCodeEnumWrapper,
@@ -49,6 +62,7 @@ from .models import (
     DPCodeWrapper,
     EnumTypeData,
 )
+from .shedding import SHED_WRITE_INTERVAL
 
 
 class _WindDirectionWrapper(DPCodeTypeInformationWrapper[EnumTypeData]):
@@ -170,6 +184,40 @@ class TuyaSensorEntityDescription(SensorEntityDescription):
     dpcode: DPCode | None = None
     wrapper_class: tuple[type[DPCodeTypeInformationWrapper], ...] | None = None
 
+    # Updates changing the value by no more than the deadband are held, the
+    # deadband is a percentage of the last written value when relative
+    deadband: float | None = None
+    deadband_relative: bool = False
+    # Updates within this number of seconds of the last write are held
+    min_write_interval: float | None = None
+
+
+# Values held by the deadband alone are written after this number of seconds
+DEADBAND_FLUSH_INTERVAL = 60
+
+
+# Command latencies of controllable devices, see metrics.py
+COMMAND_LATENCY_SENSORS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key=STAGE_RESPONSE,
+        translation_key="command_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key=STAGE_CONFIRM,
+        translation_key="command_confirmation_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+)
+
 
 # Commonly used battery sensors, that are reused in the sensors down below.
 BATTERY_SENSORS: tuple[TuyaSensorEntityDescription, ...] = (
@@ -1744,17 +1792,34 @@ async def async_setup_entry(
     @callback
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered Tuya sensor."""
-        entities: list[TuyaSensorEntity] = []
+        entities: list[SensorEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.SENSOR)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := SENSORS.get(device.category):
                 entities.extend(
                     TuyaSensorEntity(device, manager, description, dpcode_wrapper)
                     for description in descriptions
-                    if (dpcode_wrapper := _get_dpcode_wrapper(device, description))
+                    if not disabled.skip(
+                        device, description.key, description.dpcode or description.key
+                    )
+                    and (dpcode_wrapper := _get_dpcode_wrapper(device, description))
+                )
+            # Only for devices the platform is set up for, it is not loaded
+            # for the latency sensors alone
+            if (
+                device.function
+                and device.category in PLATFORM_CATEGORIES[Platform.SENSOR]
+            ):
+                entities.extend(
+                    TuyaCommandLatencySensorEntity(device, manager, description)
+                    for description in COMMAND_LATENCY_SENSORS
+                    if not disabled.skip(
+                        device, f"{COMMAND_LATENCY_KEY_PREFIX}{description.key}", None
+                    )
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
     async_discover_device([*manager.device_map])
 
@@ -1768,6 +1833,11 @@ class TuyaSensorEntity(TuyaEntity, SensorEntity):
 
     entity_description: TuyaSensorEntityDescription
     _dpcode_wrapper: DPCodeWrapper
+    # Last written value, and when, for the throttling
+    _written_value: Any = None
+    _written_at: float | None = None
+    _flush_at: float | None = None
+    _cancel_flush: CALLBACK_TYPE | None = None
 
     def __init__(
         self,
@@ -1837,3 +1907,139 @@ class TuyaSensorEntity(TuyaEntity, SensorEntity):
     def native_value(self) -> StateType:
         """Return the value reported by the sensor."""
         return self._dpcode_wrapper.read_device_status(self.device)
+
+    async def async_added_to_hass(self) -> None:
+        """Call when entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_flush)
+
+    def _throttling(self) -> tuple[float, bool, float]:
+        """Return the deadband, if it is relative, and the minimum interval.
+
+        The options of the config entry override the entity description,
+        and load shedding raises the interval of measurements.
+        """
+        description = self.entity_description
+        deadband = description.deadband or 0
+        relative = description.deadband_relative
+        min_interval = description.min_write_interval or 0
+        if self.platform.config_entry is not None and (
+            options := self.platform.config_entry.options.get(
+                CONF_SENSOR_THROTTLING, {}
+            ).get(self.unique_id)
+        ):
+            deadband = options[CONF_DEADBAND]
+            relative = options[CONF_DEADBAND_RELATIVE]
+            min_interval = options[CONF_MIN_INTERVAL]
+        if (
+            (shedder := self.device_manager.load_shedder) is not None
+            and shedder.active
+            and self.state_class == SensorStateClass.MEASUREMENT
+        ):
+            # Only the latest value is written while the event loop lags
+            min_interval = max(min_interval, SHED_WRITE_INTERVAL)
+        return deadband, relative, min_interval
+
+    async def _handle_state_update(
+        self,
+        updated_status_properties: list[str] | None,
+        dp_timestamps: dict | None = None,
+    ) -> None:
+        """Write the state, unless the update is held by the throttling."""
+        deadband, relative, min_interval = self._throttling()
+        value = self.native_value
+        if (
+            (not deadband and not min_interval)
+            # Availability and name changes are not held
+            or updated_status_properties is None
+            or self._written_at is None
+            or not isinstance(value, (int, float))
+            or not isinstance(self._written_value, (int, float))
+        ):
+            self._async_write_throttled()
+            return
+
+        change = abs(value - self._written_value)
+        if relative:
+            within_deadband = change <= abs(self._written_value) * deadband / 100
+        else:
+            within_deadband = change <= deadband
+        elapsed = time.monotonic() - self._written_at
+        if not within_deadband and elapsed >= min_interval:
+            self._async_write_throttled()
+            return
+        if change == 0:
+            return
+
+        # The latest value is written at the end of the interval
+        flush_in = min_interval - elapsed
+        if within_deadband:
+            flush_in = max(min_interval, DEADBAND_FLUSH_INTERVAL) - elapsed
+        self._async_schedule_flush(flush_in)
+
+    @callback
+    def _async_write_throttled(self) -> None:
+        """Write the state and remember the written value."""
+        self._async_cancel_flush()
+        self._written_value = self.native_value
+        self._written_at = time.monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_schedule_flush(self, delay: float) -> None:
+        """Write the latest value after a delay, unless written earlier."""
+        flush_at = time.monotonic() + delay
+        if self._flush_at is not None and self._flush_at <= flush_at:
+            return
+        self._async_cancel_flush()
+        self._flush_at = flush_at
+
+        @callback
+        def async_flush(_now: datetime) -> None:
+            """Write the latest value."""
+            self._cancel_flush = self._flush_at = None
+            self._async_write_throttled()
+
+        self._cancel_flush = async_call_later(self.hass, max(delay, 0), async_flush)
+
+    @callback
+    def _async_cancel_flush(self) -> None:
+        """Cancel the pending write of a held value."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = self._flush_at = None
+
+
+class TuyaCommandLatencySensorEntity(TuyaEntity, SensorEntity):
+    """Last command latency of a Tuya device."""
+
+    device_manager: TuyaManager
+
+    def __init__(
+        self,
+        device: CustomerDevice,
+        device_manager: TuyaManager,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Init Tuya command latency sensor."""
+        super().__init__(device, device_manager)
+        self.entity_description = description
+        self._attr_unique_id = (
+            f"{super().unique_id}{COMMAND_LATENCY_KEY_PREFIX}{description.key}"
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the latency is known, also while the device is offline."""
+        return self.native_value is not None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the last command latency."""
+        if (
+            latency := self.device_manager.metrics.last_latency(
+                self.device.id, self.entity_description.key
+            )
+        ) is None:
+            return None
+        return round(latency * 1000, 1)
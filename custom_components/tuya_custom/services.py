@@ -0,0 +1,166 @@
+"""Services for the Tuya integration."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import TuyaConfigEntry
+
+ATTR_CATEGORIES = "categories"
+ATTR_COMPACT = "compact"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DEVICE_ID = "device_id"
+ATTR_FORMAT_VERSION = "format_version"
+ATTR_INCLUDE_STATES = "include_states"
+ATTR_ONLINE_ONLY = "online_only"
+
+SERVICE_EXPORT_DIAGNOSTICS = "export_diagnostics"
+SERVICE_EXPORT_DIAGNOSTICS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CATEGORIES): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_ONLINE_ONLY, default=False): cv.boolean,
+        vol.Optional(ATTR_INCLUDE_STATES, default=True): cv.boolean,
+        vol.Optional(ATTR_COMPACT, default=False): cv.boolean,
+        vol.Optional(ATTR_FORMAT_VERSION, default=1): vol.All(
+            vol.Coerce(int), vol.In([1, 2])
+        ),
+    }
+)
+
+SERVICE_REFRESH_DEVICES = "refresh_devices"
+SERVICE_REFRESH_DEVICES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+@callback
+def _async_get_loaded_entry(hass: HomeAssistant, entry_id: str) -> TuyaConfigEntry:
+    """Return a loaded Tuya config entry."""
+    entry: TuyaConfigEntry | None = hass.config_entries.async_get_entry(entry_id)
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+    ):
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="config_entry_not_loaded",
+        )
+    return entry
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the services of the Tuya integration."""
+
+    async def async_export_diagnostics(call: ServiceCall) -> ServiceResponse:
+        """Write the diagnostics of a config entry to a file, in chunks."""
+        # pylint: disable-next=import-outside-toplevel
+        from .diagnostics import (
+            DIAGNOSTICS_CHUNK_SIZE,
+            FORMAT_VERSION_PRODUCTS,
+            async_get_diagnostics_header,
+            async_iter_device_diagnostics,
+        )
+
+        entry = _async_get_loaded_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        path = Path(
+            hass.config.path(
+                f"{DOMAIN}-diagnostics-{entry.entry_id}"
+                f"-{dt_util.utcnow():%Y%m%d%H%M%S}.json"
+            )
+        )
+        file: IO[bytes] = await hass.async_add_executor_job(path.open, "wb")
+        format_version: int = call.data[ATTR_FORMAT_VERSION]
+        products: dict[str, dict[str, Any]] | None = None
+        if format_version == FORMAT_VERSION_PRODUCTS:
+            products = {}
+        devices = 0
+        # The header object is reopened to append the devices array
+        header = json_bytes(
+            {"format_version": format_version, **async_get_diagnostics_header(entry)}
+        )
+        chunk = [header[:-1], b',"devices":[']
+        try:
+            async for device in async_iter_device_diagnostics(
+                hass,
+                entry,
+                categories=call.data.get(ATTR_CATEGORIES),
+                online_only=call.data[ATTR_ONLINE_ONLY],
+                include_states=call.data[ATTR_INCLUDE_STATES],
+                compact=call.data[ATTR_COMPACT],
+                products=products,
+            ):
+                chunk.append((b"," if devices else b"") + json_bytes(device))
+                devices += 1
+                if len(chunk) >= DIAGNOSTICS_CHUNK_SIZE:
+                    await hass.async_add_executor_job(file.write, b"".join(chunk))
+                    chunk.clear()
+            chunk.append(b"]")
+            if products is not None:
+                # Products are complete once all devices have been represented
+                chunk.append(b',"products":' + json_bytes(products))
+            chunk.append(b"}")
+            await hass.async_add_executor_job(file.write, b"".join(chunk))
+        finally:
+            await hass.async_add_executor_job(file.close)
+
+        return {"path": str(path), "devices": devices}
+
+    async def async_refresh_devices(call: ServiceCall) -> None:
+        """Refresh the status of devices from the Tuya cloud."""
+        entry = _async_get_loaded_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        device_ids: list[str] | None = None
+        if ATTR_DEVICE_ID in call.data:
+            device_registry = dr.async_get(hass)
+            device_ids = [
+                identifier
+                for device_id in call.data[ATTR_DEVICE_ID]
+                if (device_entry := device_registry.async_get(device_id))
+                for domain, identifier in device_entry.identifiers
+                if domain == DOMAIN
+            ]
+        # Concurrent refreshes of the same devices are joined by the manager
+        await hass.async_add_executor_job(
+            entry.runtime_data.manager.refresh_devices, device_ids
+        )
+
+    # Admin only, it writes files of any size into the config directory
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_EXPORT_DIAGNOSTICS,
+        async_export_diagnostics,
+        schema=SERVICE_EXPORT_DIAGNOSTICS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_DEVICES,
+        async_refresh_devices,
+        schema=SERVICE_REFRESH_DEVICES_SCHEMA,
+    )
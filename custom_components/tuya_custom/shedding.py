@@ -0,0 +1,102 @@
+"""Load shedding while the event loop lags."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import LOGGER
+
+# The loop lag is sampled at this interval, in seconds
+LAG_SAMPLE_INTERVAL = 1.0
+# Shedding starts when a sample lags this much
+LAG_SHED_THRESHOLD = 0.25
+# Shedding stops after this many consecutive samples lagging less than this
+LAG_RECOVER_THRESHOLD = 0.05
+LAG_RECOVER_SAMPLES = 5
+# Measurement sensors write at most once per this number of seconds while shedding
+SHED_WRITE_INTERVAL = 10
+# Number of shedding events kept for diagnostics
+SHED_EVENTS = 20
+
+
+class LoadShedder:
+    """Watch the event loop lag and shed load while it is overloaded.
+
+    The lag is how late a timer scheduled on the loop runs. While shedding,
+    measurement sensors only write their latest value at a reduced rate.
+    Control entities keep writing every update.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Init LoadShedder."""
+        self.hass = hass
+        self.active = False
+        self.lag = 0.0
+        self._calm_samples = 0
+        self._expected = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        self._event: dict[str, Any] | None = None
+        self._events: deque[dict[str, Any]] = deque(maxlen=SHED_EVENTS)
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling the loop lag."""
+        self._expected = self.hass.loop.time() + LAG_SAMPLE_INTERVAL
+        self._handle = self.hass.loop.call_at(self._expected, self._async_sample)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sampling the loop lag."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    @callback
+    def _async_sample(self) -> None:
+        """Measure the lag of this timer and start or stop shedding."""
+        self.lag = max(self.hass.loop.time() - self._expected, 0.0)
+        if not self.active:
+            if self.lag >= LAG_SHED_THRESHOLD:
+                self._async_set_active(True)
+        elif self.lag < LAG_RECOVER_THRESHOLD:
+            self._calm_samples += 1
+            if self._calm_samples >= LAG_RECOVER_SAMPLES:
+                self._async_set_active(False)
+        else:
+            self._calm_samples = 0
+        if self._event is not None:
+            self._event["max_lag_ms"] = max(
+                self._event["max_lag_ms"], round(self.lag * 1000, 1)
+            )
+        self.async_start()
+
+    @callback
+    def _async_set_active(self, active: bool) -> None:
+        """Start or stop shedding."""
+        self.active = active
+        self._calm_samples = 0
+        if active:
+            LOGGER.info(
+                "Event loop lags %.0f ms, reducing the update rate of measurements",
+                self.lag * 1000,
+            )
+            self._event = {"started": dt_util.utcnow(), "ended": None, "max_lag_ms": 0}
+            self._events.append(self._event)
+        else:
+            LOGGER.info("Event loop recovered, measurements update at full rate")
+            if self._event is not None:
+                self._event["ended"] = dt_util.utcnow()
+            self._event = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Represent the load shedding state and events as a dictionary."""
+        return {
+            "active": self.active,
+            "lag_ms": round(self.lag * 1000, 1),
+            "events": [dict(event) for event in self._events],
+        }
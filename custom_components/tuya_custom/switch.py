@@ -13,7 +13,7 @@ from homeassistant.components.switch import (
     SwitchEntity,
     SwitchEntityDescription,
 )
-from homeassistant.const import EntityCategory
+from homeassistant.const import EntityCategory, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
@@ -26,7 +26,7 @@ from homeassistant.helpers.issue_registry import (
 
 from . import TuyaConfigEntry
 from .const import DOMAIN, TUYA_DISCOVERY_NEW, DeviceCategory, DPCode
-from .entity import TuyaEntity
+from .entity import DisabledEntities, TuyaEntity
 from .models import DPCodeBooleanWrapper
 
 
@@ -942,13 +942,19 @@ async def async_setup_entry(
     def async_discover_device(device_ids: list[str]) -> None:
         """Discover and add a discovered tuya sensor."""
         entities: list[TuyaSwitchEntity] = []
+        disabled = DisabledEntities(hass, entry, Platform.SWITCH)
         for device_id in device_ids:
             device = manager.device_map[device_id]
             if descriptions := SWITCHES.get(device.category):
                 entities.extend(
                     TuyaSwitchEntity(device, manager, description, dpcode_wrapper)
                     for description in descriptions
-                    if (
+                    # Disabled deprecated entities are removed before they are skipped
+                    if not _remove_disabled_deprecated(
+                        hass, device, description, entity_registry
+                    )
+                    and not disabled.skip(device, description.key, description.key)
+                    and (
                         dpcode_wrapper := DPCodeBooleanWrapper.find_dpcode(
                             device, description.key, prefer_function=True
                         )
@@ -961,7 +967,7 @@ async def async_setup_entry(
                     )
                 )
 
-        async_add_entities(entities)
+        async_add_entities([*entities, *disabled.placeholders])
 
     async_discover_device([*manager.device_map])
 
@@ -970,6 +976,39 @@ async def async_setup_entry(
     )
 
 
+def _remove_disabled_deprecated(
+    hass: HomeAssistant,
+    device: CustomerDevice,
+    description: SwitchEntityDescription,
+    entity_registry: er.EntityRegistry,
+) -> bool:
+    """Remove a deprecated entity disabled by the user.
+
+    Returns:
+        `True` if the entity was removed, `False` otherwise.
+    """
+    if not isinstance(description, TuyaDeprecatedSwitchEntityDescription):
+        return False
+
+    unique_id = f"tuya.{device.id}{description.key}"
+    if not (
+        entity_id := entity_registry.async_get_entity_id(
+            SWITCH_DOMAIN, DOMAIN, unique_id
+        )
+    ) or not (entity_entry := entity_registry.async_get(entity_id)):
+        return False
+    if not entity_entry.disabled:
+        return False
+
+    entity_registry.async_remove(entity_id)
+    async_delete_issue(
+        hass,
+        DOMAIN,
+        f"deprecated_entity_{unique_id}",
+    )
+    return True
+
+
 def _check_deprecation(
     hass: HomeAssistant,
     device: CustomerDevice,
@@ -992,15 +1031,7 @@ def _check_deprecation(
     if not entity_id or not (entity_entry := entity_registry.async_get(entity_id)):
         return False
 
-    # Deprecated and present in registry but disabled, remove it and skip creation
-    if entity_entry.disabled:
-        entity_registry.async_remove(entity_id)
-        async_delete_issue(
-            hass,
-            DOMAIN,
-            f"deprecated_entity_{unique_id}",
-        )
-        return False
+    # Deprecated and disabled entities were removed by _remove_disabled_deprecated
 
     # Deprecated and present in registry and enabled, raise issue and create it
     async_create_issue(
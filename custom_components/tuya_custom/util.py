@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Coroutine
+from typing import Any
+
 from tuya_sharing import CustomerDevice
 
 from homeassistant.exceptions import ServiceValidationError
@@ -106,3 +110,36 @@ class ActionDPCodeNotFoundError(ServiceValidationError):
                 "available": str(sorted(device.function.keys())),
             },
         )
+
+
+class SingleFlight[T]:
+    """Share the result of a single in-flight call between concurrent callers.
+
+    The first caller starts the call, callers arriving while it is still
+    running await the same result instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        """Init SingleFlight."""
+        self._task: asyncio.Task[T] | None = None
+
+    @property
+    def in_flight(self) -> bool:
+        """Return if a call is currently running."""
+        return self._task is not None
+
+    async def async_run(self, target: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        """Run target, or join the call that is already running."""
+        if (task := self._task) is None:
+            self._task = task = asyncio.get_running_loop().create_task(target())
+            task.add_done_callback(self._async_done)
+        # Cancelling one caller must not cancel the call shared with the others
+        return await asyncio.shield(task)
+
+    def _async_done(self, task: asyncio.Task[T]) -> None:
+        """Forget the finished call."""
+        if self._task is task:
+            self._task = None
+        # Mark the exception as retrieved, callers may all have been cancelled
+        if not task.cancelled():
+            task.exception()
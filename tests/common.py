@@ -0,0 +1,69 @@
+"""Common helpers of the Tuya tests."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from custom_components.tuya_custom import HomeAssistantTuyaData
+from custom_components.tuya_custom.const import DOMAIN, TUYA_CLIENT_ID
+from custom_components.tuya_custom.manager import TuyaManager
+
+TOKEN_RESPONSE = {
+    "t": 0,
+    "uid": "uid",
+    "expire_time": 7200,
+    "access_token": "access",
+    "refresh_token": "refresh",
+}
+
+
+def mock_device(device_id: str, **kwargs: Any) -> SimpleNamespace:
+    """Return a device with the attributes represented in the diagnostics."""
+    return SimpleNamespace(
+        **{
+            "id": device_id,
+            "name": f"Device {device_id}",
+            "category": "kg",
+            "product_id": "product",
+            "product_name": "Switch",
+            "online": True,
+            "sub": False,
+            "time_zone": "+01:00",
+            "active_time": 0,
+            "create_time": 0,
+            "update_time": 0,
+            "set_up": True,
+            "support_local": False,
+            "function": {},
+            "status_range": {},
+            "status": {"switch_1": True},
+            **kwargs,
+        }
+    )
+
+
+def setup_entry(hass: HomeAssistant, devices: list[SimpleNamespace]) -> MockConfigEntry:
+    """Add a loaded config entry whose manager has the devices."""
+    manager = TuyaManager(
+        TUYA_CLIENT_ID, "user", "terminal", "https://apigw.tuyaeu.com", TOKEN_RESPONSE
+    )
+    manager.mq = SimpleNamespace(client=None, device=[])
+    manager.device_map = {device.id: device for device in devices}
+    entry = MockConfigEntry(domain=DOMAIN, state=ConfigEntryState.LOADED)
+    entry.add_to_hass(hass)
+    entry.runtime_data = HomeAssistantTuyaData(
+        manager=manager,
+        listener=MagicMock(),
+        platforms=set(),
+        loading_platforms=set(),
+        platform_setup_times={},
+        startup_times={},
+    )
+    return entry
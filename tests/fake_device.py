@@ -0,0 +1,164 @@
+"""A Tuya device speaking the LAN protocol on the loopback interface."""
+
+from __future__ import annotations
+
+import asyncio
+from hashlib import sha256
+import hmac
+import json
+import os
+from typing import Any
+
+from custom_components.tuya_custom.local import (
+    _HEADER,
+    Command,
+    TuyaLocalError,
+    TuyaLocalMessage,
+    decrypt,
+    encrypt,
+    pack_message,
+    unpack_message,
+)
+
+
+class FakeTuyaDevice:
+    """Serve a single 3.3 or 3.4 client like a Tuya device would."""
+
+    def __init__(self, local_key: str, version: str, dps: dict[str, Any]) -> None:
+        """Init FakeTuyaDevice."""
+        self.version = version
+        self.dps = dict(dps)
+        self.controls: list[dict[str, Any]] = []
+        self.negotiated = asyncio.Event()
+        self.queried = asyncio.Event()
+        self.port = 0
+        self._local_key = local_key.encode()
+        self._key = self._local_key
+        self._remote_nonce = b""
+        self._local_nonce = b""
+        self._seqno = 0
+        self._server: asyncio.Server | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def async_start(self) -> None:
+        """Listen on a free loopback port."""
+        self._server = await asyncio.start_server(self._async_serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        """Close the connection and stop listening."""
+        if self._writer is not None:
+            self._writer.close()
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    def push_status(self, dps: dict[str, Any]) -> None:
+        """Report changed DPs, as done when the device is operated manually."""
+        self.dps.update(dps)
+        if self.version == "3.4":
+            data = {"protocol": 4, "t": 1, "data": {"dps": dps}}
+        else:
+            data = {"devId": "device", "dps": dps, "t": 1}
+        self._send(Command.STATUS, json.dumps(data).encode(), header=True)
+
+    async def _async_serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle the messages of a client until it disconnects."""
+        self._writer = writer
+        self._key = self._local_key
+        try:
+            while True:
+                header = await reader.readexactly(_HEADER.size)
+                length = _HEADER.unpack(header)[3]
+                data = header + await reader.readexactly(length)
+                self._handle_message(
+                    unpack_message(
+                        data,
+                        hmac_key=self._key if self.version == "3.4" else None,
+                        has_retcode=False,
+                    )
+                )
+        except (asyncio.IncompleteReadError, TuyaLocalError):
+            # Devices drop connections with invalid messages
+            pass
+        finally:
+            writer.close()
+
+    def _handle_message(self, message: TuyaLocalMessage) -> None:
+        """Answer a message of the client."""
+        payload = self._decode(message.payload)
+        if message.cmd == Command.SESS_KEY_NEG_START:
+            self._local_nonce = payload
+            self._remote_nonce = os.urandom(16)
+            self._send(
+                Command.SESS_KEY_NEG_RESP,
+                self._remote_nonce
+                + hmac.new(self._local_key, self._local_nonce, sha256).digest(),
+                seqno=message.seqno,
+            )
+        elif message.cmd == Command.SESS_KEY_NEG_FINISH:
+            assert (
+                payload
+                == hmac.new(self._local_key, self._remote_nonce, sha256).digest()
+            )
+            self._key = encrypt(
+                self._local_key,
+                bytes(
+                    a ^ b
+                    for a, b in zip(self._local_nonce, self._remote_nonce, strict=True)
+                ),
+                pad=False,
+            )
+            self.negotiated.set()
+        elif message.cmd in (Command.DP_QUERY, Command.DP_QUERY_NEW):
+            self._send(
+                message.cmd, json.dumps({"dps": self.dps}).encode(), seqno=message.seqno
+            )
+            self.queried.set()
+        elif message.cmd in (Command.CONTROL, Command.CONTROL_NEW):
+            data = json.loads(payload)
+            dps = data["data"]["dps"] if self.version == "3.4" else data["dps"]
+            self.controls.append(dps)
+            self._send(message.cmd, b"", seqno=message.seqno)
+            self.push_status(dps)
+        elif message.cmd == Command.HEART_BEAT:
+            self._send(Command.HEART_BEAT, b"", seqno=message.seqno)
+
+    def _decode(self, payload: bytes) -> bytes:
+        """Decrypt a payload and strip its version header."""
+        if self.version == "3.4":
+            payload = decrypt(self._key, payload)
+            return payload[15:] if payload.startswith(b"3.4") else payload
+        if payload.startswith(b"3.3"):
+            payload = payload[15:]
+        return decrypt(self._key, payload)
+
+    def _send(
+        self,
+        cmd: Command,
+        payload: bytes,
+        *,
+        seqno: int | None = None,
+        header: bool = False,
+    ) -> None:
+        """Encrypt and send a message with a zero return code."""
+        assert self._writer is not None
+        if seqno is None:
+            self._seqno += 1
+            seqno = self._seqno
+        if self.version == "3.4":
+            if header:
+                payload = b"3.4" + bytes(12) + payload
+            data = pack_message(
+                TuyaLocalMessage(seqno, cmd, encrypt(self._key, payload), 0),
+                hmac_key=self._key,
+            )
+        else:
+            if payload:
+                payload = encrypt(self._key, payload)
+            if header:
+                payload = b"3.3" + bytes(12) + payload
+            data = pack_message(TuyaLocalMessage(seqno, cmd, payload, 0))
+        self._writer.write(data)
@@ -0,0 +1,145 @@
+"""Tests for the debounced availability of Tuya devices."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.tuya_custom.availability import AvailabilityTracker
+from custom_components.tuya_custom.const import (
+    CONF_AVAILABILITY_GRACE_PERIOD,
+    TUYA_HA_SIGNAL_UPDATE_ENTITY,
+)
+
+GRACE_PERIOD = 30
+
+
+@pytest.fixture
+def device() -> SimpleNamespace:
+    """Return an online device."""
+    return SimpleNamespace(id="device", online=True)
+
+
+@pytest.fixture
+def signals(hass: HomeAssistant, device: SimpleNamespace) -> list[tuple[Any, ...]]:
+    """Return the entity updates sent for the device."""
+    signals: list[tuple[Any, ...]] = []
+    async_dispatcher_connect(
+        hass,
+        f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device.id}",
+        lambda *args: signals.append(args),
+    )
+    return signals
+
+
+def _tracker(hass: HomeAssistant, grace_period: float) -> AvailabilityTracker:
+    """Return a tracker with a grace period."""
+    entry = SimpleNamespace(options={CONF_AVAILABILITY_GRACE_PERIOD: grace_period})
+    return AvailabilityTracker(hass, entry)
+
+
+async def test_offline_after_grace_period(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    device: SimpleNamespace,
+    signals: list[tuple[Any, ...]],
+) -> None:
+    """Test a device only becomes unavailable once the grace period passed."""
+    tracker = _tracker(hass, GRACE_PERIOD)
+    assert tracker.available(device)
+
+    device.online = False
+    assert not tracker.async_update(device)
+    assert tracker.available(device)
+    assert tracker.device_as_dict(device.id)["offline_pending"]
+
+    freezer.tick(timedelta(seconds=GRACE_PERIOD))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert not tracker.available(device)
+    assert signals == [(None, None)]
+
+    # Back online at once
+    device.online = True
+    assert tracker.async_update(device)
+    assert tracker.available(device)
+    assert tracker.device_as_dict(device.id) == {
+        "available": True,
+        "offline_pending": False,
+        "flaps": 0,
+        "transitions": 2,
+    }
+
+
+async def test_flapping_device_stays_available(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    device: SimpleNamespace,
+    signals: list[tuple[Any, ...]],
+) -> None:
+    """Test offline reports withdrawn within the grace period are absorbed."""
+    tracker = _tracker(hass, GRACE_PERIOD)
+    tracker.available(device)
+
+    for _ in range(3):
+        device.online = False
+        assert not tracker.async_update(device)
+        freezer.tick(timedelta(seconds=GRACE_PERIOD / 2))
+        async_fire_time_changed(hass)
+        device.online = True
+        assert not tracker.async_update(device)
+
+    freezer.tick(timedelta(seconds=GRACE_PERIOD))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert tracker.available(device)
+    assert not signals
+    assert tracker.device_as_dict(device.id) == {
+        "available": True,
+        "offline_pending": False,
+        "flaps": 3,
+        "transitions": 0,
+    }
+
+
+async def test_no_grace_period(hass: HomeAssistant, device: SimpleNamespace) -> None:
+    """Test a device goes offline at once without a grace period."""
+    tracker = _tracker(hass, 0)
+    tracker.available(device)
+
+    device.online = False
+    assert tracker.async_update(device)
+    assert not tracker.available(device)
+    # Repeated offline reports change nothing
+    assert not tracker.async_update(device)
+
+
+async def test_stop_cancels_grace_period(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    device: SimpleNamespace,
+    signals: list[tuple[Any, ...]],
+) -> None:
+    """Test pending grace periods do not fire after the tracker stopped."""
+    tracker = _tracker(hass, GRACE_PERIOD)
+    tracker.available(device)
+    device.online = False
+    tracker.async_update(device)
+
+    tracker.async_stop()
+    freezer.tick(timedelta(seconds=GRACE_PERIOD))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert not signals
+    assert tracker.available(device)
@@ -0,0 +1,127 @@
+"""Tests for the Tuya cloud circuit breaker."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from custom_components.tuya_custom import breaker as breaker_module
+from custom_components.tuya_custom.breaker import (
+    BREAKER_BACKOFF,
+    BREAKER_FAILURE_THRESHOLD,
+    BreakerState,
+    CircuitBreaker,
+    CloudUnavailable,
+)
+from custom_components.tuya_custom.budget import Priority
+from custom_components.tuya_custom.manager import TuyaManager
+
+ENDPOINT = "https://apigw.tuyaeu.com"
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use the backoff without jitter."""
+    monkeypatch.setattr(breaker_module.random, "uniform", lambda low, high: 1.0)
+
+
+def _open_breaker(breaker: CircuitBreaker) -> None:
+    """Fail enough requests to open the breaker."""
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        breaker.before_request()
+        breaker.record_failure("timeout")
+
+
+def test_opens_after_consecutive_failures() -> None:
+    """Test the breaker only opens after consecutive failures."""
+    breaker = CircuitBreaker(ENDPOINT)
+    listener = MagicMock()
+    breaker.add_listener(listener)
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        breaker.record_failure("timeout")
+    breaker.record_success()
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        breaker.record_failure("timeout")
+    assert breaker.state is BreakerState.CLOSED
+    listener.assert_not_called()
+
+    breaker.record_failure("timeout")
+    assert breaker.state is BreakerState.OPEN
+    listener.assert_called_once()
+    with pytest.raises(CloudUnavailable):
+        breaker.before_request()
+    assert breaker.as_dict()["rejected"] == 1
+
+
+def test_single_probe_closes(freezer: FrozenDateTimeFactory) -> None:
+    """Test a single probe is let through once the backoff elapsed."""
+    breaker = CircuitBreaker(ENDPOINT)
+    _open_breaker(breaker)
+
+    freezer.tick(BREAKER_BACKOFF)
+    assert breaker.before_request() is True
+    assert breaker.state is BreakerState.HALF_OPEN
+    with pytest.raises(CloudUnavailable):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.before_request() is False
+
+
+def test_failed_probe_doubles_backoff(freezer: FrozenDateTimeFactory) -> None:
+    """Test the breaker reopens with a longer backoff when the probe fails."""
+    breaker = CircuitBreaker(ENDPOINT)
+    _open_breaker(breaker)
+
+    freezer.tick(BREAKER_BACKOFF)
+    assert breaker.before_request()
+    breaker.record_failure("timeout")
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.as_dict()["retry_in"] == 2 * BREAKER_BACKOFF
+
+    freezer.tick(BREAKER_BACKOFF)
+    with pytest.raises(CloudUnavailable):
+        breaker.before_request()
+    freezer.tick(BREAKER_BACKOFF)
+    assert breaker.before_request()
+
+
+def test_cancelled_probe(freezer: FrozenDateTimeFactory) -> None:
+    """Test a probe which was not made lets the next request probe."""
+    breaker = CircuitBreaker(ENDPOINT)
+    _open_breaker(breaker)
+    freezer.tick(BREAKER_BACKOFF)
+
+    assert breaker.before_request()
+    breaker.cancel_probe()
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.before_request()
+
+
+def test_call_cloud_records_result() -> None:
+    """Test cloud requests and HTTP error responses are recorded."""
+    breaker = CircuitBreaker(ENDPOINT)
+    manager = SimpleNamespace(breaker=breaker, _before_request=MagicMock())
+
+    def call(target: MagicMock, *, raw_response: bool = False) -> None:
+        TuyaManager.call_cloud(
+            manager, Priority.BACKGROUND, target, raw_response=raw_response
+        )
+
+    # Responses without a result are only failures for raw API requests
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        call(MagicMock(return_value=None))
+    assert breaker.state is BreakerState.CLOSED
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+        call(MagicMock(return_value=None), raw_response=True)
+    with pytest.raises(RequestsConnectionError):
+        call(MagicMock(side_effect=RequestsConnectionError))
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.as_dict()["consecutive_failures"] == BREAKER_FAILURE_THRESHOLD
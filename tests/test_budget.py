@@ -0,0 +1,78 @@
+"""Tests for the Tuya cloud request budget."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from custom_components.tuya_custom import budget
+from custom_components.tuya_custom.budget import CloudBudget, Priority
+
+
+@pytest.fixture(autouse=True)
+def short_max_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Drop requests after a short wait."""
+    monkeypatch.setattr(budget, "BUDGET_MAX_WAIT", dict.fromkeys(Priority, 0.05))
+
+
+def test_background_keeps_reserve() -> None:
+    """Test background requests leave part of the burst to user actions."""
+    cloud_budget = CloudBudget(rate=0.001, burst=4)
+
+    # Half of the burst is reserved for higher priorities
+    assert cloud_budget.acquire(Priority.BACKGROUND)
+    assert cloud_budget.acquire(Priority.BACKGROUND)
+    assert not cloud_budget.acquire(Priority.BACKGROUND)
+
+    assert cloud_budget.acquire(Priority.INTERACTIVE)
+    assert cloud_budget.acquire(Priority.INTERACTIVE)
+    assert not cloud_budget.acquire(Priority.INTERACTIVE)
+
+    diagnostics = cloud_budget.as_dict()
+    assert diagnostics["background"] == {
+        "waiting": 0,
+        "granted": 2,
+        "deferred": 0,
+        "dropped": 1,
+    }
+    assert diagnostics["interactive"]["granted"] == 2
+    assert diagnostics["interactive"]["dropped"] == 1
+
+
+def test_refill_defers_requests() -> None:
+    """Test a request waits for the bucket to refill."""
+    cloud_budget = CloudBudget(rate=100, burst=1)
+    assert cloud_budget.acquire(Priority.INTERACTIVE)
+
+    assert cloud_budget.acquire(Priority.INTERACTIVE)
+    assert cloud_budget.as_dict()["interactive"]["deferred"] == 1
+
+
+def test_waiting_higher_priority_served_first() -> None:
+    """Test lower priorities yield to a waiting higher priority request."""
+    cloud_budget = CloudBudget(rate=0.001, burst=4)
+    cloud_budget._lanes[Priority.INTERACTIVE].waiting = 1
+
+    assert not cloud_budget.acquire(Priority.CONFIRMATION)
+
+    cloud_budget._lanes[Priority.INTERACTIVE].waiting = 0
+    assert cloud_budget.acquire(Priority.CONFIRMATION)
+
+
+def test_concurrent_requests_share_budget() -> None:
+    """Test tokens are not handed out twice to concurrent threads."""
+    cloud_budget = CloudBudget(rate=0.001, burst=10)
+    results: list[bool] = []
+
+    def request() -> None:
+        results.append(cloud_budget.acquire(Priority.INTERACTIVE))
+
+    threads = [threading.Thread(target=request) for _ in range(15)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 10
+    assert results.count(False) == 5
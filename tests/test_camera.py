@@ -0,0 +1,158 @@
+"""Tests for the Tuya camera stream URLs and snapshots."""
+
+from __future__ import annotations
+
+from itertools import count
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.tuya_custom.camera import (
+    SNAPSHOT_RETRY_INTERVAL,
+    STREAM_URL_REFRESH_AHEAD,
+    STREAM_URL_TTL,
+    _SnapshotCache,
+    _StreamSourceCache,
+)
+from custom_components.tuya_custom.const import DEFAULT_SNAPSHOT_MAX_AGE
+
+FRAME = b"\xff\xd8frame"
+
+
+def _stream_source_cache(hass: HomeAssistant) -> tuple[_StreamSourceCache, MagicMock]:
+    """Return a stream URL cache, and the cloud allocating a new URL each time."""
+    urls = (f"rtsp://camera/{index}" for index in count(1))
+    manager = MagicMock()
+    manager.call_cloud.side_effect = lambda priority, target, *args: next(urls)
+    entity = SimpleNamespace(
+        hass=hass, platform=SimpleNamespace(config_entry=SimpleNamespace(options={}))
+    )
+    return _StreamSourceCache(entity, SimpleNamespace(id="camera"), manager), manager
+
+
+def _snapshot_cache(hass: HomeAssistant) -> _SnapshotCache:
+    """Return a snapshot cache of a camera with a stream URL."""
+    entity = SimpleNamespace(
+        hass=hass, platform=SimpleNamespace(config_entry=SimpleNamespace(options={}))
+    )
+    stream_source = MagicMock(async_get=AsyncMock(return_value="rtsp://camera"))
+    return _SnapshotCache(entity, stream_source)
+
+
+async def test_snapshot_single_dimension(hass: HomeAssistant) -> None:
+    """Test a request with a single dimension is scaled by that dimension."""
+    cache = _snapshot_cache(hass)
+    cache.async_set_image(FRAME)
+
+    with patch(
+        "custom_components.tuya_custom.camera.scale_jpeg_camera_image",
+        return_value=b"scaled",
+    ) as scale:
+        assert await cache.async_get(640, None) == b"scaled"
+        assert await cache.async_get(None, 360) == b"scaled"
+        assert await cache.async_get(640, None) == b"scaled"
+        assert await cache.async_get(None, None) == FRAME
+
+    assert [call.args[1:] for call in scale.call_args_list] == [(640, 0), (0, 360)]
+
+
+async def test_snapshot_failed_grab_backs_off(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a failed frame grab is not retried by every request."""
+    cache = _snapshot_cache(hass)
+
+    with patch(
+        "custom_components.tuya_custom.camera.ffmpeg.async_get_image",
+        return_value=None,
+    ) as get_image:
+        assert await cache.async_get(None, None) is None
+        assert await cache.async_get(None, None) is None
+        assert get_image.call_count == 1
+
+        freezer.tick(max(DEFAULT_SNAPSHOT_MAX_AGE, SNAPSHOT_RETRY_INTERVAL) + 1)
+        get_image.return_value = FRAME
+        assert await cache.async_get(None, None) == FRAME
+        assert get_image.call_count == 2
+
+        # The new frame is cached
+        assert await cache.async_get(None, None) == FRAME
+        assert get_image.call_count == 2
+
+
+async def test_fetch_event_picture(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a pushed picture replaces the cached frame, unless it failed."""
+    cache = _snapshot_cache(hass)
+    aioclient_mock.get("https://example.com/picture.jpg", content=FRAME)
+    aioclient_mock.get("https://example.com/missing.jpg", status=404)
+
+    await cache.async_fetch_picture("https://example.com/picture.jpg")
+    assert await cache.async_get(None, None) == FRAME
+
+    await cache.async_fetch_picture("https://example.com/missing.jpg")
+    assert await cache.async_get(None, None) == FRAME
+
+
+async def test_stream_url_cached(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the stream URL is reused within its lifetime."""
+    cache, manager = _stream_source_cache(hass)
+
+    assert await cache.async_get() == "rtsp://camera/1"
+    freezer.tick(STREAM_URL_TTL - STREAM_URL_REFRESH_AHEAD - 1)
+    assert await cache.async_get() == "rtsp://camera/1"
+    await hass.async_block_till_done()
+
+    assert manager.call_cloud.call_count == 1
+
+
+async def test_stream_url_refreshed_ahead(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a URL about to expire is used while a new one is allocated."""
+    cache, manager = _stream_source_cache(hass)
+    await cache.async_get()
+
+    freezer.tick(STREAM_URL_TTL - STREAM_URL_REFRESH_AHEAD + 1)
+    assert await cache.async_get() == "rtsp://camera/1"
+    await hass.async_block_till_done()
+
+    assert manager.call_cloud.call_count == 2
+    assert await cache.async_get() == "rtsp://camera/2"
+    await hass.async_block_till_done()
+    assert manager.call_cloud.call_count == 2
+
+
+async def test_stream_url_expired(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test an expired URL is not used."""
+    cache, manager = _stream_source_cache(hass)
+    await cache.async_get()
+
+    freezer.tick(STREAM_URL_TTL + 1)
+    assert await cache.async_get() == "rtsp://camera/2"
+    assert manager.call_cloud.call_count == 2
+
+
+async def test_stream_url_invalidated_by_failed_grab(hass: HomeAssistant) -> None:
+    """Test a new URL is allocated after no frame could be grabbed."""
+    stream_source, manager = _stream_source_cache(hass)
+    cache = _SnapshotCache(stream_source._entity, stream_source)
+
+    with patch(
+        "custom_components.tuya_custom.camera.ffmpeg.async_get_image",
+        return_value=None,
+    ) as get_image:
+        assert await cache.async_get(None, None) is None
+
+    assert get_image.call_args.args[1] == "rtsp://camera/1"
+    assert await stream_source.async_get() == "rtsp://camera/2"
+    assert manager.call_cloud.call_count == 2
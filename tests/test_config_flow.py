@@ -0,0 +1,91 @@
+"""Tests for the Tuya options flow."""
+
+from __future__ import annotations
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType, InvalidData
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.tuya_custom.const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
+    CONF_MIN_INTERVAL,
+    CONF_SENSOR_THROTTLING,
+    DOMAIN,
+)
+
+THROTTLING = {CONF_DEADBAND: 0.5, CONF_DEADBAND_RELATIVE: False, CONF_MIN_INTERVAL: 30}
+
+
+@pytest.fixture
+def entry(hass: HomeAssistant, entity_registry: er.EntityRegistry) -> MockConfigEntry:
+    """Return a config entry with a sensor and a command latency sensor."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        options={CONF_SENSOR_THROTTLING: {"tuya.devicetemp_current": THROTTLING}},
+    )
+    entry.add_to_hass(hass)
+    for unique_id in (
+        "tuya.devicetemp_current",
+        "tuya.devicecommand_latency_response",
+    ):
+        entity_registry.async_get_or_create(
+            "sensor", DOMAIN, unique_id, config_entry=entry
+        )
+    entity_registry.async_get_or_create(
+        "switch", DOMAIN, "tuya.deviceswitch", config_entry=entry
+    )
+    return entry
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_sensor_throttling(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry, entry: MockConfigEntry
+) -> None:
+    """Test only sensors can be throttled, starting from their current settings."""
+    sensor = entity_registry.async_get_entity_id(
+        "sensor", DOMAIN, "tuya.devicetemp_current"
+    )
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "sensor_throttling"}
+    )
+    assert result["step_id"] == "sensor_throttling"
+    entity_selector = result["data_schema"].schema["entity_id"]
+    assert entity_selector.config["include_entities"] == [sensor]
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"entity_id": sensor}
+    )
+    assert result["step_id"] == "sensor_throttling_settings"
+    assert result["data_schema"]({}) == THROTTLING
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_DEADBAND: 0, CONF_DEADBAND_RELATIVE: False, CONF_MIN_INTERVAL: 0},
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options[CONF_SENSOR_THROTTLING] == {}
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_sensor_throttling_latency_sensor(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry, entry: MockConfigEntry
+) -> None:
+    """Test command latency sensors are rejected."""
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {"next_step_id": "sensor_throttling"}
+    )
+    with pytest.raises(InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {
+                "entity_id": entity_registry.async_get_entity_id(
+                    "sensor", DOMAIN, "tuya.devicecommand_latency_response"
+                )
+            },
+        )
@@ -0,0 +1,42 @@
+"""Tests for the Tuya diagnostics."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.tuya_custom.const import DOMAIN
+from custom_components.tuya_custom.diagnostics import async_get_device_diagnostics
+
+from .common import mock_device, setup_entry
+
+
+async def test_device_diagnostics(
+    hass: HomeAssistant, device_registry: dr.DeviceRegistry
+) -> None:
+    """Test the diagnostics of a Tuya device."""
+    entry = setup_entry(hass, [mock_device("device")])
+    device = device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(DOMAIN, "device")}
+    )
+
+    data = await async_get_device_diagnostics(hass, entry, device)
+
+    assert data["id"] == "device"
+    assert data["status"] == {"switch_1": True}
+    assert data["endpoint"] == "https://apigw.tuyaeu.com"
+
+
+async def test_service_device_diagnostics(
+    hass: HomeAssistant, device_registry: dr.DeviceRegistry
+) -> None:
+    """Test devices which are not Tuya devices only have the entry diagnostics."""
+    entry = setup_entry(hass, [mock_device("device")])
+    device = device_registry.async_get_or_create(
+        config_entry_id=entry.entry_id, identifiers={(DOMAIN, f"tyc{entry.entry_id}")}
+    )
+
+    data = await async_get_device_diagnostics(hass, entry, device)
+
+    assert "id" not in data
+    assert data["endpoint"] == "https://apigw.tuyaeu.com"
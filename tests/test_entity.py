@@ -0,0 +1,70 @@
+"""Tests for the Tuya base entities."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.tuya_custom.const import DOMAIN, DPCode
+from custom_components.tuya_custom.entity import DisabledEntities
+
+
+@pytest.fixture
+def disabled(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry
+) -> DisabledEntities:
+    """Return the disabled switches, switch_1 and switch_2 of a device."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    entry.runtime_data = SimpleNamespace(
+        manager=SimpleNamespace(disabled_devices=set())
+    )
+    for key in (DPCode.SWITCH_1, DPCode.SWITCH_2, "command_latency_response"):
+        entity_registry.async_get_or_create(
+            "switch",
+            DOMAIN,
+            f"tuya.device{key}",
+            config_entry=entry,
+            disabled_by=er.RegistryEntryDisabler.USER,
+        )
+    return DisabledEntities(hass, entry, "switch")
+
+
+def test_skip_disabled_entities(disabled: DisabledEntities) -> None:
+    """Test placeholders are only added for disabled DPs the device provides."""
+    device = SimpleNamespace(
+        id="device",
+        function={DPCode.SWITCH_1: {}},
+        status={DPCode.SWITCH_1: True, DPCode.SWITCH_3: False},
+        status_range={},
+    )
+
+    assert disabled.skip(device, DPCode.SWITCH_1, DPCode.SWITCH_1)
+    # Gone from the device, skipped without a placeholder
+    assert disabled.skip(device, DPCode.SWITCH_2, DPCode.SWITCH_2)
+    # Enabled entities are not skipped
+    assert not disabled.skip(device, DPCode.SWITCH_3, DPCode.SWITCH_3)
+    # Not backed by a DP
+    assert disabled.skip(device, "command_latency_response", None)
+
+    assert [placeholder.unique_id for placeholder in disabled.placeholders] == [
+        "tuya.deviceswitch_1",
+        "tuya.devicecommand_latency_response",
+    ]
+    assert disabled.device_manager.disabled_devices == {"device"}
+
+
+def test_skip_disabled_entity_of_missing_device_dps(
+    disabled: DisabledEntities,
+) -> None:
+    """Test a device without the DPs of its disabled entities is not tracked."""
+    device = SimpleNamespace(id="device", function={}, status={}, status_range={})
+
+    assert disabled.skip(device, DPCode.SWITCH_1, DPCode.SWITCH_1)
+    assert not disabled.placeholders
+    assert not disabled.device_manager.disabled_devices
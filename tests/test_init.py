@@ -0,0 +1,195 @@
+"""Tests for the Tuya integration setup."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.tuya_custom import DeviceListener, async_get_platforms
+from custom_components.tuya_custom.alarm_control_panel import ALARM
+from custom_components.tuya_custom.binary_sensor import BINARY_SENSORS
+from custom_components.tuya_custom.button import BUTTONS
+from custom_components.tuya_custom.camera import CAMERAS
+from custom_components.tuya_custom.climate import CLIMATE_DESCRIPTIONS
+from custom_components.tuya_custom.const import (
+    PLATFORM_CATEGORIES,
+    TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    DeviceCategory,
+)
+from custom_components.tuya_custom.cover import COVERS
+from custom_components.tuya_custom.event import EVENTS
+from custom_components.tuya_custom.fan import TUYA_SUPPORT_TYPE
+from custom_components.tuya_custom.humidifier import HUMIDIFIERS
+from custom_components.tuya_custom.light import LIGHTS
+from custom_components.tuya_custom.number import NUMBERS
+from custom_components.tuya_custom.select import SELECTS
+from custom_components.tuya_custom.sensor import SENSORS
+from custom_components.tuya_custom.siren import SIRENS
+from custom_components.tuya_custom.switch import SWITCHES
+from custom_components.tuya_custom.valve import VALVES
+
+
+@pytest.mark.parametrize(
+    ("platform", "categories"),
+    [
+        (Platform.ALARM_CONTROL_PANEL, ALARM),
+        (Platform.BINARY_SENSOR, BINARY_SENSORS),
+        (Platform.BUTTON, BUTTONS),
+        (Platform.CAMERA, CAMERAS),
+        (Platform.CLIMATE, CLIMATE_DESCRIPTIONS),
+        (Platform.COVER, COVERS),
+        (Platform.EVENT, EVENTS),
+        (Platform.FAN, TUYA_SUPPORT_TYPE),
+        (Platform.HUMIDIFIER, HUMIDIFIERS),
+        (Platform.LIGHT, LIGHTS),
+        (Platform.NUMBER, NUMBERS),
+        (Platform.SELECT, SELECTS),
+        (Platform.SENSOR, SENSORS),
+        (Platform.SIREN, SIRENS),
+        (Platform.SWITCH, SWITCHES),
+        (Platform.VACUUM, {DeviceCategory.SD}),
+        (Platform.VALVE, VALVES),
+    ],
+)
+def test_platform_categories(
+    platform: Platform, categories: Collection[DeviceCategory]
+) -> None:
+    """Test every category of a description table loads its platform."""
+    assert set(categories) <= PLATFORM_CATEGORIES[platform]
+
+
+def test_platforms_of_alias_category() -> None:
+    """Test a category sharing the descriptions of another one."""
+    device = SimpleNamespace(category=DeviceCategory.CZ, function={})
+
+    assert {Platform.LIGHT, Platform.SELECT, Platform.SENSOR, Platform.SWITCH} <= (
+        async_get_platforms([device])
+    )
+
+
+def test_platforms_without_devices() -> None:
+    """Test device platforms are not loaded for an account without devices."""
+    assert async_get_platforms([]) == {Platform.SCENE}
+
+
+def test_platforms_without_sensor_dps() -> None:
+    """Test the sensor platform is not loaded for the command latency alone."""
+    device = SimpleNamespace(
+        category=DeviceCategory.DJ, function={"switch_led": object()}
+    )
+
+    assert Platform.SENSOR not in async_get_platforms([device])
+
+
+def _listener(
+    hass: HomeAssistant, availability: Any = None
+) -> tuple[DeviceListener, dict[str, list[tuple[Any, ...]]]]:
+    """Return a device listener, and the updates dispatched per device."""
+    manager = SimpleNamespace(
+        metrics=MagicMock(), profiler=None, availability=availability
+    )
+    dispatched: dict[str, list[tuple[Any, ...]]] = {}
+    for device_id in ("a", "b"):
+        async_dispatcher_connect(
+            hass,
+            f"{TUYA_HA_SIGNAL_UPDATE_ENTITY}_{device_id}",
+            lambda *args, device_id=device_id: dispatched.setdefault(
+                device_id, []
+            ).append(args),
+        )
+    return DeviceListener(hass, manager), dispatched
+
+
+def _sorted(update: tuple[Any, ...]) -> tuple[Any, ...]:
+    """Return a dispatched update with sorted properties."""
+    properties, dp_timestamps = update
+    return (None if properties is None else sorted(properties), dp_timestamps)
+
+
+async def test_updates_merged_per_device(hass: HomeAssistant) -> None:
+    """Test queued updates of a device are dispatched once."""
+    listener, dispatched = _listener(hass)
+    device = SimpleNamespace(id="a", online=True, status={})
+
+    listener.update_device(device, ["switch_1"], {"switch_1": 1})
+    listener.update_device(device, ["switch_2"], {"switch_1": 2, "switch_2": 3})
+    listener.update_device(device, ["switch_1"])
+    await hass.async_block_till_done()
+
+    assert [_sorted(update) for update in dispatched["a"]] == [
+        (["switch_1", "switch_2"], {"switch_1": 2, "switch_2": 3})
+    ]
+
+
+@pytest.mark.parametrize(
+    "updates",
+    [
+        [["switch_1"], None, ["switch_2"]],
+        [None, ["switch_1"]],
+    ],
+)
+async def test_unknown_properties_merged(
+    hass: HomeAssistant, updates: list[list[str] | None]
+) -> None:
+    """Test an update without properties makes the merged update a full one."""
+    listener, dispatched = _listener(hass)
+    device = SimpleNamespace(id="a", online=True, status={})
+
+    for properties in updates:
+        listener.update_device(device, properties)
+    await hass.async_block_till_done()
+
+    assert dispatched["a"] == [(None, None)]
+
+
+async def test_updates_of_devices_kept_apart(hass: HomeAssistant) -> None:
+    """Test the updates of different devices are dispatched separately."""
+    listener, dispatched = _listener(hass)
+
+    listener.update_device(SimpleNamespace(id="a", online=True, status={}), ["x"])
+    listener.update_device(SimpleNamespace(id="b", online=True, status={}), ["y"])
+    await hass.async_block_till_done()
+
+    assert dispatched == {"a": [(["x"], None)], "b": [(["y"], None)]}
+
+
+async def test_queue_drained(hass: HomeAssistant) -> None:
+    """Test the queue is emptied and later updates schedule another drain."""
+    listener, dispatched = _listener(hass)
+    device = SimpleNamespace(id="a", online=True, status={})
+
+    for index in range(100):
+        listener.update_device(device, [f"dp_{index}"])
+    await hass.async_block_till_done()
+    assert not listener._updates
+    assert len(dispatched["a"]) == 1
+
+    listener.update_device(device, ["dp_0"])
+    await hass.async_block_till_done()
+    assert not listener._updates
+    assert dispatched["a"][1] == (["dp_0"], None)
+
+
+async def test_unchanged_availability_not_dispatched(hass: HomeAssistant) -> None:
+    """Test online reports within the grace period do not update the entities."""
+    availability = MagicMock()
+    availability.async_update.return_value = False
+    listener, dispatched = _listener(hass, availability)
+    device = SimpleNamespace(id="a", online=False, status={})
+
+    listener.update_device(device)
+    await hass.async_block_till_done()
+    assert not dispatched
+
+    # Status updates are dispatched regardless
+    listener.update_device(device, ["switch_1"])
+    await hass.async_block_till_done()
+    assert dispatched["a"] == [(["switch_1"], None)]
@@ -0,0 +1,225 @@
+"""Tests for the Tuya local LAN transport."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.tuya_custom.local import (
+    Command,
+    TuyaLocalEngine,
+    TuyaLocalError,
+    TuyaLocalMessage,
+    pack_message,
+    unpack_message,
+)
+
+from .fake_device import FakeTuyaDevice
+
+DEVICE_ID = "bf0123456789abcdef"
+LOCAL_KEY = "0123456789abcdef"
+
+LOCAL_STRATEGY = {
+    1: {
+        "status_code": "switch_1",
+        "value_convert": "default",
+        "config_item": {
+            "statusFormat": '{"switch_1":"$"}',
+            "valueType": "Boolean",
+        },
+    },
+    2: {
+        "status_code": "mode",
+        "value_convert": "default",
+        "config_item": {
+            "statusFormat": '{"mode":"$"}',
+            "valueType": "Enum",
+        },
+    },
+}
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    """Wait until a condition holds."""
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def device() -> SimpleNamespace:
+    """Return a cloud device which supports local control."""
+    return SimpleNamespace(
+        id=DEVICE_ID,
+        local_key=LOCAL_KEY,
+        support_local=True,
+        local_strategy=LOCAL_STRATEGY,
+        status={"switch_1": False, "mode": "auto"},
+    )
+
+
+@pytest.fixture
+def listener() -> MagicMock:
+    """Return a device listener of the manager."""
+    return MagicMock()
+
+
+@pytest.fixture
+async def engine(
+    hass: HomeAssistant, device: SimpleNamespace, listener: MagicMock
+) -> AsyncGenerator[TuyaLocalEngine]:
+    """Return a local engine without discovery."""
+    manager = SimpleNamespace(
+        device_map={DEVICE_ID: device}, device_listeners=[listener]
+    )
+    engine = TuyaLocalEngine(hass, manager, discovery_ports=())
+    yield engine
+    await engine.async_stop()
+
+
+@pytest.fixture(params=["3.3", "3.4"])
+async def fake_device(
+    request: pytest.FixtureRequest, socket_enabled: None
+) -> AsyncGenerator[FakeTuyaDevice]:
+    """Return a device listening on the loopback interface."""
+    fake_device = FakeTuyaDevice(LOCAL_KEY, request.param, {"1": True, "2": "manual"})
+    await fake_device.async_start()
+    yield fake_device
+    await fake_device.async_stop()
+
+
+async def _connect(engine: TuyaLocalEngine, fake_device: FakeTuyaDevice) -> None:
+    """Connect to the fake device as if it was discovered."""
+    engine.async_device_discovered(
+        DEVICE_ID, "127.0.0.1", fake_device.version, fake_device.port
+    )
+    await _wait_for(lambda: engine.is_connected(DEVICE_ID))
+
+
+async def test_connect_queries_status(
+    engine: TuyaLocalEngine,
+    fake_device: FakeTuyaDevice,
+    device: SimpleNamespace,
+    listener: MagicMock,
+) -> None:
+    """Test the handshake and the initial status query."""
+    await _connect(engine, fake_device)
+    if fake_device.version == "3.4":
+        assert fake_device.negotiated.is_set()
+
+    await _wait_for(lambda: listener.update_device.called)
+    listener.update_device.assert_called_once_with(device, ["switch_1", "mode"])
+    assert device.status == {"switch_1": True, "mode": "manual"}
+    assert engine.async_device_diagnostics(DEVICE_ID) == {
+        "connected": True,
+        "version": fake_device.version,
+    }
+
+
+async def test_send_commands(
+    engine: TuyaLocalEngine,
+    fake_device: FakeTuyaDevice,
+    device: SimpleNamespace,
+) -> None:
+    """Test commands are acknowledged and the pushed status is applied."""
+    await _connect(engine, fake_device)
+    await _wait_for(fake_device.queried.is_set)
+
+    commands = [{"code": "switch_1", "value": False}]
+    assert engine.can_send_commands(DEVICE_ID, commands)
+    assert await engine.async_send_commands(DEVICE_ID, commands)
+    assert fake_device.controls == [{"1": False}]
+    await _wait_for(lambda: device.status["switch_1"] is False)
+
+    # Unknown codes cannot be sent locally, and fall back to the cloud
+    commands = [{"code": "countdown_1", "value": 10}]
+    assert not engine.can_send_commands(DEVICE_ID, commands)
+    assert not await engine.async_send_commands(DEVICE_ID, commands)
+
+
+async def test_status_push(
+    engine: TuyaLocalEngine,
+    fake_device: FakeTuyaDevice,
+    device: SimpleNamespace,
+    listener: MagicMock,
+) -> None:
+    """Test a status pushed by the device notifies the listeners."""
+    await _connect(engine, fake_device)
+    await _wait_for(lambda: listener.update_device.called)
+    listener.reset_mock()
+
+    fake_device.push_status({"2": "eco", "101": 5})
+
+    await _wait_for(lambda: listener.update_device.called)
+    # DPs missing from the local strategy are ignored
+    listener.update_device.assert_called_once_with(device, ["mode"])
+    assert device.status["mode"] == "eco"
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_invalid_local_key(engine: TuyaLocalEngine) -> None:
+    """Test a 3.4 session is not established with a wrong local key."""
+    fake_device = FakeTuyaDevice("fedcba9876543210", "3.4", {})
+    await fake_device.async_start()
+    try:
+        engine.async_device_discovered(
+            DEVICE_ID, "127.0.0.1", fake_device.version, fake_device.port
+        )
+        await asyncio.sleep(0.1)
+        assert not engine.is_connected(DEVICE_ID)
+        assert not fake_device.negotiated.is_set()
+    finally:
+        await engine.async_stop()
+        await fake_device.async_stop()
+
+
+async def test_unsupported_device_ignored(
+    engine: TuyaLocalEngine, device: SimpleNamespace
+) -> None:
+    """Test devices without local support or a known version stay on the cloud."""
+    engine.async_device_discovered(DEVICE_ID, "127.0.0.1", "3.1")
+    assert engine.async_device_diagnostics(DEVICE_ID) is None
+
+    device.support_local = False
+    engine.async_device_discovered(DEVICE_ID, "127.0.0.1", "3.3")
+    assert engine.async_device_diagnostics(DEVICE_ID) is None
+
+
+@pytest.mark.parametrize("hmac_key", [None, LOCAL_KEY.encode()])
+def test_message_checksum(hmac_key: bytes | None) -> None:
+    """Test framed messages round trip and corrupted ones are rejected."""
+    message = TuyaLocalMessage(7, Command.STATUS, b"payload", 0)
+    data = pack_message(message, hmac_key=hmac_key)
+
+    assert unpack_message(data, hmac_key=hmac_key) == message
+
+    corrupted = bytearray(data)
+    corrupted[20] ^= 0xFF
+    with pytest.raises(TuyaLocalError):
+        unpack_message(bytes(corrupted), hmac_key=hmac_key)
+
+
+def test_convert_error_not_swallowed(
+    hass: HomeAssistant, device: SimpleNamespace
+) -> None:
+    """Test only malformed values are skipped, other errors are raised."""
+    manager = SimpleNamespace(device_map={DEVICE_ID: device}, device_listeners=[])
+    engine = TuyaLocalEngine(hass, manager, discovery_ports=())
+    device.local_strategy = {
+        **LOCAL_STRATEGY,
+        3: {"status_code": "broken", "value_convert": "default", "config_item": {}},
+        4: {"status_code": "custom", "value_convert": "unknown", "config_item": {}},
+    }
+
+    engine.async_handle_status(device, {"3": "value", "x": 1, "1": False})
+    assert device.status["switch_1"] is False
+    assert "broken" not in device.status
+
+    with pytest.raises(Exception, match="unknown"):
+        engine.async_handle_status(device, {"4": "value"})
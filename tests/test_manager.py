@@ -0,0 +1,414 @@
+"""Tests for the Tuya device manager."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import timedelta
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from tuya_sharing.customerapi import CustomerTokenInfo
+
+from custom_components.tuya_custom.const import TUYA_CLIENT_ID
+from custom_components.tuya_custom.manager import (
+    TRANSPORT_CLOUD,
+    TRANSPORT_LOCAL,
+    TRANSPORT_PROBE_INTERVAL,
+    TransportStats,
+    TuyaManager,
+)
+
+TOKEN_RESPONSE = {
+    "t": 0,
+    "uid": "uid",
+    "expire_time": 7200,
+    "access_token": "access",
+    "refresh_token": "refresh",
+}
+
+
+@pytest.fixture
+def manager() -> TuyaManager:
+    """Return a manager of an account."""
+    return TuyaManager(
+        TUYA_CLIENT_ID, "user", "terminal", "https://apigw.tuyaeu.com", TOKEN_RESPONSE
+    )
+
+
+def _run(target: Callable[[], None]) -> tuple[threading.Thread, list[Exception]]:
+    """Run a target in a thread, collecting its error."""
+    errors: list[Exception] = []
+
+    def run() -> None:
+        try:
+            target()
+        except Exception as err:  # noqa: BLE001
+            errors.append(err)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, errors
+
+
+def test_refresh_joins_refresh_in_progress(manager: TuyaManager) -> None:
+    """Test only devices not being refreshed are requested again."""
+    started = threading.Event()
+    release = threading.Event()
+    refreshed: list[frozenset[str] | None] = []
+
+    def refresh(device_ids: frozenset[str] | None) -> None:
+        refreshed.append(device_ids)
+        if device_ids == {"a", "b"}:
+            started.set()
+            release.wait(5)
+
+    manager._refresh_devices = refresh
+    first, _ = _run(lambda: manager.refresh_devices(["a", "b"]))
+    assert started.wait(5)
+
+    second, _ = _run(lambda: manager.refresh_devices(["b", "c"]))
+    # A refresh of devices which are all being refreshed only waits
+    third, _ = _run(lambda: manager.refresh_devices(["a"]))
+    third.join(0.1)
+    assert third.is_alive()
+
+    release.set()
+    for thread in (first, second, third):
+        thread.join(5)
+
+    assert refreshed == [frozenset({"a", "b"}), frozenset({"c"})]
+    assert manager.refresh_stats == {"started": 2, "joined": 2}
+
+
+def test_refresh_error_raised_to_joined(manager: TuyaManager) -> None:
+    """Test callers joining a failing refresh see its error."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def refresh(device_ids: frozenset[str] | None) -> None:
+        started.set()
+        release.wait(5)
+        raise ValueError("cloud error")
+
+    manager._refresh_devices = refresh
+    first, first_errors = _run(manager.refresh_devices)
+    assert started.wait(5)
+    second, second_errors = _run(lambda: manager.refresh_devices(["a"]))
+
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert [str(err) for err in first_errors] == ["cloud error"]
+    assert second_errors == first_errors
+    assert manager.refresh_stats == {"started": 1, "joined": 1}
+
+
+def test_refresh_access_token(manager: TuyaManager) -> None:
+    """Test the token is replaced before the lazy refresh is allowed again."""
+    api = manager.customer_api
+    api.get = MagicMock(
+        return_value={
+            "success": True,
+            "t": int(time.time() * 1000),
+            "result": {
+                "expireTime": 7200,
+                "uid": "uid",
+                "accessToken": "new_access",
+                "refreshToken": "new_refresh",
+            },
+        }
+    )
+    flag_when_replaced: list[bool] = []
+
+    def token_info(token_info: dict[str, Any]) -> CustomerTokenInfo:
+        flag_when_replaced.append(api.refresh_token)
+        return CustomerTokenInfo(token_info)
+
+    with patch(
+        "custom_components.tuya_custom.manager.CustomerTokenInfo",
+        side_effect=token_info,
+    ):
+        assert manager.refresh_access_token()
+
+    api.get.assert_called_once_with("/v1.0/m/token/refresh")
+    assert flag_when_replaced == [True]
+    assert api.token_info.access_token == "new_access"
+    assert api.token_info.refresh_token == "new_refresh"
+    assert api.refresh_token is False
+    assert manager.token_stats["refreshed"] == 1
+
+
+def test_refresh_access_token_by_sdk(manager: TuyaManager) -> None:
+    """Test the token is not refreshed again while the SDK refreshes it."""
+    api = manager.customer_api
+    api.refresh_token = True
+    api.get = MagicMock()
+
+    def sdk_refresh() -> None:
+        time.sleep(0.2)
+        api.token_info = CustomerTokenInfo(
+            {**TOKEN_RESPONSE, "t": int(time.time() * 1000)}
+        )
+        api.refresh_token = False
+
+    thread, _ = _run(sdk_refresh)
+    assert manager.refresh_access_token()
+    thread.join(5)
+
+    api.get.assert_not_called()
+
+
+def test_refresh_access_token_by_sdk_timeout(manager: TuyaManager) -> None:
+    """Test the refresh is given up on while the SDK refresh takes too long."""
+    api = manager.customer_api
+    api.refresh_token = True
+    api.get = MagicMock()
+
+    with patch("custom_components.tuya_custom.manager.TOKEN_REFRESH_WAIT", 0.2):
+        assert not manager.refresh_access_token()
+
+    api.get.assert_not_called()
+    assert api.refresh_token is True
+    assert api.token_info.access_token == "access"
+
+
+def test_refresh_access_token_failure(manager: TuyaManager) -> None:
+    """Test a failed refresh keeps the token and clears the flag."""
+    api = manager.customer_api
+    api.get = lambda path: None
+
+    assert not manager.refresh_access_token()
+    assert api.token_info.access_token == "access"
+    assert api.refresh_token is False
+    assert manager.token_stats["failed"] == 1
+
+
+def test_status_before_send_returns(manager: TuyaManager) -> None:
+    """Test a status reported while the command is being sent confirms it."""
+    device = SimpleNamespace(id="device", category="kg")
+    manager.device_map[device.id] = device
+
+    def send(device_id: str, commands: list[dict[str, Any]]) -> bool:
+        manager.metrics.confirm(device, ["switch_1"])
+        return True
+
+    manager._send_commands = send
+    manager.send_commands(device.id, [{"code": "switch_1", "value": True}])
+
+    metrics = manager.metrics.device_as_dict(device.id)
+    assert metrics["confirm"]["count"] == 1
+    assert not manager.metrics._pending[device.id]
+
+
+@pytest.mark.parametrize("error", [False, True])
+def test_failed_send_not_pending(manager: TuyaManager, error: bool) -> None:
+    """Test commands no transport accepted do not wait for a status."""
+    device = SimpleNamespace(id="device", category="kg")
+    manager.device_map[device.id] = device
+
+    def send(device_id: str, commands: list[dict[str, Any]]) -> bool:
+        if error:
+            raise ValueError("cloud error")
+        return False
+
+    manager._send_commands = send
+    if error:
+        with pytest.raises(ValueError):
+            manager.send_commands(device.id, [{"code": "switch_1", "value": True}])
+    else:
+        manager.send_commands(device.id, [{"code": "switch_1", "value": True}])
+
+    assert not manager.metrics._pending[device.id]
+    manager.metrics.confirm(device, ["switch_1"])
+    assert "confirm" not in manager.metrics.device_as_dict(device.id)
+
+
+COMMANDS = [{"code": "switch_1", "value": True}]
+CLOUD_RTT = 0.3
+
+
+def _transports(
+    manager: TuyaManager, *, local_ok: bool = True, cloud_ok: bool = True
+) -> list[str]:
+    """Send commands over mocked transports, return the transports used."""
+    used: list[str] = []
+
+    def send_local(device_id: str, commands: list[dict[str, Any]]) -> bool:
+        used.append(TRANSPORT_LOCAL)
+        return local_ok
+
+    def send_cloud(device_id: str, commands: list[dict[str, Any]]) -> bool:
+        used.append(TRANSPORT_CLOUD)
+        # Recorded like the cloud requests do
+        _seed(manager, TRANSPORT_CLOUD, CLOUD_RTT if cloud_ok else None)
+        if cloud_ok is None:
+            raise ValueError("cloud error")
+        return cloud_ok
+
+    manager.local = MagicMock()
+    manager.local.send_commands.side_effect = send_local
+    manager._send_cloud_commands = send_cloud
+    manager.send_commands("device", COMMANDS)
+    return used
+
+
+def _seed(manager: TuyaManager, transport: str, *rtts: float | None) -> None:
+    """Record commands sent over a transport."""
+    stats = manager.transport_stats.setdefault("device", {})
+    for rtt in rtts:
+        stats.setdefault(transport, TransportStats()).record(rtt)
+
+
+def test_first_command_sent_locally(manager: TuyaManager) -> None:
+    """Test the LAN is tried before any transport was measured."""
+    assert _transports(manager) == [TRANSPORT_LOCAL]
+    assert manager.last_transport["device"] == TRANSPORT_LOCAL
+
+
+def test_faster_transport_first(manager: TuyaManager) -> None:
+    """Test commands are sent over the transport with the lower round-trip time."""
+    _seed(manager, TRANSPORT_LOCAL, 0.5, 0.6)
+    _seed(manager, TRANSPORT_CLOUD, 0.2, 0.3)
+
+    assert manager.preferred_transports("device") == [
+        TRANSPORT_CLOUD,
+        TRANSPORT_LOCAL,
+    ]
+    assert _transports(manager) == [TRANSPORT_CLOUD]
+
+
+@pytest.mark.parametrize(
+    ("local_ok", "cloud_ok", "used"),
+    [
+        # No acknowledgement over the LAN
+        (False, True, [TRANSPORT_LOCAL, TRANSPORT_CLOUD]),
+        (False, False, [TRANSPORT_LOCAL, TRANSPORT_CLOUD]),
+    ],
+)
+def test_failover_to_cloud(
+    manager: TuyaManager, local_ok: bool, cloud_ok: bool, used: list[str]
+) -> None:
+    """Test commands the LAN did not acknowledge are sent through the cloud."""
+    _seed(manager, TRANSPORT_LOCAL, 0.05)
+    _seed(manager, TRANSPORT_CLOUD, 0.3)
+
+    assert _transports(manager, local_ok=local_ok, cloud_ok=cloud_ok) == used
+    assert manager.transport_stats["device"][TRANSPORT_LOCAL].failed == 1
+
+
+def test_failover_to_local(manager: TuyaManager) -> None:
+    """Test a cloud error is not raised when the LAN accepted the commands."""
+    _seed(manager, TRANSPORT_LOCAL, 0.5)
+    _seed(manager, TRANSPORT_CLOUD, 0.2)
+
+    assert _transports(manager, cloud_ok=None) == [TRANSPORT_CLOUD, TRANSPORT_LOCAL]
+
+
+def test_cloud_error_raised(manager: TuyaManager) -> None:
+    """Test the cloud error is raised when no transport accepted the commands."""
+    _seed(manager, TRANSPORT_LOCAL, 0.05)
+    _seed(manager, TRANSPORT_CLOUD, 0.3)
+
+    with pytest.raises(ValueError, match="cloud error"):
+        _transports(manager, local_ok=False, cloud_ok=None)
+
+
+def test_unhealthy_transport_demoted(manager: TuyaManager) -> None:
+    """Test a faster transport which mostly fails is tried last."""
+    _seed(manager, TRANSPORT_LOCAL, 0.05, *[None] * 3)
+    _seed(manager, TRANSPORT_CLOUD, 0.3)
+
+    assert not manager.transport_stats["device"][TRANSPORT_LOCAL].healthy
+    assert _transports(manager) == [TRANSPORT_CLOUD]
+
+
+def test_other_transport_probed(
+    manager: TuyaManager, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the slower transport is measured again once in a while."""
+    # The cloud is probed once the LAN was measured
+    assert _transports(manager) == [TRANSPORT_LOCAL]
+    assert _transports(manager) == [TRANSPORT_CLOUD]
+    assert manager.transport_stats["device"][TRANSPORT_CLOUD].percentile(50) == (
+        CLOUD_RTT
+    )
+    assert _transports(manager) == [TRANSPORT_LOCAL]
+
+    freezer.tick(timedelta(seconds=TRANSPORT_PROBE_INTERVAL + 1))
+    assert _transports(manager) == [TRANSPORT_CLOUD]
+    assert _transports(manager) == [TRANSPORT_LOCAL]
+
+
+def _mq(client: bool = True) -> MagicMock:
+    """Return an MQTT client of the SDK, without subscriptions."""
+    mq = MagicMock()
+    mq.client = MagicMock() if client else None
+    mq.device = []
+    return mq
+
+
+def _device(device_id: str, *, set_up: bool = True) -> SimpleNamespace:
+    """Return a device, set up when it has enabled entities."""
+    return SimpleNamespace(id=device_id, set_up=set_up, support_local=False)
+
+
+def test_subscribe_set_up_devices(manager: TuyaManager) -> None:
+    """Test only the devices with set up entities are subscribed."""
+    manager.mq = mq = _mq()
+    manager.device_map = {
+        "a": _device("a"),
+        "b": _device("b", set_up=False),
+    }
+
+    manager.subscribe_devices()
+
+    mq.subscribe_device.assert_called_once_with("a", manager.device_map["a"])
+    mq.un_subscribe_device.assert_not_called()
+    assert manager.subscription_stats == {"subscribed": 1, "unsubscribed": 0}
+
+    # Only changes are subscribed
+    mq.device.append(manager.device_map["a"])
+    manager.subscribe_devices()
+    mq.subscribe_device.assert_called_once()
+
+
+def test_unsubscribe_removed_devices(manager: TuyaManager) -> None:
+    """Test removed devices are unsubscribed and not subscribed again."""
+    manager.mq = mq = _mq()
+    removed = _device("a")
+    kept = _device("b")
+    mq.device.extend([removed, kept])
+    manager.device_map = {"b": kept}
+
+    manager.subscribe_devices()
+
+    mq.un_subscribe_device.assert_called_once_with("a", False)
+    mq.subscribe_device.assert_not_called()
+    assert mq.device == [kept]
+    assert manager.subscription_stats == {"subscribed": 0, "unsubscribed": 1}
+
+
+def test_subscribe_before_connected(manager: TuyaManager) -> None:
+    """Test devices are only queued for the subscription while disconnected."""
+    manager.mq = mq = _mq(client=False)
+    manager.device_map = {"a": _device("a")}
+
+    manager.subscribe_devices()
+
+    mq.subscribe_device.assert_not_called()
+    assert mq.device == [manager.device_map["a"]]
+
+
+def test_subscribe_without_mqtt(manager: TuyaManager) -> None:
+    """Test nothing is subscribed before the MQTT client exists."""
+    manager.device_map = {"a": _device("a")}
+
+    manager.subscribe_devices()
+
+    assert manager.subscription_stats == {"subscribed": 0, "unsubscribed": 0}
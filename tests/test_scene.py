@@ -0,0 +1,81 @@
+"""Tests for the Tuya scenes."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from tuya_sharing import SharingScene
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import PlatformNotReady
+
+from custom_components.tuya_custom.const import (
+    DOMAIN,
+    SCENE_STORAGE_KEY,
+    SCENE_STORAGE_VERSION,
+)
+from custom_components.tuya_custom.scene import async_setup_entry
+
+SCENE = {
+    "actions": [],
+    "enabled": True,
+    "name": "Good night",
+    "scene_id": "abc",
+    "home_id": 1,
+}
+
+
+def _setup_entry(hass: HomeAssistant, query_scenes: MagicMock) -> MockConfigEntry:
+    """Add a config entry, whose manager queries the scenes with a mock."""
+    manager = MagicMock()
+    manager.query_scenes = query_scenes
+    manager.call_cloud.side_effect = lambda priority, target, *args: target(*args)
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    entry.runtime_data = SimpleNamespace(manager=manager)
+    return entry
+
+
+async def test_first_query_failed_without_cache(hass: HomeAssistant) -> None:
+    """Test the setup is retried when there are neither cached nor queried scenes."""
+    entry = _setup_entry(hass, MagicMock(side_effect=TypeError("no response")))
+    add_entities = MagicMock()
+
+    with pytest.raises(PlatformNotReady):
+        await async_setup_entry(hass, entry, add_entities)
+
+    add_entities.assert_not_called()
+
+
+async def test_first_query_failed_with_cache(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test the cached scenes are set up when the first query fails."""
+    entry = _setup_entry(hass, MagicMock(side_effect=TypeError("no response")))
+    hass_storage[SCENE_STORAGE_KEY.format(entry_id=entry.entry_id)] = {
+        "version": SCENE_STORAGE_VERSION,
+        "key": SCENE_STORAGE_KEY.format(entry_id=entry.entry_id),
+        "data": [SCENE],
+    }
+    add_entities = MagicMock()
+
+    await async_setup_entry(hass, entry, add_entities)
+    await hass.async_block_till_done()
+
+    (entities,) = add_entities.call_args.args
+    assert [entity.unique_id for entity in entities] == ["tysabc"]
+
+
+async def test_first_query(hass: HomeAssistant) -> None:
+    """Test the queried scenes are set up without a cache."""
+    entry = _setup_entry(hass, MagicMock(return_value=[SharingScene(**SCENE)]))
+    add_entities = MagicMock()
+
+    await async_setup_entry(hass, entry, add_entities)
+
+    (entities,) = add_entities.call_args.args
+    assert [entity.unique_id for entity in entities] == ["tysabc"]
@@ -0,0 +1,142 @@
+"""Tests for the Tuya sensor throttling."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.tuya_custom.const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_RELATIVE,
+    CONF_MIN_INTERVAL,
+    CONF_SENSOR_THROTTLING,
+)
+from custom_components.tuya_custom.sensor import (
+    DEADBAND_FLUSH_INTERVAL,
+    TuyaSensorEntity,
+    TuyaSensorEntityDescription,
+)
+
+UNIQUE_ID = "tuya.devicetemp_current"
+
+
+def _sensor(
+    hass: HomeAssistant,
+    *,
+    deadband: float = 0,
+    relative: bool = False,
+    min_interval: float = 0,
+) -> tuple[TuyaSensorEntity, MagicMock]:
+    """Return a sensor throttled through the options, and its state writes."""
+    device = SimpleNamespace(id="device", status={"temp_current": 20.0})
+    wrapper = MagicMock(native_unit=None, suggested_unit=None)
+    wrapper.read_device_status.side_effect = lambda device: device.status[
+        "temp_current"
+    ]
+    entity = TuyaSensorEntity(
+        device,
+        SimpleNamespace(load_shedder=None),
+        TuyaSensorEntityDescription(key="temp_current"),
+        wrapper,
+    )
+    entity.hass = hass
+    entity.platform = SimpleNamespace(
+        config_entry=SimpleNamespace(
+            options={
+                CONF_SENSOR_THROTTLING: {
+                    UNIQUE_ID: {
+                        CONF_DEADBAND: deadband,
+                        CONF_DEADBAND_RELATIVE: relative,
+                        CONF_MIN_INTERVAL: min_interval,
+                    }
+                }
+            }
+        )
+    )
+    written = MagicMock()
+    entity.async_write_ha_state = lambda: written(entity.native_value)
+    return entity, written
+
+
+async def _report(entity: TuyaSensorEntity, value: Any) -> None:
+    """Report a new value of the sensor."""
+    entity.device.status["temp_current"] = value
+    await entity._handle_state_update(["temp_current"])
+
+
+async def _tick(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, seconds: float
+) -> None:
+    """Move the time forward and run the due flushes."""
+    freezer.tick(timedelta(seconds=seconds))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_deadband(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    """Test changes within the deadband are held, then flushed."""
+    entity, written = _sensor(hass, deadband=0.5)
+    assert entity.unique_id == UNIQUE_ID
+
+    await _report(entity, 20.0)
+    await _report(entity, 20.3)
+    await _report(entity, 20.4)
+    assert [call.args[0] for call in written.call_args_list] == [20.0]
+
+    # Leaving the deadband is written at once
+    await _report(entity, 21.0)
+    await _report(entity, 21.2)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 21.0]
+
+    # The held value is written eventually
+    await _tick(hass, freezer, DEADBAND_FLUSH_INTERVAL)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 21.0, 21.2]
+
+
+async def test_relative_deadband(hass: HomeAssistant) -> None:
+    """Test a relative deadband is a percentage of the written value."""
+    entity, written = _sensor(hass, deadband=10, relative=True)
+
+    await _report(entity, 20.0)
+    await _report(entity, 21.9)
+    await _report(entity, 22.1)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 22.1]
+
+
+async def test_min_interval(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test updates within the interval are held and the latest one is flushed."""
+    entity, written = _sensor(hass, min_interval=10)
+
+    await _report(entity, 20.0)
+    await _tick(hass, freezer, 2)
+    await _report(entity, 25.0)
+    await _report(entity, 26.0)
+    assert [call.args[0] for call in written.call_args_list] == [20.0]
+
+    await _tick(hass, freezer, 8)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 26.0]
+
+    # A change after the interval is written at once
+    await _tick(hass, freezer, 10)
+    await _report(entity, 30.0)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 26.0, 30.0]
+
+
+async def test_availability_not_held(hass: HomeAssistant) -> None:
+    """Test updates without changed properties are always written."""
+    entity, written = _sensor(hass, deadband=5, min_interval=60)
+
+    await _report(entity, 20.0)
+    await _report(entity, 21.0)
+    await entity._handle_state_update(None)
+    assert [call.args[0] for call in written.call_args_list] == [20.0, 21.0]
+    assert entity._cancel_flush is None
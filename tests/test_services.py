@@ -0,0 +1,116 @@
+"""Tests for the Tuya services."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from homeassistant.auth.models import User
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import Unauthorized
+
+from custom_components.tuya_custom.const import DOMAIN
+from custom_components.tuya_custom.diagnostics import DIAGNOSTICS_CHUNK_SIZE
+from custom_components.tuya_custom.services import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_FORMAT_VERSION,
+    SERVICE_EXPORT_DIAGNOSTICS,
+    async_setup_services,
+)
+
+from .common import mock_device, setup_entry
+
+# More devices than written in a single chunk
+DEVICES = [
+    mock_device(f"device{index}", product_id=f"product{index % 2}")
+    for index in range(DIAGNOSTICS_CHUNK_SIZE + 2)
+]
+
+
+@pytest.fixture(autouse=True)
+def config_dir(hass: HomeAssistant, tmp_path: Path) -> Path:
+    """Write the exports to a temporary config directory."""
+    hass.config.config_dir = str(tmp_path)
+    return tmp_path
+
+
+async def test_export_diagnostics(hass: HomeAssistant) -> None:
+    """Test all devices are written after the entry diagnostics."""
+    entry = setup_entry(hass, DEVICES)
+    async_setup_services(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_DIAGNOSTICS,
+        {ATTR_CONFIG_ENTRY_ID: entry.entry_id},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["devices"] == len(DEVICES)
+    data = json.loads(Path(response["path"]).read_text())
+    assert data["format_version"] == 1
+    assert data["endpoint"] == "https://apigw.tuyaeu.com"
+    assert "command_latency" in data
+    assert [device["id"] for device in data["devices"]] == [
+        device.id for device in DEVICES
+    ]
+    assert data["devices"][0]["status"] == {"switch_1": True}
+    assert "function" in data["devices"][0]
+    assert "products" not in data
+
+
+async def test_export_diagnostics_products(hass: HomeAssistant) -> None:
+    """Test the product specs are written once in format version 2."""
+    entry = setup_entry(hass, DEVICES)
+    async_setup_services(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_DIAGNOSTICS,
+        {ATTR_CONFIG_ENTRY_ID: entry.entry_id, ATTR_FORMAT_VERSION: 2},
+        blocking=True,
+        return_response=True,
+    )
+
+    data = json.loads(Path(response["path"]).read_text())
+    assert data["format_version"] == 2
+    assert data["devices"][1] == {
+        "id": "device1",
+        "name": "Device device1",
+        "product_id": "product1",
+        "online": True,
+        "status": {"switch_1": True},
+    }
+    assert len(data["devices"]) == len(DEVICES)
+    assert data["products"] == {
+        product_id: {
+            "product_name": "Switch",
+            "category": "kg",
+            "function": {},
+            "status_range": {},
+        }
+        for product_id in ("product0", "product1")
+    }
+
+
+async def test_export_diagnostics_admin_only(
+    hass: HomeAssistant, hass_read_only_user: User, config_dir: Path
+) -> None:
+    """Test users who are not admins cannot export the diagnostics."""
+    entry = setup_entry(hass, DEVICES)
+    async_setup_services(hass)
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_DIAGNOSTICS,
+            {ATTR_CONFIG_ENTRY_ID: entry.entry_id},
+            blocking=True,
+            return_response=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+
+    assert not any(config_dir.glob("*.json"))
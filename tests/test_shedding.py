@@ -0,0 +1,64 @@
+"""Tests for the load shedding while the event loop lags."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from custom_components.tuya_custom.shedding import (
+    LAG_RECOVER_SAMPLES,
+    LAG_SAMPLE_INTERVAL,
+    LoadShedder,
+)
+
+
+def _shedder() -> tuple[LoadShedder, MagicMock]:
+    """Return a load shedder sampling a fake loop, and the loop."""
+    loop = MagicMock()
+    loop.time.return_value = 0.0
+    shedder = LoadShedder(SimpleNamespace(loop=loop))
+    shedder.async_start()
+    return shedder, loop
+
+
+def _sample(shedder: LoadShedder, loop: MagicMock, lag: float) -> None:
+    """Run the scheduled sample late by the lag."""
+    loop.time.return_value = shedder._expected + lag
+    shedder._async_sample()
+
+
+def test_shedding_hysteresis() -> None:
+    """Test shedding starts on a single lag and stops after calm samples."""
+    shedder, loop = _shedder()
+    loop.call_at.assert_called_once_with(LAG_SAMPLE_INTERVAL, shedder._async_sample)
+
+    _sample(shedder, loop, 0.1)
+    assert not shedder.active
+    _sample(shedder, loop, 0.3)
+    assert shedder.active
+
+    # Samples between the thresholds neither recover nor count as calm
+    for _ in range(LAG_RECOVER_SAMPLES - 1):
+        _sample(shedder, loop, 0.01)
+    _sample(shedder, loop, 0.1)
+    for _ in range(LAG_RECOVER_SAMPLES - 1):
+        _sample(shedder, loop, 0.01)
+    assert shedder.active
+
+    _sample(shedder, loop, 0.01)
+    assert not shedder.active
+
+    events = shedder.as_dict()["events"]
+    assert len(events) == 1
+    assert events[0]["max_lag_ms"] == 300.0
+    assert events[0]["ended"] is not None
+
+
+def test_stop_cancels_sampling() -> None:
+    """Test no sample runs after stopping."""
+    shedder, loop = _shedder()
+
+    shedder.async_stop()
+
+    loop.call_at.return_value.cancel.assert_called_once()
+    assert shedder.as_dict() == {"active": False, "lag_ms": 0.0, "events": []}
@@ -0,0 +1,73 @@
+"""Tests for the Tuya utilities."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.tuya_custom.util import SingleFlight
+
+
+async def test_single_flight_joins_running_call() -> None:
+    """Test concurrent callers share a single call."""
+    flight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def target() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    callers = [asyncio.create_task(flight.async_run(target)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert flight.in_flight
+    release.set()
+
+    assert await asyncio.gather(*callers) == [1, 1, 1]
+    assert calls == 1
+    assert not flight.in_flight
+
+    # A call after the shared one finished starts a new call
+    assert await flight.async_run(target) == 2
+
+
+async def test_single_flight_shares_error() -> None:
+    """Test every caller gets the error of the shared call."""
+    flight: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+
+    async def target() -> int:
+        await release.wait()
+        raise ValueError("failed")
+
+    callers = [asyncio.create_task(flight.async_run(target)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    for caller in callers:
+        with pytest.raises(ValueError, match="failed"):
+            await caller
+    assert not flight.in_flight
+
+
+async def test_single_flight_cancelled_caller() -> None:
+    """Test cancelling one caller does not cancel the shared call."""
+    flight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def target() -> str:
+        await release.wait()
+        return "done"
+
+    cancelled = asyncio.create_task(flight.async_run(target))
+    waiting = asyncio.create_task(flight.async_run(target))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    release.set()
+
+    assert await waiting == "done"